@@ -9,7 +9,6 @@ from time import sleep
 from typing import Any, Callable, List
 
 import kubernetes
-from pkg_resources import get_distribution
 from typer import Argument, Option, Typer
 
 from bodywork.k8s.utils import make_valid_k8s_name
@@ -46,7 +45,7 @@ from ..exceptions import (
     BodyworkConfigParsingError,
     BodyworkWorkflowExecutionError,
 )
-from ..constants import BODYWORK_NAMESPACE, BODYWORK_DOCKER_IMAGE
+from ..constants import BODYWORK_NAMESPACE, BODYWORK_DOCKER_IMAGE, BODYWORK_VERSION
 from ..k8s import api_exception_msg, load_kubernetes_config
 from ..stage_execution import run_stage
 from bodywork.workflow_execution import run_workflow
@@ -149,7 +148,7 @@ def _validate_config(
 
 @cli_app.command("version")
 def _version():
-    print_info(get_distribution("bodywork").version)
+    print_info(BODYWORK_VERSION)
     sys.exit(0)
 
 
@@ -45,15 +45,10 @@ def is_namespace_available_for_bodywork(namespace: str) -> bool:
             k8s.workflow_cluster_role_binding_name(namespace)
         )
     )
-    is_namespace_setup = (
-        True
-        if (
-            workflow_controller_sa_exists
-            and workflow_controller_sa_cluster_role_binding_exists
-        )
-        else False
-    )
-    if is_namespace_setup:
+    if (
+        workflow_controller_sa_exists
+        and workflow_controller_sa_cluster_role_binding_exists
+    ):
         return True
     else:
         if not workflow_controller_sa_exists:
@@ -1,11 +1,18 @@
+from contextlib import contextmanager
 from datetime import datetime
-from typing import Any, Dict
+from itertools import islice
+from threading import Event, Thread
+from typing import Any, Dict, Iterable, Iterator, Union
 
 from rich.console import Console
 from rich.table import Table
 from rich.progress import BarColumn, Progress, TaskProgressColumn, TextColumn
 
-from ..constants import DEFAULT_K8S_POLLING_FREQ, LOG_TIME_FORMAT
+from ..constants import (
+    DEFAULT_K8S_POLLING_FREQ,
+    LOG_TIME_FORMAT,
+    POD_LOGS_PRINT_BATCH_SIZE,
+)
 
 console = Console(highlight=False, soft_wrap=False, width=175)
 
@@ -41,14 +48,24 @@ def print_dict(
     console.print(table)
 
 
-def print_pod_logs(logs: str, header: str) -> None:
+def print_pod_logs(logs: Union[str, Iterable[str]], header: str) -> None:
     """Render pod logs.
 
-    :param logs: The logs!
+    :param logs: The logs! Either as a single string, or as an iterable
+        of lines that are written out in batches, as they become available,
+        without being parsed for markup.
     :param header: Text to associate with the logs.
     """
     console.rule(f"[yellow]{header}[/yellow]", style="yellow")
-    console.print(logs, style="grey58")
+    if isinstance(logs, str):
+        console.print(logs, style="grey58")
+    else:
+        lines = iter(logs)
+        while True:
+            batch = list(islice(lines, POD_LOGS_PRINT_BATCH_SIZE))
+            if not batch:
+                break
+            console.out("\n".join(batch), style="grey58", highlight=False)
     console.rule(style="yellow")
 
 
@@ -86,6 +103,36 @@ def update_progress_bar(progress_bar: Progress) -> None:
         progress_bar.update(task_id, advance=1, description=progress_info)
 
 
+@contextmanager
+def progress_bar_updates(
+    progress_bar: Progress, polling_freq_seconds: float = DEFAULT_K8S_POLLING_FREQ
+) -> Iterator[None]:
+    """Update a progress bar in the background, until the context exits.
+
+    :param progress_bar: The progress bar to update. If None, then there
+        is nothing to update.
+    :param polling_freq_seconds: Time (in seconds) between progress bar
+        updates, defaults to DEFAULT_K8S_POLLING_FREQ.
+    """
+    if progress_bar is None:
+        yield
+        return
+
+    stop = Event()
+
+    def update_until_stopped() -> None:
+        while not stop.wait(polling_freq_seconds):
+            update_progress_bar(progress_bar)
+
+    updater = Thread(target=update_until_stopped, daemon=True)
+    updater.start()
+    try:
+        yield
+    finally:
+        stop.set()
+        updater.join()
+
+
 def _get_progress_description() -> str:
     """Compose progress bar description using default log time format."""
     return f"[dim cyan]{datetime.now().strftime(LOG_TIME_FORMAT)}"
@@ -281,11 +281,13 @@ def display_workflow_job_logs(namespace: str, job_name: str) -> None:
     if not k8s.namespace_exists(namespace):
         print_warn(f"Could not find namespace={namespace} on k8s cluster.")
         return None
-    workflow_job_pod_name = k8s.get_latest_pod_name(namespace, job_name)
+    workflow_job_pod_name = k8s.get_latest_pod_name(
+        namespace, job_name, label_selector=f"job-name={job_name}"
+    )
     if workflow_job_pod_name is None:
         print_warn(f"Cannot find k8s pod for run ID = {job_name}.")
         return None
-    workflow_job_logs = k8s.get_pod_logs(namespace, workflow_job_pod_name)
+    workflow_job_logs = k8s.get_pod_logs_stream(namespace, workflow_job_pod_name)
     print_pod_logs(workflow_job_logs, f"logs for run ID = {job_name}")
 
 
@@ -297,7 +299,7 @@ def _is_existing_workflow_job(namespace: str, job_name: str) -> bool:
     :return: A boolean flag.
     """
     jobs_in_namespace = k8s.list_workflow_jobs(namespace, job_name)
-    return True if job_name in jobs_in_namespace.keys() else False
+    return job_name in jobs_in_namespace
 
 
 def _is_existing_workflow_cronjob(namespace: str, job_name: str) -> bool:
@@ -308,7 +310,7 @@ def _is_existing_workflow_cronjob(namespace: str, job_name: str) -> bool:
     :return: A boolean flag.
     """
     cronjobs_in_namespace = k8s.list_workflow_cronjobs(namespace)
-    return True if job_name in cronjobs_in_namespace.keys() else False
+    return job_name in cronjobs_in_namespace
 
 
 def _is_valid_cron_schedule(schedule: str) -> bool:
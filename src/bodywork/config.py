@@ -18,11 +18,12 @@
 Bodywork configuration file parsing and validation.
 """
 import json
+import re
+import sys
+from copy import deepcopy
+from itertools import chain
 from pathlib import Path
-from typing import Any, Dict, Iterable, List, Sequence
-
-import cerberus
-import yaml
+from typing import Any, Dict, Iterable, List, Pattern, Sequence, Tuple
 
 from .constants import BODYWORK_CONFIG_VERSION
 from .exceptions import (
@@ -35,22 +36,58 @@ from .exceptions import (
 
 DAG = Iterable[Iterable[str]]
 VALID_K8S_NAME_REGEX = r"[a-zA-Z0-9-\.]+"
+CONFIG_SECTIONS = ("version", "pipeline", "stages", "logging")
+
+_CONFIG_CACHE: Dict[Tuple[str, bool], Tuple[int, int, "BodyworkConfig"]] = {}
+_CONFIG_CACHE_MAXSIZE = 8
 
 
 class DictDataValidator:
     """Data validator for dictionaries.
 
     This class is designed to validate key-value data against a schema.
-    It uses Cerberus - https://docs.python-cerberus.org/en/stable/ - and
-    its in-built schema definition language.
+    Schemas are defined using the subset of the Cerberus schema definition
+    language - https://docs.python-cerberus.org/en/stable/ - that is
+    required for Bodywork config files: the type, required, nullable,
+    allowed, min, regex, schema, keysrules and valuesrules rules. Unknown
+    keys are always allowed.
     """
 
+    TYPES: Dict[str, Tuple[type, ...]] = {
+        "boolean": (bool,),
+        "dict": (dict,),
+        "float": (float, int),
+        "integer": (int,),
+        "list": (list,),
+        "string": (str,),
+    }
+
     def __init__(self, schema: Dict[str, Dict[str, Any]]):
         """Constructor.
 
-        :param schema: Valid Cerberus data schema.
+        :param schema: Valid data schema.
+        """
+        self._schema = schema
+        self._regex_patterns: Dict[str, Pattern] = {}
+        self._compile_regex_patterns(schema.values())
+
+    def _compile_regex_patterns(self, rule_sets: Iterable[Dict[str, Any]]) -> None:
+        """Compile all regex patterns in a schema, ahead of validation.
+
+        :param rule_sets: The rules for each field in a schema.
         """
-        self._data_validator = cerberus.Validator(schema=schema, allow_unknown=True)
+        for rules in rule_sets:
+            if "regex" in rules:
+                self._regex_patterns[rules["regex"]] = re.compile(rules["regex"])
+            if "schema" in rules:
+                nested_schema = rules["schema"]
+                if rules.get("type") == "dict":
+                    self._compile_regex_patterns(nested_schema.values())
+                else:
+                    self._compile_regex_patterns([nested_schema])
+            for rule in ("keysrules", "valuesrules"):
+                if rule in rules:
+                    self._compile_regex_patterns([rules[rule]])
 
     def find_errors_in(self, data: Dict[str, Any], prefix: str = "") -> List[str]:
         """Find schema invalidation errors.
@@ -60,36 +97,124 @@ class DictDataValidator:
             error, defaults to ''.
         :return: List of data validation errors.
         """
-        is_valid = self._data_validator.validate(data)
-        if is_valid:
+        if not isinstance(data, dict):
+            return [f"{prefix.rstrip('.')} -> must be of dict type"]
+        errors = self._document_errors(self._schema, data)
+        if not errors:
             return []
         else:
-            errors = self._data_validator.errors
-            return self._format_errors(errors, prefix)
+            return self._format_errors(errors, prefix, self._schema)
+
+    def _document_errors(
+        self, schema: Dict[str, Dict[str, Any]], data: Dict[str, Any]
+    ) -> Dict[str, List[Any]]:
+        """Validate a dictionary against a schema.
+
+        :param schema: The schema to validate against.
+        :param data: The dictionary to validate.
+        :return: Mapping of invalid keys to their errors, ordered by key.
+        """
+        errors: Dict[str, List[Any]] = {}
+        for key, rules in schema.items():
+            if key in data:
+                field_errors = self._field_errors(rules, data[key])
+                if field_errors:
+                    errors[key] = field_errors
+            elif rules.get("required", False):
+                errors[key] = ["required field"]
+        return {key: errors[key] for key in sorted(errors)}
+
+    def _field_errors(self, rules: Dict[str, Any], value: Any) -> List[Any]:
+        """Validate a single value against its rules.
+
+        :param rules: The rules that the value must satisfy.
+        :param value: The value to validate.
+        :return: List of errors, where errors in nested data are returned
+            as a dictionary mapping nested keys (or indices) to errors.
+        """
+        if value is None:
+            return [] if rules.get("nullable", False) else ["null value not allowed"]
+        if "type" in rules and not isinstance(value, self.TYPES[rules["type"]]):
+            return [f"must be of {rules['type']} type"]
+
+        errors: List[Any] = []
+        if "allowed" in rules and value not in rules["allowed"]:
+            errors.append(f"unallowed value {value}")
+        if "min" in rules and value < rules["min"]:
+            errors.append(f"min value is {rules['min']}")
+        if (
+            "regex" in rules
+            and isinstance(value, str)
+            and not self._regex_patterns[rules["regex"]].fullmatch(value)
+        ):
+            errors.append(f"value does not match regex '{rules['regex']}'")
+
+        nested_errors: Dict[Any, List[Any]] = {}
+        if "schema" in rules and isinstance(value, dict):
+            nested_errors.update(self._document_errors(rules["schema"], value))
+        if "schema" in rules and isinstance(value, list):
+            for n, item in enumerate(value):
+                item_errors = self._field_errors(rules["schema"], item)
+                if item_errors:
+                    nested_errors[n] = item_errors
+        if isinstance(value, dict):
+            for k, v in value.items():
+                key_errors = []
+                if "keysrules" in rules:
+                    key_errors += self._field_errors(rules["keysrules"], k)
+                if "valuesrules" in rules:
+                    key_errors += self._field_errors(rules["valuesrules"], v)
+                if key_errors:
+                    nested_errors[k] = key_errors
+            nested_errors = {k: nested_errors[k] for k in sorted(nested_errors, key=str)}
+        if nested_errors:
+            errors.append(nested_errors)
+        return errors
 
     @staticmethod
-    def _format_errors(errors: Dict[str, Any], prefix: str = "") -> List[str]:
+    def _format_errors(
+        errors: Dict[str, Any], prefix: str = "", schema: Dict[str, Any] = None
+    ) -> List[str]:
         """Generate human-readable error messages.
 
+        Errors within nested dictionaries that have their own schema are
+        flattened, so that they are reported against the full path to
+        the invalid key - e.g. 'batch.retries'.
+
         :param errors: Raw error output from data validation.
         :param prefix: Prefix to add to all data keys that map to an
             error, defaults to ''.
+        :param schema: The schema that the errors were generated from,
+            defaults to None.
         :return: List of formatted errors.
         """
 
         def format_error(k: str, v: Any) -> str:
-            try:
-                err_msg = f'{prefix}{k} -> {", ".join(v)}'
-            except TypeError:
-                err_msg = f"{prefix}{k} -> {json.dumps(v)}"
-            return err_msg
-
-        return [format_error(k, v) for k, v in errors.items()]
+            if isinstance(v, (list, tuple)) and all(type(e) is str for e in v):
+                return f'{prefix}{k} -> {", ".join(v)}'
+            return f"{prefix}{k} -> {json.dumps(v)}"
+
+        formatted_errors: List[str] = []
+        for k, v in errors.items():
+            field_schema = schema.get(k, {}) if schema else {}
+            if (
+                field_schema.get("type") == "dict"
+                and "schema" in field_schema
+                and isinstance(v[-1], dict)
+            ):
+                formatted_errors += DictDataValidator._format_errors(
+                    v[-1], f"{prefix}{k}.", field_schema["schema"]
+                )
+            else:
+                formatted_errors.append(format_error(k, v))
+        return formatted_errors
 
 
 class BodyworkConfig:
     """Configuration data that has been parsed and validated."""
 
+    _HEADER_SIZE_BYTES = 1024
+
     def __init__(self, config_file_path: Path, check_py_modules_exist: bool = False):
         """Constructor.
 
@@ -100,11 +225,13 @@ class BodyworkConfig:
         :raises BodyworkConfigParsingError: if config file cannot be
             parsed as valid YAML.
         """
+        import yaml
+
         try:
-            config_yaml = config_file_path.read_text(encoding="utf-8", errors="strict")
-            config = yaml.load(config_yaml, Loader=yaml.SafeLoader)
-            if type(config) is not dict:
-                raise yaml.YAMLError
+            with config_file_path.open("rb") as config_yaml:
+                config = yaml.load(config_yaml, Loader=_yaml_loader())
+            if not isinstance(config, dict):
+                raise BodyworkConfigParsingError(config_file_path)
             self._config = config
             self._config_file_path = config_file_path
             self._root_dir = config_file_path.parent
@@ -115,11 +242,97 @@ class BodyworkConfig:
         self.check_py_modules_exist = check_py_modules_exist
         self._validate_parsed_config()
 
+    @classmethod
+    def load(
+        cls, config_file_path: Path, check_py_modules_exist: bool = False
+    ) -> "BodyworkConfig":
+        """Get config from file, re-using a previously parsed config if possible.
+
+        Parsed configs are cached by file path and are only re-parsed if
+        the file's modification time or size has changed since it was
+        last parsed. At most _CONFIG_CACHE_MAXSIZE configs are kept. Before
+        a full parse, the schema version in the file's header is checked,
+        so that incompatible files are rejected cheaply. Each caller gets
+        its own copy of the config, so modifying it will not affect other
+        callers.
+
+        :param config_file_path: Config file path.
+        :param check_py_modules_exist: Whether to check that the
+            executable Python modules specified in stage configs, exist.
+        :raises BodyworkConfigFileExistsError: if config_file_path does
+            not exist.
+        :raises BodyworkConfigVersionMismatchError: if config file
+            schema version does not match the schema version supported
+            by the current Bodywork version.
+        :return: Parsed and validated config.
+        """
+        try:
+            file_stats = config_file_path.stat()
+        except (FileNotFoundError, NotADirectoryError):
+            raise BodyworkConfigFileExistsError(config_file_path)
+        cache_key = (str(config_file_path.absolute()), check_py_modules_exist)
+        cached = _CONFIG_CACHE.get(cache_key)
+        if cached and cached[:2] == (file_stats.st_mtime_ns, file_stats.st_size):
+            return deepcopy(cached[2])
+        cls.quick_version_check(config_file_path)
+        config = cls(config_file_path, check_py_modules_exist)
+        _CONFIG_CACHE.pop(cache_key, None)
+        if len(_CONFIG_CACHE) >= _CONFIG_CACHE_MAXSIZE:
+            del _CONFIG_CACHE[next(iter(_CONFIG_CACHE))]
+        _CONFIG_CACHE[cache_key] = (
+            file_stats.st_mtime_ns,
+            file_stats.st_size,
+            config,
+        )
+        return deepcopy(config)
+
+    @classmethod
+    def quick_version_check(cls, config_file_path: Path) -> None:
+        """Reject a config file with a mismatched schema version.
+
+        Only the header of the file is parsed, making this a cheap way
+        to discard incompatible config files (e.g. when scanning a repo
+        for candidate configs), before paying for a full parse and
+        validation. If the version cannot be found in the header, then
+        no error is raised and the full parse should be relied upon.
+
+        :param config_file_path: Config file path.
+        :raises BodyworkConfigFileExistsError: if config_file_path does
+            not exist.
+        :raises BodyworkConfigVersionMismatchError: if config file
+            schema version does not match the schema version supported
+            by the current Bodywork version.
+        """
+        import yaml
+
+        try:
+            with config_file_path.open("rb") as config_yaml:
+                header = config_yaml.read(cls._HEADER_SIZE_BYTES)
+        except (FileNotFoundError, IsADirectoryError):
+            raise BodyworkConfigFileExistsError(config_file_path)
+        header = header[: header.rfind(b"\n") + 1]
+        try:
+            config = yaml.load(header, Loader=_yaml_loader())
+        except yaml.YAMLError:
+            return
+        if not isinstance(config, dict):
+            return
+        version = config.get("version")
+        if (
+            isinstance(version, str)
+            and len(version.split(".")) == 2
+            and version != BODYWORK_CONFIG_VERSION
+        ):
+            raise BodyworkConfigVersionMismatchError(version)
+
     def _validate_parsed_config(self) -> None:
         """Validate configuration parameters.
 
         This function exists separately to the class constructor purely
-        to facilitate easier testing.
+        to facilitate easier testing. The schema version is checked before
+        any section is validated and the existence of executable modules
+        is only checked once all other validation has passed, so that
+        configs that will be rejected anyway fail as cheaply as possible.
 
         :raises BodyworkConfigMissingSectionError: if config file does
             not contain all of the following sections: version,
@@ -131,17 +344,11 @@ class BodyworkConfig:
             parameter is missing or has been set to an invalid value.
         """
         config = self._config
-        missing_config_sections = []
-        if "version" not in config:
-            missing_config_sections.append("version")
-        if "pipeline" not in config:
-            missing_config_sections.append("pipeline")
-        if "stages" not in config:
-            missing_config_sections.append("stages")
-        if "logging" not in config:
-            missing_config_sections.append("logging")
+        missing_config_sections = set(CONFIG_SECTIONS) - config.keys()
         if missing_config_sections:
-            raise BodyworkConfigMissingSectionError(missing_config_sections)
+            raise BodyworkConfigMissingSectionError(
+                [s for s in CONFIG_SECTIONS if s in missing_config_sections]
+            )
 
         try:
             if len(config["version"].split(".")) != 2:
@@ -151,59 +358,70 @@ class BodyworkConfig:
         except (AttributeError, ValueError):
             raise BodyworkConfigValidationError(["version"])
 
-        missing_or_invalid_param: List[str] = []
+        error_groups: List[Sequence[str]] = []
         try:
             self.pipeline = PipelineConfig(config["pipeline"])
         except BodyworkConfigValidationError as e:
-            missing_or_invalid_param += e.missing_params
+            error_groups.append(e.missing_params)
 
         try:
             self.logging = LoggingConfig(config["logging"])
         except BodyworkConfigValidationError as e:
-            missing_or_invalid_param += e.missing_params
+            error_groups.append(e.missing_params)
+
+        stage_errors: List[str] = []
 
         try:
             self.stages: Dict[str, StageConfig] = {}
             for stage_name, stage_config in config["stages"].items():
-                if "batch" in stage_config and "service" in stage_config:
-                    missing_or_invalid_param.append(
+                has_batch = "batch" in stage_config
+                has_service = "service" in stage_config
+                if isinstance(stage_name, str):
+                    stage_name = name = sys.intern(stage_name)
+                else:
+                    name = str(stage_name)
+                if has_batch and has_service:
+                    stage_errors.append(
                         f"stages.{stage_name}.batch/service"
                     )
                     continue
-                elif "batch" in stage_config:
+                elif has_batch:
                     self.stages[stage_name] = BatchStageConfig(
-                        str(stage_name), stage_config, self._root_dir
+                        name, stage_config, self._root_dir
                     )
-                elif "service" in stage_config:
+                elif has_service:
                     self.stages[stage_name] = ServiceStageConfig(
-                        str(stage_name), stage_config, self._root_dir
+                        name, stage_config, self._root_dir
                     )
                 else:
-                    missing_or_invalid_param.append(
-                        f"stages.{stage_name}.batch/service"
-                    )
+                    stage_errors.append(f"stages.{stage_name}.batch/service")
         except AttributeError:
-            missing_or_invalid_param.append("stages._ - no stage configs provided")
+            stage_errors.append("stages._ - no stage configs provided")
+        error_groups.append(stage_errors)
 
-        stages_in_workflow_without_valid_config = _check_workflow_stages_are_configured(
-            self.pipeline.workflow, self.stages.keys()
+        stage_names = frozenset(self.stages)
+        error_groups.append(
+            _check_workflow_stages_are_configured(self.pipeline.workflow, stage_names)
         )
-        missing_or_invalid_param += stages_in_workflow_without_valid_config
         if self.pipeline.run_on_failure:
-            if self.pipeline.run_on_failure not in self.stages.keys():
-                missing_or_invalid_param.append(
-                    f"pipeline.run_on_failure -> cannot find valid stage: "
-                    f"{self.pipeline.run_on_failure} to run on workflow failure."
+            if self.pipeline.run_on_failure not in stage_names:
+                error_groups.append(
+                    [
+                        f"pipeline.run_on_failure -> cannot find valid stage: "
+                        f"{self.pipeline.run_on_failure} to run on workflow failure."
+                    ]
                 )
-        if self.check_py_modules_exist:
-            for stage_name, stage in self.stages.items():
-                if not stage.executable_module_path.exists():
-                    missing_or_invalid_param.append(
-                        f"stages.{stage_name}.executable_module_path -> does not exist"
-                    )
+        if self.check_py_modules_exist and not any(error_groups):
+            error_groups.append(
+                [
+                    f"stages.{stage_name}.executable_module_path -> does not exist"
+                    for stage_name, stage in self.stages.items()
+                    if not stage.executable_module_path.exists()
+                ]
+            )
 
+        missing_or_invalid_param = sorted(chain.from_iterable(error_groups))
         if missing_or_invalid_param:
-            missing_or_invalid_param.sort()
             raise BodyworkConfigValidationError(missing_or_invalid_param)
 
 
@@ -316,6 +534,18 @@ class StageConfig:
         },
     }
 
+    SCHEMA = SCHEMA_GENERIC
+
+    _validator = DictDataValidator(SCHEMA)
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        """Build the data validator for a stage type's schema, once.
+
+        :param kwargs: Keyword arguments passed to the parent class.
+        """
+        super().__init_subclass__(**kwargs)
+        cls._validator = DictDataValidator(cls.SCHEMA)
+
     def __init__(self, stage_name: str, config: Dict[str, Any], root_dir: Path):
         """Constructor.
 
@@ -324,8 +554,7 @@ class StageConfig:
         :param root_dir: The root directory of the pipeline containing
             the bodywork config file and the stage directories.
         """
-        data_validator = DictDataValidator(self.SCHEMA_GENERIC)
-        self._missing_or_invalid_param = data_validator.find_errors_in(
+        self._missing_or_invalid_param = self._validator.find_errors_in(
             config, prefix=f"stages.{stage_name}."
         )
         if not self._missing_or_invalid_param:
@@ -339,10 +568,10 @@ class StageConfig:
                 config["requirements"] if "requirements" in config else []
             )
             if "secrets" in config:
-                self.env_vars_from_secrets = [
-                    (secret_name, secret_key)
-                    for secret_key, secret_name in config["secrets"].items()
-                ]
+                secrets = config["secrets"]
+                self.env_vars_from_secrets = list(
+                    zip(secrets.values(), secrets.keys())
+                )
             else:
                 self.env_vars_from_secrets = []
 
@@ -365,6 +594,11 @@ class BatchStageConfig(StageConfig):
         "retries": {"type": "integer", "required": True, "min": 0},
     }
 
+    SCHEMA = {
+        **StageConfig.SCHEMA_GENERIC,
+        "batch": {"type": "dict", "required": True, "schema": SCHEMA_BATCH},
+    }
+
     def __init__(self, stage_name: str, config: Dict[str, Any], root_dir: Path):
         """Constructor.
 
@@ -376,12 +610,8 @@ class BatchStageConfig(StageConfig):
             required configuration parameters are missing or invalid.
         """
         super().__init__(stage_name, config, root_dir)
-        batch_config = config["batch"]
-        data_validator = DictDataValidator(self.SCHEMA_BATCH)
-        self._missing_or_invalid_param += data_validator.find_errors_in(
-            batch_config, prefix=f"stages.{stage_name}.batch."
-        )
         if not self._missing_or_invalid_param:
+            batch_config = config["batch"]
             self.max_completion_time = batch_config["max_completion_time_seconds"]
             self.retries = batch_config["retries"]
         else:
@@ -401,6 +631,11 @@ class ServiceStageConfig(StageConfig):
         },
     }
 
+    SCHEMA = {
+        **StageConfig.SCHEMA_GENERIC,
+        "service": {"type": "dict", "required": True, "schema": SCHEMA_SERVICE},
+    }
+
     def __init__(self, stage_name: str, config: Dict[str, Any], root_dir: Path) -> None:
         """Constructor.
 
@@ -412,12 +647,8 @@ class ServiceStageConfig(StageConfig):
             required configuration parameters are missing or invalid.
         """
         super().__init__(stage_name, config, root_dir)
-        service_config = config["service"]
-        data_validator = DictDataValidator(self.SCHEMA_SERVICE)
-        self._missing_or_invalid_param += data_validator.find_errors_in(
-            service_config, prefix=f"stages.{stage_name}.service."
-        )
         if not self._missing_or_invalid_param:
+            service_config = config["service"]
             self.max_startup_time = service_config["max_startup_time_seconds"]
             self.replicas = service_config["replicas"]
             self.port = service_config["port"]
@@ -426,6 +657,20 @@ class ServiceStageConfig(StageConfig):
             raise BodyworkConfigValidationError(self._missing_or_invalid_param)
 
 
+def _yaml_loader() -> Any:
+    """Get the fastest safe YAML loader available.
+
+    PyYAML is imported on first use, so that code paths that never parse
+    a config file do not pay the cost of importing it.
+
+    :return: The libyaml-backed safe loader if PyYAML was built with it,
+        otherwise the pure-Python safe loader.
+    """
+    import yaml
+
+    return getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+
 def _parse_dag_definition(dag_definition: str) -> DAG:
     """Parse DAG definition string.
 
@@ -436,13 +681,12 @@ def _parse_dag_definition(dag_definition: str) -> DAG:
         pipeline stage names (containing a list of stages to run in each
         step).
     """
-    steps = dag_definition.replace(" ", "").split(">>")
-    stages_in_steps = [step.split(",") for step in steps]
+    stages_in_steps = [
+        [sys.intern(stage.strip()) for stage in step.split(",")]
+        for step in dag_definition.split(">>")
+    ]
     steps_with_null_stages = [
-        str(n)
-        for n, step in enumerate(stages_in_steps, start=1)
-        for stage in step
-        if stage == ""
+        str(n) for n, step in enumerate(stages_in_steps, start=1) if "" in step
     ]
     if len(steps_with_null_stages) > 0:
         msg = (
@@ -460,12 +704,16 @@ def _check_workflow_stages_are_configured(
 
     :param workflow: A pipeline DAG parsed into a Bodywork workflow.
     :param stages: List of stages that have been configured.
-    :return: List of missing stage messages.
+    :return: List of missing stage messages, with one message for each
+        missing stage no matter how many steps it appears in.
     """
-    stages_in_workflow = [stage for step in workflow for stage in step]
+    configured_stages = (
+        stages if isinstance(stages, (set, frozenset)) else frozenset(stages)
+    )
+    stages_in_workflow = dict.fromkeys(stage for step in workflow for stage in step)
     missing_stages = [
         f"pipeline.workflow -> cannot find valid stage @ stages.{stage}"
         for stage in stages_in_workflow
-        if stage not in stages
+        if stage not in configured_stages
     ]
     return missing_stages
@@ -20,13 +20,21 @@ across all modules and tests as required. Constants should not be
 defined within separate modules as this can lead to duplications and
 inconsistencies.
 """
-import pkg_resources
 from pathlib import Path
 
+try:
+    from importlib.metadata import version as _package_version
+except ImportError:  # Python 3.7 - importing pkg_resources is much slower
+    import pkg_resources
+
+    def _package_version(distribution_name: str) -> str:
+        return str(pkg_resources.get_distribution(distribution_name).version)
+
+
 BODYWORK_CONFIG_VERSION = "1.1"
 BODYWORK_DOCKERHUB_IMAGE_REPO = "bodyworkml/bodywork-core"
 BODYWORK_DOCKER_IMAGE = f"{BODYWORK_DOCKERHUB_IMAGE_REPO}:latest"
-BODYWORK_VERSION = pkg_resources.get_distribution("bodywork").version
+BODYWORK_VERSION = _package_version("bodywork")
 BODYWORK_WORKFLOW_CLUSTER_ROLE = "bodywork-workflow-controller"
 BODYWORK_WORKFLOW_SERVICE_ACCOUNT = "bodywork-workflow-controller"
 BODYWORK_WORKFLOW_JOB_TIME_TO_LIVE = 15 * 60
@@ -42,13 +50,22 @@ DEFAULT_SSH_FILE = "id_bodywork"
 FAILURE_EXCEPTION_K8S_ENV_VAR = "EXCEPTION_MESSAGE"
 GIT_SSH_COMMAND = "GIT_SSH_COMMAND"
 GIT_COMMIT_HASH_K8S_ENV_VAR = "GIT_COMMIT_HASH"
+K8S_API_CONNECTION_POOL_SIZE = 32
+K8S_API_MAX_RETRIES = 5
+K8S_API_RETRY_BACKOFF_FACTOR = 0.2
+K8S_EXISTENCE_CHECK_CACHE_TTL_SECONDS = 5
+K8S_LIST_PAGE_SIZE = 500
 K8S_MAX_SURGE = 2
 K8S_MAX_UNAVAILABLE = 0
+K8S_NAMESPACE_DELETION_TIMEOUT_SECONDS = 10 * 60
+K8S_POD_LOGS_CHUNK_SIZE = 64 * 1024
 K8S_PROBE_PERIOD_SECONDS = 10
 LOG_TIME_FORMAT = "[%d/%m/%y %H:%M:%S]"
+POD_LOGS_PRINT_BATCH_SIZE = 1000
 PROJECT_CONFIG_FILENAME = "bodywork.yaml"
 SSH_DIR_NAME = ".ssh"
 SECRET_GROUP_LABEL = "group"
+SKIP_GIT_PROBE_ENV_VAR = "BODYWORK_SKIP_GIT_PROBE"
 SSH_PRIVATE_KEY_ENV_VAR = "BODYWORK_GIT_SSH_PRIVATE_KEY"
 SSH_SECRET_NAME = "ssh-git-private-key"
 TIMEOUT_GRACE_SECONDS = 90  # max time required to pull image from DockerHub and start it
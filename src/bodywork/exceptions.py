@@ -21,72 +21,111 @@ in this module to make them easier to locate when importing the package
 externally.
 """
 from pathlib import Path
-from typing import Iterable, Sequence
+from subprocess import CalledProcessError
+from typing import Any, Iterable, Union
 
 from kubernetes.client import V1Job
 
 from .constants import BODYWORK_VERSION, BODYWORK_CONFIG_VERSION
 
 
-class BodyworkClusterResourcesError(Exception):
+class _DeferredMessageError(Exception):
+    """Base for exceptions that format their message only when rendered.
+
+    Subclasses keep the values needed to build their message as
+    attributes and implement __str__, so that exceptions that are caught
+    and handled without ever being displayed skip the formatting work.
+    """
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({str(self)!r})"
+
+
+class BodyworkClusterResourcesError(_DeferredMessageError):
     def __init__(self, resource_type: str, resource_names: Iterable[str]):
-        msg = (
-            f"Inadequate cluster cpu and/or memory available to start {resource_type}s "
-            f"({','.join(resource_names)})"
+        self.resource_type = resource_type
+        self.resource_names = tuple(resource_names)
+        super().__init__(resource_type, self.resource_names)
+
+    def __str__(self) -> str:
+        return (
+            f"Inadequate cluster cpu and/or memory available to start "
+            f"{self.resource_type}s ({','.join(self.resource_names)})"
         )
-        super().__init__(msg)
 
 
-class BodyworkJobFailure(Exception):
+class BodyworkJobFailure(_DeferredMessageError):
     def __init__(self, failed_jobs: Iterable[V1Job]):
-        failed_jobs_msg = [
-            f"job={job.metadata.name} in namespace={job.metadata.namespace}"
-            for job in failed_jobs
-        ]
-        msg = f'{"; ".join(failed_jobs_msg)} have failed'
-        super().__init__(msg)
+        self.failed_jobs = tuple(failed_jobs)
+        super().__init__(self.failed_jobs)
+
+    def __str__(self) -> str:
+        failed_jobs_msg = "; ".join(
+            "job=%s in namespace=%s" % (job.metadata.name, job.metadata.namespace)
+            for job in self.failed_jobs
+        )
+        return f"{failed_jobs_msg} have failed"
 
 
-class BodyworkConfigError(Exception):
+class BodyworkConfigError(_DeferredMessageError):
     pass
 
 
 class BodyworkConfigFileExistsError(BodyworkConfigError):
     def __init__(self, config_file_path: Path):
-        msg = f"No config file found at {config_file_path}"
-        super().__init__(msg)
+        super().__init__(config_file_path)
+        self.config_file_path = config_file_path
+
+    def __str__(self) -> str:
+        return f"No config file found at {self.config_file_path}"
 
 
 class BodyworkConfigParsingError(BodyworkConfigError):
     def __init__(self, config_file_path: Path):
-        msg = f"Cannot parse YAML from {config_file_path}"
-        super().__init__(msg)
+        super().__init__(config_file_path)
+        self.config_file_path = config_file_path
+
+    def __str__(self) -> str:
+        return f"Cannot parse YAML from {self.config_file_path}"
 
 
 class BodyworkConfigMissingSectionError(BodyworkConfigError):
-    def __init__(self, missing_sections: Sequence[str]):
-        msg = f'Bodywork config file missing sections: {", ".join(missing_sections)}'
-        super().__init__(msg)
+    def __init__(self, missing_sections: Iterable[str]):
+        self.missing_sections = tuple(missing_sections)
+        super().__init__(self.missing_sections)
+
+    def __str__(self) -> str:
+        return (
+            f"Bodywork config file missing sections: "
+            f'{", ".join(self.missing_sections)}'
+        )
 
 
 class BodyworkConfigValidationError(BodyworkConfigError):
-    def __init__(self, missing_params: Sequence[str]):
-        self.missing_params = missing_params
-        msg = (
+    def __init__(self, missing_params: Iterable[str]):
+        self.missing_params = tuple(missing_params)
+        super().__init__(self.missing_params)
+
+    def __str__(self) -> str:
+        return (
             f"Bodywork config missing or invalid parameters: "
-            f'{", ".join(missing_params)}'
+            f'{", ".join(self.missing_params)}'
         )
-        super().__init__(msg)
 
 
 class BodyworkConfigVersionMismatchError(BodyworkConfigError):
+    _MSG_TEMPLATE = (
+        "Bodywork config file has schema version %s, when Bodywork "
+        f"version {BODYWORK_VERSION} requires schema version "
+        f"{BODYWORK_CONFIG_VERSION}"
+    )
+
     def __init__(self, version: str):
-        msg = (
-            f"Bodywork config file has schema version {version}, when Bodywork "
-            f"version {BODYWORK_VERSION} requires schema version "
-            f"{BODYWORK_CONFIG_VERSION}"
-        )
-        super().__init__(msg)
+        super().__init__(version)
+        self.version = version
+
+    def __str__(self) -> str:
+        return self._MSG_TEMPLATE % (self.version,)
 
 
 class BodyworkWorkflowExecutionError(Exception):
@@ -94,10 +133,17 @@ class BodyworkWorkflowExecutionError(Exception):
         super().__init__(msg)
 
 
-class BodyworkStageFailure(Exception):
-    def __init__(self, stage_name: str, info: str):
-        msg = f"Stage {stage_name} failed - {info}"
-        super().__init__(msg)
+class BodyworkStageFailure(_DeferredMessageError):
+    def __init__(self, stage_name: str, info: Union[str, BaseException]):
+        super().__init__(stage_name, info)
+        self.stage_name = stage_name
+        self.info = info
+        if isinstance(info, BaseException):
+            self.__cause__ = info
+
+    def __str__(self) -> str:
+        info = repr(self.info) if isinstance(self.info, BaseException) else self.info
+        return f"Stage {self.stage_name} failed - {info}"
 
 
 class BodyworkNamespaceError(Exception):
@@ -110,6 +156,20 @@ class BodyworkDockerImageError(Exception):
         super().__init__(msg)
 
 
-class BodyworkGitError(Exception):
-    def __init__(self, msg: str) -> None:
-        super().__init__(msg)
+class BodyworkGitError(_DeferredMessageError):
+    def __init__(self, msg: str, *msg_args: Any) -> None:
+        super().__init__(msg, *msg_args)
+        self.msg = msg
+        self.msg_args = msg_args
+
+    def __str__(self) -> str:
+        return self.msg % self.msg_args if self.msg_args else self.msg
+
+    @classmethod
+    def from_clone_failure(cls, error: CalledProcessError) -> "BodyworkGitError":
+        """Create an exception for a failed call to 'git clone'.
+
+        :param error: The exception raised by the failed subprocess.
+        :return: A BodyworkGitError that reports the command and stderr.
+        """
+        return cls("Git clone failed - calling %s returned %s", error.cmd, error.stderr)
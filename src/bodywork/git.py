@@ -19,11 +19,15 @@ This module contains functions for downloading Bodywork projects from
 Git repositories.
 """
 import os
-import re
+from base64 import b64decode, b64encode
 from enum import Enum
+from functools import lru_cache
+from hashlib import sha256
+from logging import Logger
 from pathlib import Path
+from shutil import which
 from subprocess import run, CalledProcessError, DEVNULL, PIPE
-from urllib.parse import urlparse
+from typing import Dict, Optional, Tuple
 
 from .exceptions import BodyworkGitError
 from .constants import (
@@ -36,10 +40,14 @@ from .constants import (
     AZURE_SSH_FINGERPRINT,
     GIT_SSH_COMMAND,
     DEFAULT_SSH_FILE,
+    SKIP_GIT_PROBE_ENV_VAR,
 )
 from .logs import bodywork_log_factory
 
-_log = bodywork_log_factory()
+_KNOWN_HOSTS_CACHE: Dict[Path, Tuple[int, int, str]] = {}
+_SSH_PUBLIC_KEY_CACHE: Dict[str, str] = {}
+_GIT_SSH_COMMAND_CACHE: Dict[Path, str] = {}
+_CONFIGURED_KNOWN_HOSTS: Dict[Tuple[Path, str], Tuple[int, int]] = {}
 
 
 def download_project_code_from_repo(
@@ -50,6 +58,10 @@ def download_project_code_from_repo(
 ) -> None:
     """Download Bodywork project code from Git repository,
 
+    Setting the BODYWORK_SKIP_GIT_PROBE environment variable to '1',
+    'true' or 'yes' skips the check for git being available - e.g. in
+    images where it always is.
+
     :param url: Git repository URL.
     :param branch: The Git branch to download, defaults to 'master'.
     :param destination: The name of the directory int which the
@@ -58,13 +70,11 @@ def download_project_code_from_repo(
     :raises BodyworkGitError: If Git is not available on the system or the
         Git repository cannot be accessed.
     """
-    try:
-        run(["git", "--version"], check=True, stdout=DEVNULL)
-    except CalledProcessError:
+    if not _skip_git_probe() and not _git_available():
         raise BodyworkGitError("git is not available")
     try:
         if get_connection_protocol(url) is ConnectionProtocol.SSH:
-            hostname = urlparse(f"ssh://{url}").hostname
+            hostname = _extract_ssh_hostname(url)
             if hostname:
                 setup_ssh_for_git_host(hostname, ssh_key_path)
             else:
@@ -72,8 +82,9 @@ def download_project_code_from_repo(
                     f"Unable to derive hostname from URL {url}. Please check "
                 )
     except Exception as e:
-        msg = f"Unable to setup SSH for Git and you are trying to connect via SSH: {e}"
-        raise BodyworkGitError(msg)
+        raise BodyworkGitError(
+            "Unable to setup SSH for Git and you are trying to connect via SSH: %s", e
+        ) from e
     try:
         if branch:
             git_cmd = [
@@ -89,8 +100,37 @@ def download_project_code_from_repo(
             git_cmd = ["git", "clone", "--single-branch", url, str(destination)]
         run(git_cmd, check=True, encoding="utf-8", stdout=DEVNULL, stderr=PIPE)
     except CalledProcessError as e:
-        msg = f"Git clone failed - calling {e.cmd} returned {e.stderr}"
-        raise BodyworkGitError(msg)
+        raise BodyworkGitError.from_clone_failure(e) from e
+
+
+@lru_cache(maxsize=1)
+def _get_log() -> Logger:
+    """Get the Bodywork logger, creating it on first use.
+
+    :return: The Bodywork logger.
+    """
+    return bodywork_log_factory()
+
+
+@lru_cache(maxsize=1)
+def _git_available() -> bool:
+    """Check whether the git executable can be found on the system path.
+
+    The result is cached, so the path is only searched once per process.
+
+    :return: True if git is available, otherwise False.
+    """
+    return which("git") is not None
+
+
+def _skip_git_probe() -> bool:
+    """Has the check for git being available been disabled.
+
+    :return: True if the BODYWORK_SKIP_GIT_PROBE environment variable is
+        set to '1', 'true' or 'yes' (in any case), otherwise False.
+    """
+    value = os.environ.get(SKIP_GIT_PROBE_ENV_VAR, "")
+    return value.strip().lower() in ("1", "true", "yes")
 
 
 class ConnectionProtocol(Enum):
@@ -101,6 +141,13 @@ class ConnectionProtocol(Enum):
     SSH = "ssh"
 
 
+_CONNECTION_PROTOCOL_PREFIXES = (
+    ("https://", ConnectionProtocol.HTTPS),
+    ("git@", ConnectionProtocol.SSH),
+    ("file://", ConnectionProtocol.FILE),
+)
+
+
 def get_connection_protocol(connection_string: str) -> ConnectionProtocol:
     """Derive connection protocol used to retrieve Git repo.
 
@@ -110,18 +157,26 @@ def get_connection_protocol(connection_string: str) -> ConnectionProtocol:
         identified or is not supported.
     :return: The connection protocol type.
     """
-    if re.match("^https://", connection_string):
-        return ConnectionProtocol.HTTPS
-    elif re.match("^git@", connection_string):
-        return ConnectionProtocol.SSH
-    elif re.match("^file://", connection_string):
-        return ConnectionProtocol.FILE
-    else:
-        msg = (
-            f"cannot identify connection protocol in {connection_string}"
-            f"- currently, there is only support for HTTPS and SSH"
-        )
-        raise RuntimeError(msg)
+    for prefix, protocol in _CONNECTION_PROTOCOL_PREFIXES:
+        if connection_string.startswith(prefix):
+            return protocol
+    msg = (
+        f"cannot identify connection protocol in {connection_string}"
+        f"- currently, there is only support for HTTPS and SSH"
+    )
+    raise RuntimeError(msg)
+
+
+def _extract_ssh_hostname(url: str) -> Optional[str]:
+    """Get the hostname from an SSH Git URL - e.g. git@github.com:org/repo.git.
+
+    :param url: Git repository URL.
+    :return: The lower-cased hostname, or None if one cannot be found.
+    """
+    if not url.startswith("git@"):
+        return None
+    hostname = url[4:].partition(":")[0].partition("/")[0]
+    return hostname.lower() or None
 
 
 def setup_ssh_for_git_host(hostname: str, ssh_key_path: str = None) -> None:
@@ -135,18 +190,16 @@ def setup_ssh_for_git_host(hostname: str, ssh_key_path: str = None) -> None:
     :param hostname: Hostname to SSH to.
     :param ssh_key_path: SSH key file to use.
     """
-    ssh_dir = Path.home() / SSH_DIR_NAME
+    ssh_dir, default_private_key, known_hosts = _ssh_paths(Path.home())
     if SSH_PRIVATE_KEY_ENV_VAR in os.environ:
-        _log.info("Using SSH key from environment variable.")
+        _get_log().info("Using SSH key from environment variable.")
         try:
-            private_key = ssh_dir / DEFAULT_SSH_FILE
+            private_key = default_private_key
             ssh_dir.mkdir(mode=0o700, exist_ok=True)
-            private_key.touch(0o700, exist_ok=True)
             key = os.environ[SSH_PRIVATE_KEY_ENV_VAR]
-            if key[-1] != "\n":
+            if not key.endswith("\n"):
                 key = f"{key}\n"
-            with Path(private_key).open(mode="w", newline="\n") as file_handle:
-                file_handle.write(key)
+            _write_user_only_file(private_key, key.encode("utf-8"))
         except OSError as e:
             raise RuntimeError(
                 f"Unable to create private key {private_key} from"
@@ -161,40 +214,113 @@ def setup_ssh_for_git_host(hostname: str, ssh_key_path: str = None) -> None:
         msg = f"Failed to setup SSH for {hostname} - cannot find SSH keys or {SSH_PRIVATE_KEY_ENV_VAR} environment variable."  # noqa
         raise RuntimeError(msg)
 
-    _configure_known_hosts(hostname, ssh_dir)
-    os.environ[GIT_SSH_COMMAND] = f"ssh -i '{private_key}'" f" -o IdentitiesOnly=yes"
+    _configure_known_hosts(hostname, known_hosts)
+    git_ssh_command = _GIT_SSH_COMMAND_CACHE.get(private_key)
+    if git_ssh_command is None:
+        git_ssh_command = f"ssh -i '{private_key}' -o IdentitiesOnly=yes"
+        _GIT_SSH_COMMAND_CACHE[private_key] = git_ssh_command
+    if os.environ.get(GIT_SSH_COMMAND) != git_ssh_command:
+        os.environ[GIT_SSH_COMMAND] = git_ssh_command
+
+
+@lru_cache(maxsize=1)
+def _ssh_paths(home_dir: Path) -> Tuple[Path, Path, Path]:
+    """Get the paths used to configure SSH for a home directory.
+
+    :param home_dir: The current user's home directory.
+    :return: The SSH directory, the default private key path and the
+        known_hosts path.
+    """
+    ssh_dir = home_dir / SSH_DIR_NAME
+    return ssh_dir, ssh_dir / DEFAULT_SSH_FILE, ssh_dir / "known_hosts"
+
 
+def _configure_known_hosts(hostname: str, known_hosts: Path) -> None:
+    """Make sure that the known_hosts file contains the host's public key.
 
-def _configure_known_hosts(hostname, ssh_dir):
+    Hosts that have been configured are remembered, until the known_hosts
+    file's modification time or size changes (or it is removed).
+
+    :param hostname: Hostname to add to the known_hosts file.
+    :param known_hosts: Path to the known_hosts file.
+    :raises RuntimeError: If the known_hosts file cannot be updated.
+    """
+    configured = _CONFIGURED_KNOWN_HOSTS.get((known_hosts, hostname))
+    if configured is not None and configured == _file_signature(known_hosts):
+        return
     try:
-        known_hosts = ssh_dir / "known_hosts"
         if not known_hosts.exists():
-            known_hosts.touch(0o700, exist_ok=False)
-            known_hosts.write_text(get_ssh_public_key_from_domain(hostname))
+            server_key = get_ssh_public_key_from_domain(hostname).encode("utf-8")
+            _write_user_only_file(known_hosts, server_key, exclusive=True)
         elif not known_hosts_contains_domain_key(hostname, known_hosts):
-            with known_hosts.open(mode="a") as file_handle:
-                file_handle.write(get_ssh_public_key_from_domain(hostname))
+            server_key = get_ssh_public_key_from_domain(hostname).encode("utf-8")
+            with known_hosts.open(mode="ab") as file_handle:
+                file_handle.write(server_key)
     except OSError as e:
         raise RuntimeError(
             f"Error updating known hosts with public key from {hostname}."
         ) from e
+    _CONFIGURED_KNOWN_HOSTS[(known_hosts, hostname)] = _file_signature(known_hosts)
+
+
+def _file_signature(path: Path) -> Optional[Tuple[int, int]]:
+    """Get the modification time and size of a file.
+
+    :param path: Path to the file.
+    :return: The modification time (in ns) and size of the file, or None
+        if the file does not exist.
+    """
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _write_user_only_file(path: Path, content: bytes, exclusive: bool = False) -> None:
+    """Write a file that only the current user can read and write.
+
+    The file is created with 0o600 permissions and written using a single
+    open call.
+
+    :param path: Path to the file.
+    :param content: Bytes to write to the file.
+    :param exclusive: Fail if the file already exists, instead of
+        truncating it, defaults to False.
+    """
+    flags = os.O_WRONLY | os.O_CREAT | (os.O_EXCL if exclusive else os.O_TRUNC)
+    fd = os.open(path, flags, 0o600)
+    try:
+        os.write(fd, content)
+    finally:
+        os.close(fd)
 
 
 def known_hosts_contains_domain_key(hostname: str, known_hosts_filepath: Path) -> bool:
     """Checks to see if the host is in the list of keys in the known_hosts file.
 
+    File contents are cached and only re-read when the file's modification
+    time or size changes.
+
     :param known_hosts_filepath: path to known_hosts file
     :param hostname: Hostname to check for.
     :return: bool if the hostname is in the file
     """
-    return hostname in known_hosts_filepath.read_text()
+    stat = known_hosts_filepath.stat()
+    cached = _KNOWN_HOSTS_CACHE.get(known_hosts_filepath)
+    if cached is None or cached[:2] != (stat.st_mtime_ns, stat.st_size):
+        cached = (stat.st_mtime_ns, stat.st_size, known_hosts_filepath.read_text())
+        _KNOWN_HOSTS_CACHE[known_hosts_filepath] = cached
+    return hostname in cached[2]
 
 
 def get_ssh_public_key_from_domain(hostname: str) -> str:
     """Gets the public key from the host and checks the fingerprint.
 
-     Output from ssh-keyscan is piped into ssh-keygen by setting the input in
-      conjunction with the trailing '-' in the command.
+    The key is retrieved with ssh-keyscan and its fingerprint is computed
+    in-process, in the same format as 'ssh-keygen -l', so that only one
+    subprocess is needed. Keys that pass the fingerprint check are cached,
+    so each host is only scanned once.
 
     :param hostname: Name of host to retrieve the key from e.g. Gitlab.com
     :return: The public SSH Key of the host.
@@ -205,6 +331,8 @@ def get_ssh_public_key_from_domain(hostname: str) -> str:
         "bitbucket.org": BITBUCKET_SSH_FINGERPRINT,
         "ssh.dev.azure.com": AZURE_SSH_FINGERPRINT,
     }
+    if hostname in _SSH_PUBLIC_KEY_CACHE:
+        return _SSH_PUBLIC_KEY_CACHE[hostname]
     if hostname in fingerprints:
         try:
             server_key = run(
@@ -213,29 +341,60 @@ def get_ssh_public_key_from_domain(hostname: str) -> str:
                 capture_output=True,
                 encoding="utf-8",
             ).stdout
-            fingerprint = run(
-                ["ssh-keygen", "-l", "-f", "-"],
-                check=True,
-                capture_output=True,
-                encoding="utf-8",
-                input=server_key,
-            ).stdout.strip()
-            if fingerprint == fingerprints.get(hostname):
-                return server_key
-            else:
-                raise ConnectionAbortedError(
-                    f"SECURITY ALERT! SSH Fingerprint received from server does not "
-                    f"match the fingerprint for {hostname}. Please check and ensure"
-                    f" that {hostname} is not being impersonated"
-                )
         except CalledProcessError as e:
             raise RuntimeError(
                 f"Unable to retrieve public SSH key from {hostname}: {e.stdout} {e.stderr}"  # noqa
             )
+        try:
+            fingerprint = _rsa_host_key_fingerprint(server_key)
+        except (ValueError, IndexError) as e:
+            raise RuntimeError(
+                f"Unable to read public SSH key retrieved from {hostname}: {e}"
+            )
+        if fingerprint == fingerprints.get(hostname):
+            _SSH_PUBLIC_KEY_CACHE[hostname] = server_key
+            return server_key
+        else:
+            raise ConnectionAbortedError(
+                f"SECURITY ALERT! SSH Fingerprint received from server does not "
+                f"match the fingerprint for {hostname}. Please check and ensure"
+                f" that {hostname} is not being impersonated"
+            )
     else:
         raise RuntimeError(f"{hostname} is not supported by Bodywork")
 
 
+def _rsa_host_key_fingerprint(known_hosts_entries: str) -> str:
+    """Compute the fingerprints of RSA host keys, as 'ssh-keygen -l' would.
+
+    :param known_hosts_entries: Host keys in known_hosts format, one per
+        line, as output by ssh-keyscan.
+    :raises ValueError: If there are no keys or a key cannot be decoded.
+    :return: One '<bits> SHA256:<digest> <host> (RSA)' line per key.
+    """
+    fingerprints = []
+    for entry in known_hosts_entries.splitlines():
+        if not entry.strip() or entry.startswith("#"):
+            continue
+        host, _, key_base64 = entry.split()[:3]
+        key_blob = b64decode(key_base64, validate=True)
+        fields = []
+        offset = 0
+        while offset < len(key_blob):
+            start = offset + 4
+            length = int.from_bytes(key_blob[offset:start], "big")
+            offset = start + length
+            fields.append(key_blob[start:offset])
+        if len(fields) != 3 or fields[0] != b"ssh-rsa" or offset != len(key_blob):
+            raise ValueError(f"{host} key is not a valid RSA public key")
+        key_bits = int.from_bytes(fields[2], "big").bit_length()
+        digest = b64encode(sha256(key_blob).digest()).decode("ascii").rstrip("=")
+        fingerprints.append(f"{key_bits} SHA256:{digest} {host} (RSA)")
+    if not fingerprints:
+        raise ValueError("no public keys found")
+    return "\n".join(fingerprints)
+
+
 def get_git_commit_hash(project_path: Path = DEFAULT_PROJECT_DIR) -> str:
     """Retrieves the Git commit hash.
 
@@ -247,15 +406,27 @@ def get_git_commit_hash(project_path: Path = DEFAULT_PROJECT_DIR) -> str:
             ["git", "rev-parse", "--short", "HEAD"],
             cwd=project_path,
             check=True,
-            capture_output=True,
-            encoding="utf-8",
-        ).stdout.strip()
-        return result
+            stdout=PIPE,
+            stderr=PIPE,
+        ).stdout
+        return result.decode("utf-8").strip()
     except CalledProcessError as e:
         raise BodyworkGitError(
-            f"Unable to retrieve git commit hash: {e.stdout} {e.stderr}"
+            f"Unable to retrieve git commit hash: "
+            f"{_decode_output(e.stdout)} {_decode_output(e.stderr)}"
         ) from e
     except OSError as e:
         raise BodyworkGitError(
             f"Unable to retrieve git commit hash, path: {project_path} is invalid - {e}"
         ) from e
+
+
+def _decode_output(output: Optional[bytes]) -> Optional[str]:
+    """Decode raw output captured from a subprocess.
+
+    :param output: Bytes captured from stdout or stderr, if any.
+    :return: The decoded output, or None if nothing was captured.
+    """
+    if output is None:
+        return None
+    return output.decode("utf-8", "replace")
@@ -48,7 +48,7 @@ from .batch_jobs import (
     monitor_jobs_to_completion,
 )
 from .namespaces import namespace_exists, create_namespace, delete_namespace
-from .pod_logs import get_latest_pod_name, get_pod_logs
+from .pod_logs import get_latest_pod_name, get_pod_logs, get_pod_logs_stream
 from .secrets import (
     configure_env_vars_from_secrets,
     secret_exists,
@@ -120,6 +120,7 @@ __all__ = [
     "delete_namespace",
     "get_latest_pod_name",
     "get_pod_logs",
+    "get_pod_logs_stream",
     "configure_env_vars_from_secrets",
     "secret_exists",
     "create_secret",
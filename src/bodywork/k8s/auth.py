@@ -19,32 +19,136 @@ High-level interface to the Kubernetes APIs used to manage
 authentication and authorisation for cluster resources.
 """
 import os
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from threading import Lock
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 from kubernetes import client as k8s, config as k8s_config
+from urllib3.util.retry import Retry
 
 from ..constants import (
+    K8S_API_CONNECTION_POOL_SIZE,
+    K8S_API_MAX_RETRIES,
+    K8S_API_RETRY_BACKOFF_FACTOR,
+    K8S_EXISTENCE_CHECK_CACHE_TTL_SECONDS,
     BODYWORK_WORKFLOW_CLUSTER_ROLE,
     BODYWORK_WORKFLOW_SERVICE_ACCOUNT,
     BODYWORK_STAGES_SERVICE_ACCOUNT,
 )
+from .utils import (
+    core_v1_api,
+    rbac_v1_api,
+    shared_api_client,
+    ttl_cache,
+    WATCH_CACHE_RESOURCE_VERSION,
+)
+
+_kubernetes_config_loaded = False
+_kubernetes_config_lock = Lock()
+
+_RBAC_API_GROUP = "rbac.authorization.k8s.io"
+
+_WORKFLOW_CLUSTER_ROLE_RULES = [
+    k8s.V1PolicyRule(
+        api_groups=[""],
+        resources=["pods"],
+        verbs=["get", "list"],
+    ),
+    k8s.V1PolicyRule(
+        api_groups=[""],
+        resources=["namespaces", "services"],
+        verbs=["get", "list", "create", "delete"],
+    ),
+    k8s.V1PolicyRule(
+        api_groups=[_RBAC_API_GROUP],
+        resources=["clusterrolebindings"],
+        verbs=["get", "list", "create"],
+    ),
+    k8s.V1PolicyRule(
+        api_groups=[""],
+        resources=["serviceaccounts"],
+        verbs=["list", "create"],
+    ),
+    k8s.V1PolicyRule(
+        api_groups=[_RBAC_API_GROUP],
+        resources=["roles", "rolebindings"],
+        verbs=["create"],
+    ),
+    k8s.V1PolicyRule(
+        api_groups=[""],
+        resources=["configmaps"],
+        verbs=["get", "list"],
+    ),
+    k8s.V1PolicyRule(
+        api_groups=[""],
+        resources=["secrets"],
+        verbs=["get", "list", "create", "update", "patch"],
+    ),
+    k8s.V1PolicyRule(api_groups=["apps", "batch"], resources=["*"], verbs=["*"]),
+    k8s.V1PolicyRule(
+        api_groups=["networking.k8s.io", "extensions"],
+        resources=["ingresses"],
+        verbs=["*"],
+    ),
+]
+
+_STAGES_ROLE_RULES = [
+    k8s.V1PolicyRule(
+        api_groups=[""],
+        resources=["secrets", "configmaps"],
+        verbs=["get", "list"],
+    )
+]
 
 
-def load_kubernetes_config() -> None:
+def load_kubernetes_config(force: bool = False) -> None:
     """Attempt to load k8s config from file.
 
     If running within a k8s cluster, then KUBERNETES_SERVICE_HOST will
     be present, which allows us to call a special initialization method
     for in-cluster situations. Otherwise the standard ~/.kube/config is
-    read.
+    read. Once loaded, the config is not loaded again unless forced.
 
+    The connection pool is sized to cover the API calls that are made
+    concurrently, and transient connection errors are retried with a
+    backoff, instead of failing the command.
+
+    :param force: Reload the config even if it has already been loaded,
+        defaults to False.
     :raises RuntimeError: if a kubeconfig cannot be loaded.
     """
-    if os.getenv("KUBERNETES_SERVICE_HOST"):
-        k8s_config.load_incluster_config()
-    else:
-        k8s_config.load_kube_config()
+    global _kubernetes_config_loaded
+    with _kubernetes_config_lock:
+        if _kubernetes_config_loaded and not force:
+            return
+        if os.getenv("KUBERNETES_SERVICE_HOST"):
+            k8s_config.load_incluster_config()
+        else:
+            k8s_config.load_kube_config()
+        configuration = k8s.Configuration.get_default_copy()
+        configuration.connection_pool_maxsize = K8S_API_CONNECTION_POOL_SIZE
+        configuration.retries = Retry(
+            total=K8S_API_MAX_RETRIES, backoff_factor=K8S_API_RETRY_BACKOFF_FACTOR
+        )
+        k8s.Configuration.set_default(configuration)
+        shared_api_client.cache_clear()
+        _kubernetes_config_loaded = True
+
+
+def _name_field_selector(name: str) -> str:
+    """Get a field-selector that matches resources by name.
+
+    Filtering by name on the API server means that existence checks only
+    transfer the matching resource, rather than every resource of a kind.
+
+    :param name: The resource name to select.
+    :return: Field-selector for use with list requests.
+    """
+    return f"metadata.name={name}"
 
 
+@ttl_cache(K8S_EXISTENCE_CHECK_CACHE_TTL_SECONDS)
 def service_account_exists(namespace: str, name: str) -> bool:
     """Does the service-account exist within the namespace.
 
@@ -53,27 +157,39 @@ def service_account_exists(namespace: str, name: str) -> bool:
     :return: True if the service-account was found, otherwise False.
     """
     service_account_objects = (
-        k8s.CoreV1Api().list_namespaced_service_account(namespace=namespace).items
+        core_v1_api()
+        .list_namespaced_service_account(
+            namespace=namespace,
+            field_selector=_name_field_selector(name),
+            resource_version=WATCH_CACHE_RESOURCE_VERSION,
+        )
+        .items
     )
-    service_account_names = [
-        service_account_object.metadata.name
+    return any(
+        service_account_object.metadata.name == name
         for service_account_object in service_account_objects
-    ]
-    return True if name in service_account_names else False
+    )
 
 
+@ttl_cache(K8S_EXISTENCE_CHECK_CACHE_TTL_SECONDS)
 def cluster_role_exists(name: str) -> bool:
     """Does the cluster-role exist.
 
     :param name: The name of the cluster-role to check.
     :return: True if the cluster-role was found, otherwise False.
     """
-    cluster_role_objects = k8s.RbacAuthorizationV1Api().list_cluster_role().items
-    cluster_role_names = [
-        cluster_role_object.metadata.name
+    cluster_role_objects = (
+        rbac_v1_api()
+        .list_cluster_role(
+            field_selector=_name_field_selector(name),
+            resource_version=WATCH_CACHE_RESOURCE_VERSION,
+        )
+        .items
+    )
+    return any(
+        cluster_role_object.metadata.name == name
         for cluster_role_object in cluster_role_objects
-    ]
-    return True if name in cluster_role_names else False
+    )
 
 
 def workflow_cluster_role_binding_name(namespace: str) -> str:
@@ -88,6 +204,7 @@ def workflow_cluster_role_binding_name(namespace: str) -> str:
     return f"{BODYWORK_WORKFLOW_CLUSTER_ROLE}--{namespace}"
 
 
+@ttl_cache(K8S_EXISTENCE_CHECK_CACHE_TTL_SECONDS)
 def cluster_role_binding_exists(name: str) -> bool:
     """Does the cluster-role-binding exist.
 
@@ -95,13 +212,17 @@ def cluster_role_binding_exists(name: str) -> bool:
     :return: True if the cluster-role-binding was found, otherwise False.
     """
     cluster_role_binding_objects = (
-        k8s.RbacAuthorizationV1Api().list_cluster_role_binding().items
+        rbac_v1_api()
+        .list_cluster_role_binding(
+            field_selector=_name_field_selector(name),
+            resource_version=WATCH_CACHE_RESOURCE_VERSION,
+        )
+        .items
     )
-    cluster_role_binding_names = [
-        cluster_role_binding_object.metadata.name
+    return any(
+        cluster_role_binding_object.metadata.name == name
         for cluster_role_binding_object in cluster_role_binding_objects
-    ]
-    return True if name in cluster_role_binding_names else False
+    )
 
 
 def delete_cluster_role_binding(name: str) -> None:
@@ -109,7 +230,8 @@ def delete_cluster_role_binding(name: str) -> None:
 
     :param name: The name assigned to the cluster-role-binding.
     """
-    k8s.RbacAuthorizationV1Api().delete_cluster_role_binding(name=name)
+    rbac_v1_api().delete_cluster_role_binding(name=name)
+    cluster_role_binding_exists.cache_clear()
 
 
 def setup_workflow_service_accounts(namespace: str) -> None:
@@ -118,88 +240,14 @@ def setup_workflow_service_accounts(namespace: str) -> None:
     :param namespace: Namespace in which the service-account will be
         placed.
     """
-    service_account_object = k8s.V1ServiceAccount(
-        metadata=k8s.V1ObjectMeta(
-            namespace=namespace, name=BODYWORK_WORKFLOW_SERVICE_ACCOUNT
-        )
-    )
-    k8s.CoreV1Api().create_namespaced_service_account(
-        namespace=namespace, body=service_account_object
+    _setup_service_account(
+        namespace,
+        BODYWORK_WORKFLOW_SERVICE_ACCOUNT,
+        cluster_role=BODYWORK_WORKFLOW_CLUSTER_ROLE,
+        cluster_role_rules=_WORKFLOW_CLUSTER_ROLE_RULES,
+        cluster_role_binding_name=workflow_cluster_role_binding_name(namespace),
     )
 
-    if not cluster_role_exists(BODYWORK_WORKFLOW_CLUSTER_ROLE):
-        cluster_role_object = k8s.V1ClusterRole(
-            metadata=k8s.V1ObjectMeta(name=BODYWORK_WORKFLOW_CLUSTER_ROLE),
-            rules=[
-                k8s.V1PolicyRule(
-                    api_groups=[""],
-                    resources=["pods"],
-                    verbs=["get", "list"],
-                ),
-                k8s.V1PolicyRule(
-                    api_groups=[""],
-                    resources=["namespaces", "services"],
-                    verbs=["get", "list", "create", "delete"],
-                ),
-                k8s.V1PolicyRule(
-                    api_groups=["rbac.authorization.k8s.io"],
-                    resources=["clusterrolebindings"],
-                    verbs=["get", "list", "create"],
-                ),
-                k8s.V1PolicyRule(
-                    api_groups=[""],
-                    resources=["serviceaccounts"],
-                    verbs=["list", "create"],
-                ),
-                k8s.V1PolicyRule(
-                    api_groups=["rbac.authorization.k8s.io"],
-                    resources=["roles", "rolebindings"],
-                    verbs=["create"],
-                ),
-                k8s.V1PolicyRule(
-                    api_groups=[""],
-                    resources=["configmaps"],
-                    verbs=["get", "list"],
-                ),
-                k8s.V1PolicyRule(
-                    api_groups=[""],
-                    resources=["secrets"],
-                    verbs=["get", "list", "create", "update", "patch"],
-                ),
-                k8s.V1PolicyRule(
-                    api_groups=["apps", "batch"], resources=["*"], verbs=["*"]
-                ),
-                k8s.V1PolicyRule(
-                    api_groups=["networking.k8s.io", "extensions"],
-                    resources=["ingresses"],
-                    verbs=["*"],
-                ),
-            ],
-        )
-        k8s.RbacAuthorizationV1Api().create_cluster_role(body=cluster_role_object)
-
-    if not cluster_role_binding_exists(workflow_cluster_role_binding_name(namespace)):
-        cluster_role_binding_object = k8s.V1ClusterRoleBinding(
-            metadata=k8s.V1ObjectMeta(
-                name=workflow_cluster_role_binding_name(namespace), namespace=namespace
-            ),
-            role_ref=k8s.V1RoleRef(
-                kind="ClusterRole",
-                name=BODYWORK_WORKFLOW_CLUSTER_ROLE,
-                api_group="rbac.authorization.k8s.io",
-            ),
-            subjects=[
-                k8s.V1Subject(
-                    kind="ServiceAccount",
-                    name=BODYWORK_WORKFLOW_SERVICE_ACCOUNT,
-                    namespace=namespace,
-                )
-            ],
-        )
-        k8s.RbacAuthorizationV1Api().create_cluster_role_binding(
-            body=cluster_role_binding_object
-        )
-
 
 def setup_stages_service_account(namespace: str) -> None:
     """Setup a service-account with required roles for jobs-and-deployments.
@@ -207,48 +255,141 @@ def setup_stages_service_account(namespace: str) -> None:
     :param namespace: Namespace in which the service-account will be
         placed.
     """
-    service_account_object = k8s.V1ServiceAccount(
-        metadata=k8s.V1ObjectMeta(
-            namespace=namespace, name=BODYWORK_STAGES_SERVICE_ACCOUNT
-        )
-    )
-    k8s.CoreV1Api().create_namespaced_service_account(
-        namespace=namespace, body=service_account_object
+    _setup_service_account(
+        namespace, BODYWORK_STAGES_SERVICE_ACCOUNT, role_rules=_STAGES_ROLE_RULES
     )
 
-    role_object = k8s.V1Role(
-        metadata=k8s.V1ObjectMeta(
-            namespace=namespace, name=BODYWORK_STAGES_SERVICE_ACCOUNT
-        ),
-        rules=[
-            k8s.V1PolicyRule(
-                api_groups=[""],
-                resources=["secrets", "configmaps"],
-                verbs=["get", "list"],
-            )
-        ],
-    )
-    k8s.RbacAuthorizationV1Api().create_namespaced_role(
-        namespace=namespace, body=role_object
-    )
 
-    role_binding_object = k8s.V1RoleBinding(
-        metadata=k8s.V1ObjectMeta(
-            namespace=namespace, name=BODYWORK_STAGES_SERVICE_ACCOUNT
-        ),
-        role_ref=k8s.V1RoleRef(
-            kind="Role",
-            name=BODYWORK_STAGES_SERVICE_ACCOUNT,
-            api_group="rbac.authorization.k8s.io",
-        ),
-        subjects=[
-            k8s.V1Subject(
-                kind="ServiceAccount",
-                name=BODYWORK_STAGES_SERVICE_ACCOUNT,
+def _setup_service_account(
+    namespace: str,
+    name: str,
+    role_rules: Optional[List[k8s.V1PolicyRule]] = None,
+    cluster_role: Optional[str] = None,
+    cluster_role_rules: Optional[List[k8s.V1PolicyRule]] = None,
+    cluster_role_binding_name: Optional[str] = None,
+) -> None:
+    """Setup a service-account together with the roles bound to it.
+
+    The service-account and roles are created concurrently, using a thread
+    pool. Each role is created before the binding that refers to it,
+    because the API server resolves the role when checking that a binding
+    does not escalate privileges. Resources that exist already are left as
+    they are, which is detected from the response to the request to create
+    them, except for the cluster-role, which is checked for first.
+
+    :param namespace: Namespace in which the service-account will be
+        placed.
+    :param name: The name of the service-account, which is also used for
+        the role and role-binding within the namespace.
+    :param role_rules: Rules for a role within the namespace, bound to
+        the service-account, defaults to None (no role).
+    :param cluster_role: The name of a cluster-role to bind to the
+        service-account, defaults to None (no cluster-role).
+    :param cluster_role_rules: Rules for the cluster-role, if it does not
+        exist already and needs to be created, defaults to None.
+    :param cluster_role_binding_name: The name of the cluster-role-binding
+        for the service-account, defaults to None.
+    """
+    metadata = k8s.V1ObjectMeta(namespace=namespace, name=name)
+    subjects = [k8s.V1Subject(kind="ServiceAccount", name=name, namespace=namespace)]
+
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        futures = [
+            executor.submit(
+                _create_unless_exists,
+                core_v1_api().create_namespaced_service_account,
                 namespace=namespace,
+                body=k8s.V1ServiceAccount(metadata=metadata),
             )
-        ],
-    )
-    k8s.RbacAuthorizationV1Api().create_namespaced_role_binding(
-        namespace=namespace, body=role_binding_object
-    )
+        ]
+        role_futures = []
+        bindings: List[Tuple[Callable[..., Any], Dict[str, Any]]] = []
+        if role_rules is not None:
+            role_object = k8s.V1Role(metadata=metadata, rules=role_rules)
+            role_binding_object = k8s.V1RoleBinding(
+                metadata=metadata,
+                role_ref=k8s.V1RoleRef(
+                    kind="Role", name=name, api_group=_RBAC_API_GROUP
+                ),
+                subjects=subjects,
+            )
+            role_futures.append(
+                executor.submit(
+                    _create_unless_exists,
+                    rbac_v1_api().create_namespaced_role,
+                    namespace=namespace,
+                    body=role_object,
+                )
+            )
+            bindings.append(
+                (
+                    rbac_v1_api().create_namespaced_role_binding,
+                    {"namespace": namespace, "body": role_binding_object},
+                )
+            )
+        if cluster_role is not None and cluster_role_binding_name is not None:
+            cluster_role_object = k8s.V1ClusterRole(
+                metadata=k8s.V1ObjectMeta(name=cluster_role), rules=cluster_role_rules
+            )
+            cluster_role_binding_object = k8s.V1ClusterRoleBinding(
+                metadata=k8s.V1ObjectMeta(
+                    name=cluster_role_binding_name,
+                    namespace=namespace,
+                    labels={"app": "bodywork"},
+                ),
+                role_ref=k8s.V1RoleRef(
+                    kind="ClusterRole", name=cluster_role, api_group=_RBAC_API_GROUP
+                ),
+                subjects=subjects,
+            )
+            if not cluster_role_exists(cluster_role):
+                role_futures.append(
+                    executor.submit(
+                        _create_unless_exists,
+                        rbac_v1_api().create_cluster_role,
+                        body=cluster_role_object,
+                    )
+                )
+            bindings.append(
+                (
+                    rbac_v1_api().create_cluster_role_binding,
+                    {"body": cluster_role_binding_object},
+                )
+            )
+        try:
+            for future in role_futures:
+                future.result()
+            for create_binding, kwargs in bindings:
+                futures.append(
+                    executor.submit(_create_unless_exists, create_binding, **kwargs)
+                )
+            for future in futures:
+                future.result()
+        finally:
+            clear_existence_check_caches()
+
+
+def clear_existence_check_caches() -> None:
+    """Forget the cached results of existence checks for auth resources.
+
+    This must be called by anything that creates or deletes these
+    resources, so that subsequent checks do not return stale results.
+    """
+    service_account_exists.cache_clear()
+    cluster_role_exists.cache_clear()
+    cluster_role_binding_exists.cache_clear()
+
+
+def _create_unless_exists(create: Callable[..., Any], **kwargs: Any) -> None:
+    """Create a resource, unless a resource with the same name exists.
+
+    :param create: The API method that creates the resource.
+    :param kwargs: Keyword arguments to pass to the API method.
+    :raises ApiException: If the resource could not be created for any
+        reason other than it existing already.
+    """
+    try:
+        create(**kwargs)
+    except k8s.ApiException as e:
+        if e.status != HTTPStatus.CONFLICT:
+            raise
@@ -18,21 +18,29 @@
 High-level interface to the Kubernetes batch API as used to create and
 manage Bodywork batch stages.
 """
+from contextlib import closing
 from enum import Enum
 from time import sleep, time
-from typing import Iterable, List
+from typing import Dict, Iterable, List, Tuple
 
 from kubernetes import client as k8s
 from rich.progress import Progress
 
-from ..cli.terminal import update_progress_bar
+from ..cli.terminal import progress_bar_updates
 from ..constants import (
     BODYWORK_DOCKER_IMAGE,
     BODYWORK_STAGES_SERVICE_ACCOUNT,
     DEFAULT_K8S_POLLING_FREQ,
 )
 from ..exceptions import BodyworkJobFailure
-from .utils import check_resource_scheduling_status, make_valid_k8s_name
+from .utils import (
+    BACKGROUND_DELETE_OPTIONS,
+    batch_v1_api,
+    check_resource_scheduling_status,
+    container_resource_requests,
+    make_valid_k8s_name,
+    watch_namespaced_resources,
+)
 
 
 class JobStatus(Enum):
@@ -87,12 +95,7 @@ def configure_batch_stage_job(
     if timeout:
         container_args += [str(timeout)]
 
-    container_resources = k8s.V1ResourceRequirements(
-        requests={
-            "cpu": f"{cpu_request}" if cpu_request else None,
-            "memory": f"{memory_request}M" if memory_request else None,
-        }
-    )
+    container_resources = container_resource_requests(cpu_request, memory_request)
     container = k8s.V1Container(
         name="bodywork",
         image=image,
@@ -107,14 +110,17 @@ def configure_batch_stage_job(
         containers=[container],
         restart_policy="Never",
     )
-    pod_template_spec = k8s.V1PodTemplateSpec(spec=pod_spec)
+    labels = {"app": "bodywork", "stage": job_name}
+    pod_template_spec = k8s.V1PodTemplateSpec(
+        metadata=k8s.V1ObjectMeta(labels=labels), spec=pod_spec
+    )
     job_spec = k8s.V1JobSpec(
         template=pod_template_spec, completions=1, backoff_limit=retries
     )
     job_metadata = k8s.V1ObjectMeta(
         namespace=namespace,
         name=job_name,
-        labels={"app": "bodywork", "stage": job_name},
+        labels=labels,
     )
     job = k8s.V1Job(metadata=job_metadata, spec=job_spec)
     return job
@@ -125,7 +131,7 @@ def create_job(job: k8s.V1Job) -> None:
 
     :param job: A configured job object.
     """
-    k8s.BatchV1Api().create_namespaced_job(body=job, namespace=job.metadata.namespace)
+    batch_v1_api().create_namespaced_job(body=job, namespace=job.metadata.namespace)
 
 
 def delete_job(namespace: str, name: str) -> None:
@@ -135,48 +141,86 @@ def delete_job(namespace: str, name: str) -> None:
         delete.
     :param name: The name of the job to be deleted.
     """
-    k8s.BatchV1Api().delete_namespaced_job(
+    batch_v1_api().delete_namespaced_job(
         name=name,
         namespace=namespace,
-        body=k8s.V1DeleteOptions(propagation_policy="Background"),
+        body=BACKGROUND_DELETE_OPTIONS,
     )
 
 
-def _get_job_status(job: k8s.V1Job) -> JobStatus:
-    """Get the latest status of a job created on a k8s cluster.
+def _job_status(k8s_job_data: k8s.V1Job) -> JobStatus:
+    """Get the status of a job from its latest data on a k8s cluster.
 
-    :param job: A configured job object.
-    :raises RuntimeError: If the job cannot be found or the status
-        cannot be identified.
+    A job that has failed is retried until it exceeds its backoff limit,
+    so a failed pod on its own does not mean that the job has failed. It
+    is only marked as failed once Kubernetes has given up on it.
+
+    :param k8s_job_data: The job object returned by the Kubernetes API.
+    :raises RuntimeError: If the status cannot be identified.
     :return: The current status of the job.
     """
-    try:
-        k8s_job_query = k8s.BatchV1Api().list_namespaced_job(
-            namespace=job.metadata.namespace,
-            field_selector=f"metadata.name={job.metadata.name}",
-        )
-        k8s_job_data = k8s_job_query.items[0]
-    except IndexError as e:
-        msg = (
-            f"cannot find job={job.metadata.name} in "
-            f"namespace={job.metadata.namespace}"
-        )
-        raise RuntimeError(msg) from e
-
-    if k8s_job_data.status.active == 1:
-        return JobStatus.ACTIVE
-    elif k8s_job_data.status.succeeded == 1:
-        return JobStatus.SUCCEEDED
-    elif k8s_job_data.status.failed == 1:
+    status = k8s_job_data.status
+    backoff_limit = k8s_job_data.spec.backoff_limit if k8s_job_data.spec else None
+    has_failed_condition = any(
+        condition.type == "Failed" and condition.status == "True"
+        for condition in status.conditions or []
+    )
+    exceeded_backoff_limit = (
+        status.failed is not None
+        and backoff_limit is not None
+        and status.failed > backoff_limit
+    )
+    if has_failed_condition or exceeded_backoff_limit:
         return JobStatus.FAILED
+    elif status.succeeded:
+        return JobStatus.SUCCEEDED
+    elif status.active or status.failed:
+        return JobStatus.ACTIVE
     else:
         msg = (
-            f"cannot determine status for job={job.metadata.name} in "
-            f"namespace={job.metadata.namespace}"
+            f"cannot determine status for job={k8s_job_data.metadata.name} in "
+            f"namespace={k8s_job_data.metadata.namespace}"
         )
         raise RuntimeError(msg)
 
 
+def _watch_jobs_status(
+    namespace: str,
+    jobs_status: Dict[Tuple[str, str], JobStatus],
+    timeout_seconds: float,
+) -> None:
+    """Update the status of jobs in a namespace, as they change.
+
+    The API server streams changes to the jobs over a single watch, so
+    there is no need to poll each job in turn.
+
+    :param namespace: Namespace in which to watch jobs.
+    :param jobs_status: The status of each monitored job, keyed by
+        namespace and name, which will be updated in-place.
+    :param timeout_seconds: The maximum time to watch for. The watch is
+        stopped sooner if any of the jobs fail, or none are active.
+    :raises RuntimeError: If a monitored job cannot be found, or is
+        deleted.
+    """
+    names = [name for (ns, name) in jobs_status if ns == namespace]
+    with closing(
+        watch_namespaced_resources(
+            batch_v1_api().list_namespaced_job,
+            namespace,
+            names,
+            timeout_seconds,
+            "job",
+        )
+    ) as k8s_jobs_data:
+        for k8s_job_data in k8s_jobs_data:
+            key = (namespace, k8s_job_data.metadata.name)
+            jobs_status[key] = _job_status(k8s_job_data)
+            if jobs_status[key] is JobStatus.FAILED or not any(
+                jobs_status[(namespace, name)] is JobStatus.ACTIVE for name in names
+            ):
+                break
+
+
 def monitor_jobs_to_completion(
     jobs: Iterable[k8s.V1Job],
     timeout_seconds: int = 10,
@@ -186,50 +230,57 @@ def monitor_jobs_to_completion(
 ) -> bool:
     """Monitor job status until completion or timeout.
 
+    Changes to job status are watched for, rather than polled, with one
+    watch kept open for each namespace until the jobs in it have
+    finished, or the timeout is reached.
+
     :param jobs: The jobs to monitor.
     :param timeout_seconds: How long to keep monitoring status before
         calling a timeout, defaults to 10.
-    :param polling_freq_seconds: Time between status polling, defaults
-        to DEFAULT_K8S_POLLING_FREQ.
+    :param polling_freq_seconds: Time (in seconds) between progress bar
+        updates, defaults to DEFAULT_K8S_POLLING_FREQ.
     :param wait_before_start_seconds: Time to wait before starting to
         monitor jobs - e.g. to allow jobs to be created.
-    :param progress_bar: Progress bar to update after every
-        polling cycle, defaults to None.
+    :param progress_bar: Progress bar to update every polling cycle,
+        defaults to None.
     :raises TimeoutError: If the timeout limit is reached and the jobs
         are still marked as active (but not failed).
-    :raises BodyworkJobFailure: If any of the jobs are marked as
-        failed.
+    :raises BodyworkJobFailure: As soon as any of the jobs are marked
+        as failed, without waiting for the other jobs to complete.
+    :raises RuntimeError: If a job cannot be found, or is deleted.
     :return: True if all of the jobs complete successfully.
     """
+    jobs = list(jobs)
     sleep(wait_before_start_seconds)
     check_resource_scheduling_status(jobs)
 
     start_time = time()
-    jobs_status = [_get_job_status(job) for job in jobs]
-
-    while any(job_status is JobStatus.ACTIVE for job_status in jobs_status):
-        if progress_bar:
-            update_progress_bar(progress_bar)
-
-        sleep(polling_freq_seconds)
-
-        if time() - start_time >= timeout_seconds:
-            unsuccessful_jobs_msg = [
-                f"job={job.metadata.name} in namespace={job.metadata.namespace}"
-                for job, status in zip(jobs, jobs_status)
-                if status != JobStatus.SUCCEEDED
+    jobs_status = {
+        (job.metadata.namespace, job.metadata.name): JobStatus.ACTIVE for job in jobs
+    }
+    namespaces = dict.fromkeys(namespace for namespace, _ in jobs_status)
+    with progress_bar_updates(progress_bar, polling_freq_seconds):
+        for namespace in namespaces:
+            remaining_seconds = timeout_seconds - (time() - start_time)
+            _watch_jobs_status(namespace, jobs_status, remaining_seconds)
+            failed_jobs = [
+                job
+                for job in jobs
+                if jobs_status[(job.metadata.namespace, job.metadata.name)]
+                is JobStatus.FAILED
             ]
-            msg = (
-                f'{"; ".join(unsuccessful_jobs_msg)} yet to reach '
-                f"status=succeeded after {timeout_seconds}s"
-            )
-            raise TimeoutError(msg)
-        jobs_status = [_get_job_status(job) for job in jobs]
-
-    if any(job_status is JobStatus.FAILED for job_status in jobs_status):
-        failed_jobs = [
-            job for job, status in zip(jobs, jobs_status) if status == JobStatus.FAILED
-        ]
-        if len(failed_jobs) > 0:
-            raise BodyworkJobFailure(failed_jobs)
+            if failed_jobs:
+                raise BodyworkJobFailure(failed_jobs)
+
+    unsuccessful_jobs_msg = [
+        f"job={name} in namespace={namespace}"
+        for (namespace, name), status in jobs_status.items()
+        if status is not JobStatus.SUCCEEDED
+    ]
+    if unsuccessful_jobs_msg:
+        msg = (
+            f'{"; ".join(unsuccessful_jobs_msg)} yet to reach '
+            f"status=succeeded after {timeout_seconds}s"
+        )
+        raise TimeoutError(msg)
     return True
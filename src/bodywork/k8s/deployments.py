@@ -18,25 +18,47 @@
 High-level interface to the Kubernetes APIs as used to create and manage
 Bodywork service deployment stages.
 """
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
 from datetime import datetime
 from enum import Enum
+from heapq import nlargest
 from math import ceil
 from time import sleep, time
-from typing import Dict, Iterable, List, Any
+from typing import Dict, Iterable, List, Any, Tuple
 
 from kubernetes import client as k8s
 from rich.progress import Progress
 
-from ..cli.terminal import update_progress_bar
+from ..cli.terminal import progress_bar_updates
 from ..constants import (
     BODYWORK_DOCKER_IMAGE,
     BODYWORK_STAGES_SERVICE_ACCOUNT,
     DEFAULT_K8S_POLLING_FREQ,
+    K8S_API_CONNECTION_POOL_SIZE,
     K8S_MAX_SURGE,
     K8S_MAX_UNAVAILABLE,
     K8S_PROBE_PERIOD_SECONDS,
 )
-from .utils import check_resource_scheduling_status, make_valid_k8s_name
+from .utils import (
+    BACKGROUND_DELETE_OPTIONS,
+    apps_v1_api,
+    check_resource_scheduling_status,
+    container_resource_requests,
+    core_v1_api,
+    list_resource_metadata,
+    make_valid_k8s_name,
+    networking_v1_api,
+    resource_exists,
+    watch_namespaced_resources,
+)
+
+_ROLLING_UPDATE_STRATEGY = k8s.V1DeploymentStrategy(
+    rolling_update=k8s.V1RollingUpdateDeployment(
+        max_surge=K8S_MAX_SURGE,
+        max_unavailable=K8S_MAX_UNAVAILABLE,
+    )
+)
 
 
 class DeploymentStatus(Enum):
@@ -99,12 +121,8 @@ def configure_service_stage_deployment(
 
     startup_probe_failure_thold = ceil(startup_time_seconds / K8S_PROBE_PERIOD_SECONDS)
 
-    container_resources = k8s.V1ResourceRequirements(
-        requests={
-            "cpu": f"{cpu_request}" if cpu_request else None,
-            "memory": f"{memory_request}M" if memory_request else None,
-        }
-    )
+    container_resources = container_resource_requests(cpu_request, memory_request)
+    tcp_socket = k8s.V1TCPSocketAction(port=port)
     container = k8s.V1Container(
         name="bodywork",
         image=image,
@@ -114,12 +132,12 @@ def configure_service_stage_deployment(
         command=["bodywork", "stage"],
         args=container_args,
         startup_probe=k8s.V1Probe(
-            tcp_socket=k8s.V1TCPSocketAction(port=port),
+            tcp_socket=tcp_socket,
             period_seconds=K8S_PROBE_PERIOD_SECONDS,
             failure_threshold=startup_probe_failure_thold,
         ),
         liveness_probe=k8s.V1Probe(
-            tcp_socket=k8s.V1TCPSocketAction(port=port),
+            tcp_socket=tcp_socket,
             period_seconds=K8S_PROBE_PERIOD_SECONDS,
         ),
     )
@@ -128,15 +146,16 @@ def configure_service_stage_deployment(
         containers=[container],
         restart_policy="Always",
     )
+    labels = {
+        "app": "bodywork",
+        "stage": service_name,
+        "deployment-name": project_name,
+        "git-commit-hash": git_commit_hash,
+        "git-branch": project_repo_branch,
+    }
     pod_template_spec = k8s.V1PodTemplateSpec(
         metadata=k8s.V1ObjectMeta(
-            labels={
-                "app": "bodywork",
-                "stage": service_name,
-                "deployment-name": project_name,
-                "git-commit-hash": git_commit_hash,
-                "git-branch": project_repo_branch,
-            },
+            labels=labels,
             annotations={"last-updated": datetime.now().isoformat()},
         ),
         spec=pod_spec,
@@ -146,24 +165,13 @@ def configure_service_stage_deployment(
         template=pod_template_spec,
         selector={"matchLabels": {"stage": service_name}},
         revision_history_limit=0,
-        strategy=k8s.V1DeploymentStrategy(
-            rolling_update=k8s.V1RollingUpdateDeployment(
-                max_surge=K8S_MAX_SURGE,
-                max_unavailable=K8S_MAX_UNAVAILABLE,
-            )
-        ),
+        strategy=_ROLLING_UPDATE_STRATEGY,
     )
     deployment_metadata = k8s.V1ObjectMeta(
         namespace=namespace,
         name=service_name,
         annotations={"port": str(port)},
-        labels={
-            "app": "bodywork",
-            "stage": service_name,
-            "deployment-name": project_name,
-            "git-commit-hash": git_commit_hash,
-            "git-branch": project_repo_branch,
-        },
+        labels=labels,
     )
     deployment = k8s.V1Deployment(metadata=deployment_metadata, spec=deployment_spec)
     return deployment
@@ -174,7 +182,7 @@ def create_deployment(deployment: k8s.V1Deployment) -> None:
 
     :param deployment: A configured deployment object.
     """
-    k8s.AppsV1Api().create_namespaced_deployment(
+    apps_v1_api().create_namespaced_deployment(
         body=deployment, namespace=deployment.metadata.namespace
     )
 
@@ -186,13 +194,9 @@ def is_existing_deployment(namespace: str, name: str) -> bool:
     :param name: Name of deployment in namespace.
     :return: Boolean flag for the deployment within the namespace.
     """
-    existing_deployments = k8s.AppsV1Api().list_namespaced_deployment(
-        namespace=namespace
+    return resource_exists(
+        apps_v1_api().read_namespaced_deployment, name=name, namespace=namespace
     )
-    existing_deployment_names = [
-        deployment.metadata.name for deployment in existing_deployments.items
-    ]
-    return True if name in existing_deployment_names else False
 
 
 def update_deployment(deployment: k8s.V1Deployment) -> None:
@@ -200,7 +204,7 @@ def update_deployment(deployment: k8s.V1Deployment) -> None:
 
     :param deployment: A configured deployment object.
     """
-    k8s.AppsV1Api().patch_namespaced_deployment(
+    apps_v1_api().patch_namespaced_deployment(
         body=deployment,
         name=deployment.metadata.name,
         namespace=deployment.metadata.namespace,
@@ -219,21 +223,21 @@ def rollback_deployment(deployment: k8s.V1Deployment) -> None:
     name = deployment.metadata.name
     namespace = deployment.metadata.namespace
 
-    associated_replica_sets = k8s.AppsV1Api().list_namespaced_replica_set(
+    associated_replica_sets = apps_v1_api().list_namespaced_replica_set(
         namespace=namespace,
         label_selector=(f'app=bodywork,stage={deployment.metadata.labels["stage"]}'),
     )
 
-    revision_ordered_replica_sets = sorted(
+    latest_replica_sets = nlargest(
+        2,
         associated_replica_sets.items,
-        key=lambda e: str(e.metadata.annotations["deployment.kubernetes.io/revision"]),
-        reverse=True,
+        key=lambda e: int(e.metadata.annotations["deployment.kubernetes.io/revision"]),
     )
 
     rollback_replica_set = (
-        revision_ordered_replica_sets[0]
-        if len(revision_ordered_replica_sets) == 1
-        else revision_ordered_replica_sets[1]
+        latest_replica_sets[0]
+        if len(latest_replica_sets) == 1
+        else latest_replica_sets[1]
     )
 
     rollback_revision_number = rollback_replica_set.metadata.annotations[
@@ -241,7 +245,7 @@ def rollback_deployment(deployment: k8s.V1Deployment) -> None:
     ]
 
     is_new_deployment = (
-        rollback_revision_number == "1" and len(revision_ordered_replica_sets) == 1
+        rollback_revision_number == "1" and len(latest_replica_sets) == 1
     )
 
     if is_new_deployment:
@@ -262,24 +266,37 @@ def rollback_deployment(deployment: k8s.V1Deployment) -> None:
                 },
             },
         ]
-        k8s.AppsV1Api().patch_namespaced_deployment(
+        apps_v1_api().patch_namespaced_deployment(
             body=patch, name=name, namespace=namespace
         )
 
 
 def delete_all_namespace_deployments(namespace: str) -> None:
-    """Delete all deployments within a k8s namespace.
+    """Delete all Bodywork deployments within a k8s namespace.
+
+    Deletions are issued concurrently, as each one is a separate request
+    to the k8s API.
 
     :param namespace: Namespace in which to look for deployments.
     """
-    existing_deployments = k8s.AppsV1Api().list_namespaced_deployment(
-        namespace=namespace
+    existing_deployments = list_resource_metadata(
+        "/apis/apps/v1/namespaces/{namespace}/deployments",
+        {"namespace": namespace},
+        label_selector="app=bodywork",
     )
     existing_deployment_names = [
-        deployment.metadata.name for deployment in existing_deployments.items
+        deployment["name"] for deployment in existing_deployments
     ]
-    for name in existing_deployment_names:
-        delete_deployment(namespace, name)
+    if not existing_deployment_names:
+        return None
+    max_workers = min(len(existing_deployment_names), K8S_API_CONNECTION_POOL_SIZE)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [
+            executor.submit(delete_deployment, namespace, name)
+            for name in existing_deployment_names
+        ]
+        for future in futures:
+            future.result()
 
 
 def delete_deployment(namespace: str, name: str) -> None:
@@ -288,39 +305,21 @@ def delete_deployment(namespace: str, name: str) -> None:
     :param namespace: Namespace in which to look for deployment.
     :param name: Name of deployment in namespace.
     """
-    k8s.AppsV1Api().delete_namespaced_deployment(
+    apps_v1_api().delete_namespaced_deployment(
         name=name,
         namespace=namespace,
-        body=k8s.V1DeleteOptions(propagation_policy="Background"),
+        body=BACKGROUND_DELETE_OPTIONS,
     )
 
 
-def _get_deployment_status(deployment: k8s.V1Deployment) -> DeploymentStatus:
-    """Get the latest status of a deployment created on a k8s cluster.
+def _deployment_status(k8s_deployment_data: k8s.V1Deployment) -> DeploymentStatus:
+    """Get the status of a deployment from its latest data on a k8s cluster.
 
-    :param deployment: A configured job object.
-    :raises RuntimeError: If the deployment cannot be found or the status
-        cannot be identified.
+    :param k8s_deployment_data: The deployment object returned by the
+        Kubernetes API.
+    :raises RuntimeError: If the status cannot be identified.
     :return: The current status of the deployment.
     """
-    name = deployment.metadata.name
-    namespace = deployment.metadata.namespace
-    try:
-        k8s_deployment_query = k8s.AppsV1Api().list_namespaced_deployment(
-            namespace=namespace
-        )
-        k8s_deployment_data = [
-            deployment
-            for deployment in k8s_deployment_query.items
-            if deployment.metadata.name == name
-        ][0]
-    except IndexError as e:
-        msg = (
-            f"cannot find deployment={deployment.metadata.name} in "
-            f"namespace={deployment.metadata.namespace}"
-        )
-        raise RuntimeError(msg) from e
-
     if (
         k8s_deployment_data.status.available_replicas is not None
         and k8s_deployment_data.status.unavailable_replicas is None
@@ -333,12 +332,98 @@ def _get_deployment_status(deployment: k8s.V1Deployment) -> DeploymentStatus:
         return DeploymentStatus.PROGRESSING
     else:
         msg = (
-            f"cannot determine status for deployment={name} in "
-            f"namespace={namespace}"
+            f"cannot determine status for deployment="
+            f"{k8s_deployment_data.metadata.name} in "
+            f"namespace={k8s_deployment_data.metadata.namespace}"
         )
         raise RuntimeError(msg)
 
 
+def _is_rolled_out(k8s_deployment_data: k8s.V1Deployment) -> bool:
+    """Has the latest version of a deployment finished rolling out.
+
+    The deployment controller must have observed the latest generation of
+    the deployment, as otherwise the status could describe the version
+    that is being replaced - e.g. immediately after an update.
+
+    :param k8s_deployment_data: The deployment object returned by the
+        Kubernetes API.
+    :return: True if every replica is running the latest version.
+    """
+    generation = k8s_deployment_data.metadata.generation
+    status = k8s_deployment_data.status
+    replicas = k8s_deployment_data.spec.replicas
+    return (
+        generation is not None
+        and status.observed_generation is not None
+        and status.observed_generation >= generation
+        and status.updated_replicas == replicas
+        and status.available_replicas == replicas
+        and not status.unavailable_replicas
+    )
+
+
+def _deployments_rolled_out(deployments: List[k8s.V1Deployment]) -> bool:
+    """Have all of the deployments already finished rolling out.
+
+    :param deployments: The deployments to check.
+    :return: True if every deployment has rolled out.
+    """
+    for namespace in dict.fromkeys(d.metadata.namespace for d in deployments):
+        k8s_deployments_query = apps_v1_api().list_namespaced_deployment(
+            namespace=namespace, label_selector="app=bodywork"
+        )
+        k8s_deployments_data = {
+            k8s_deployment_data.metadata.name: k8s_deployment_data
+            for k8s_deployment_data in k8s_deployments_query.items
+        }
+        for deployment in deployments:
+            if deployment.metadata.namespace != namespace:
+                continue
+            k8s_deployment_data = k8s_deployments_data.get(deployment.metadata.name)
+            if k8s_deployment_data is None or not _is_rolled_out(k8s_deployment_data):
+                return False
+    return True
+
+
+def _watch_deployments_status(
+    namespace: str,
+    deployments_status: Dict[Tuple[str, str], DeploymentStatus],
+    timeout_seconds: float,
+) -> None:
+    """Update the status of deployments in a namespace, as they change.
+
+    The API server streams changes to the deployments over a single
+    watch, so there is no need to poll each deployment in turn.
+
+    :param namespace: Namespace in which to watch deployments.
+    :param deployments_status: The status of each monitored deployment,
+        keyed by namespace and name, which will be updated in-place.
+    :param timeout_seconds: The maximum time to watch for. The watch is
+        stopped sooner if none of the deployments are progressing.
+    :raises RuntimeError: If a monitored deployment cannot be found, or
+        is deleted.
+    """
+    names = [name for (ns, name) in deployments_status if ns == namespace]
+    with closing(
+        watch_namespaced_resources(
+            apps_v1_api().list_namespaced_deployment,
+            namespace,
+            names,
+            timeout_seconds,
+            "deployment",
+        )
+    ) as k8s_deployments_data:
+        for k8s_deployment_data in k8s_deployments_data:
+            key = (namespace, k8s_deployment_data.metadata.name)
+            deployments_status[key] = _deployment_status(k8s_deployment_data)
+            if not any(
+                deployments_status[(namespace, name)] is DeploymentStatus.PROGRESSING
+                for name in names
+            ):
+                break
+
+
 def monitor_deployments_to_completion(
     deployments: Iterable[k8s.V1Deployment],
     timeout_seconds: int = 10,
@@ -348,51 +433,56 @@ def monitor_deployments_to_completion(
 ) -> bool:
     """Monitor deployment status until completion or timeout.
 
+    Changes to deployment status are watched for, rather than polled,
+    with one watch kept open for each namespace until the deployments in
+    it are complete, or the timeout is reached.
+
     :param deployments: The deployments to monitor.
     :param timeout_seconds: How long to keep monitoring status before
         calling a timeout, defaults to 10.
-    :param polling_freq_seconds: Time (in seconds) between status
-        polling, defaults to DEFAULT_K8S_POLLING_FREQ.
+    :param polling_freq_seconds: Time (in seconds) between progress bar
+        updates, defaults to DEFAULT_K8S_POLLING_FREQ.
     :param wait_before_start_seconds: Time to wait before starting to
-        monitor deployments - e.g. to allow deployments to be created.
-    :param progress_bar: Progress bar to update after every
-        polling cycle, defaults to None.
+        monitor deployments - e.g. to allow deployments to be created. This
+        is skipped if all of the deployments have already rolled out.
+    :param progress_bar: Progress bar to update every polling cycle,
+        defaults to None.
     :raises TimeoutError: If the timeout limit is reached and the deployments
         are still marked as progressing.
+    :raises RuntimeError: If a deployment cannot be found, or is deleted.
     :return: True if all of the deployments are successful.
     """
+    deployments = list(deployments)
+    if not deployments or _deployments_rolled_out(deployments):
+        return True
+
     sleep(wait_before_start_seconds)
     check_resource_scheduling_status(deployments)
 
     start_time = time()
-    deployments_status = [
-        _get_deployment_status(deployment) for deployment in deployments
+    deployments_status = {
+        (deployment.metadata.namespace, deployment.metadata.name): (
+            DeploymentStatus.PROGRESSING
+        )
+        for deployment in deployments
+    }
+    namespaces = dict.fromkeys(namespace for namespace, _ in deployments_status)
+    with progress_bar_updates(progress_bar, polling_freq_seconds):
+        for namespace in namespaces:
+            remaining_seconds = timeout_seconds - (time() - start_time)
+            _watch_deployments_status(namespace, deployments_status, remaining_seconds)
+
+    unsuccessful_deployments_msg = [
+        f"deployment={name} in namespace={namespace}"
+        for (namespace, name), status in deployments_status.items()
+        if status is DeploymentStatus.PROGRESSING
     ]
-
-    while any(status is DeploymentStatus.PROGRESSING for status in deployments_status):
-        if progress_bar:
-            update_progress_bar(progress_bar)
-
-        sleep(polling_freq_seconds)
-
-        if time() - start_time >= timeout_seconds:
-            unsuccessful_deployments_msg = [
-                (
-                    f"deployment={deployment.metadata.name} in "
-                    f"namespace={deployment.metadata.namespace}"
-                )
-                for deployment, status in zip(deployments, deployments_status)
-                if status != DeploymentStatus.ACTIVE
-            ]
-            msg = (
-                f'{"; ".join(unsuccessful_deployments_msg)} have yet to reach '
-                f"status=complete after {timeout_seconds}s"
-            )
-            raise TimeoutError(msg)
-        deployments_status = [
-            _get_deployment_status(deployment) for deployment in deployments
-        ]
-
+    if unsuccessful_deployments_msg:
+        msg = (
+            f'{"; ".join(unsuccessful_deployments_msg)} have yet to reach '
+            f"status=complete after {timeout_seconds}s"
+        )
+        raise TimeoutError(msg)
     return True
 
 
@@ -423,18 +513,42 @@ def list_service_stage_deployments(
     """
     label_selector = f"app=bodywork,deployment-name={name}" if name else "app=bodywork"
     if namespace:
-        k8s_deployment_query = k8s.AppsV1Api().list_namespaced_deployment(
+        k8s_deployment_query = apps_v1_api().list_namespaced_deployment(
             namespace=namespace, label_selector=label_selector
         )
     else:
-        k8s_deployment_query = k8s.AppsV1Api().list_deployment_for_all_namespaces(
+        k8s_deployment_query = apps_v1_api().list_deployment_for_all_namespaces(
             label_selector=label_selector
         )
+    if not k8s_deployment_query.items:
+        return {}
+
+    if namespace:
+        service_path = "/api/v1/namespaces/{namespace}/services"
+        ingress_path = "/apis/networking.k8s.io/v1/namespaces/{namespace}/ingresses"
+        path_params = {"namespace": namespace}
+    else:
+        service_path = "/api/v1/services"
+        ingress_path = "/apis/networking.k8s.io/v1/ingresses"
+        path_params = {}
+    services = {
+        (service["namespace"], service["name"])
+        for service in list_resource_metadata(
+            service_path, path_params, label_selector="app=bodywork"
+        )
+    }
+    ingresses = {
+        (ingress["namespace"], ingress["name"])
+        for ingress in list_resource_metadata(
+            ingress_path, path_params, label_selector="app=bodywork"
+        )
+    }
+
     deployment_info = {}
     for deployment in k8s_deployment_query.items:
-        exposed_as_cluster_service = is_exposed_as_cluster_service(
-            deployment.metadata.namespace, deployment.metadata.name
-        )
+        key = (deployment.metadata.namespace, deployment.metadata.name)
+        exposed_as_cluster_service = key in services
+        deployment_has_ingress = key in ingresses
         id = deployment_id(
             deployment.metadata.labels["deployment-name"],
             deployment.metadata.labels["stage"],
@@ -468,12 +582,10 @@ def list_service_stage_deployments(
             "git_url": deployment.spec.template.spec.containers[0].args[0],
             "git_branch": deployment.metadata.labels.get("git-branch", "NA"),
             "git_commit_hash": deployment.metadata.labels.get("git-commit-hash", "NA"),
-            "has_ingress": (
-                has_ingress(deployment.metadata.namespace, deployment.metadata.name)
-            ),
+            "has_ingress": deployment_has_ingress,
             "ingress_route": (
                 ingress_route(deployment.metadata.namespace, deployment.metadata.name)
-                if has_ingress(deployment.metadata.namespace, deployment.metadata.name)
+                if deployment_has_ingress
                 else "none"
             ),
         }
@@ -511,7 +623,7 @@ def expose_deployment_as_cluster_service(deployment: k8s.V1Deployment) -> None:
         namespace=namespace, name=name, labels={"app": "bodywork", "stage": name}
     )
     service = k8s.V1Service(metadata=service_metadata, spec=service_spec)
-    k8s.CoreV1Api().create_namespaced_service(namespace=namespace, body=service)
+    core_v1_api().create_namespaced_service(namespace=namespace, body=service)
 
 
 def is_exposed_as_cluster_service(namespace: str, name: str) -> bool:
@@ -520,9 +632,9 @@ def is_exposed_as_cluster_service(namespace: str, name: str) -> bool:
     :param namespace: Namespace in which to look for services.
     :param name: The name of the service.
     """
-    services = k8s.CoreV1Api().list_namespaced_service(namespace=namespace)
-    service_names = [service.metadata.name for service in services.items]
-    return True if name in service_names else False
+    return resource_exists(
+        core_v1_api().read_namespaced_service, name=name, namespace=namespace
+    )
 
 
 def stop_exposing_cluster_service(namespace: str, name: str) -> None:
@@ -531,7 +643,7 @@ def stop_exposing_cluster_service(namespace: str, name: str) -> None:
     :param namespace: Namespace in which exists the service to delete.
     :param name: The name of the service.
     """
-    k8s.CoreV1Api().delete_namespaced_service(
+    core_v1_api().delete_namespaced_service(
         namespace=namespace, name=name, propagation_policy="Background"
     )
 
@@ -590,7 +702,7 @@ def create_deployment_ingress(deployment: k8s.V1Deployment) -> None:
 
     ingress = k8s.V1Ingress(metadata=ingress_metadata, spec=ingress_spec)
 
-    k8s.NetworkingV1Api().create_namespaced_ingress(namespace=namespace, body=ingress)
+    networking_v1_api().create_namespaced_ingress(namespace=namespace, body=ingress)
 
 
 def delete_deployment_ingress(namespace: str, name: str) -> None:
@@ -599,7 +711,7 @@ def delete_deployment_ingress(namespace: str, name: str) -> None:
     :param namespace: Namespace in which exists the ingress to delete.
     :param name: The name of the ingress.
     """
-    k8s.NetworkingV1Api().delete_namespaced_ingress(
+    networking_v1_api().delete_namespaced_ingress(
         namespace=namespace, name=name, propagation_policy="Background"
     )
 
@@ -610,8 +722,6 @@ def has_ingress(namespace: str, name: str) -> bool:
     :param namespace: Namespace in which to look for ingress resources.
     :param name: The name of the ingress.
     """
-    ingresses = k8s.NetworkingV1Api().list_namespaced_ingress(
-        namespace=namespace, label_selector="app=bodywork"
+    return resource_exists(
+        networking_v1_api().read_namespaced_ingress, name=name, namespace=namespace
     )
-    ingress_names = [ingress.metadata.name for ingress in ingresses.items]
-    return True if name in ingress_names else False
@@ -19,11 +19,17 @@ High-level interface to the Kubernetes core API as used to manage
 Kubernetes namespaces for Bodywork projects.
 """
 import sys
-from time import sleep
+from time import monotonic, sleep
 
 from kubernetes import client as k8s
 
-from .utils import make_valid_k8s_name
+from ..constants import K8S_NAMESPACE_DELETION_TIMEOUT_SECONDS
+from .utils import (
+    clear_ttl_caches,
+    core_v1_api,
+    make_valid_k8s_name,
+    resource_exists,
+)
 
 
 def namespace_exists(namespace: str) -> bool:
@@ -32,11 +38,7 @@ def namespace_exists(namespace: str) -> bool:
     :param namespace: Kubernetes namespace to check.
     :return: True if the namespace was found, otherwise False.
     """
-    namespace_objects = k8s.CoreV1Api().list_namespace().items
-    namespace_names = [
-        namespace_object.metadata.name for namespace_object in namespace_objects
-    ]
-    return True if namespace in namespace_names else False
+    return resource_exists(core_v1_api().read_namespace, name=namespace)
 
 
 def create_namespace(name: str) -> None:
@@ -45,23 +47,37 @@ def create_namespace(name: str) -> None:
     :param name: Kubernetes namespace to create.
     """
     valid_k8s_name = make_valid_k8s_name(name)
-    k8s.CoreV1Api().create_namespace(
+    core_v1_api().create_namespace(
         body=k8s.V1Namespace(metadata=k8s.V1ObjectMeta(name=valid_k8s_name))
     )
 
 
-def delete_namespace(name: str, print_progress: bool = False) -> None:
+def delete_namespace(
+    name: str,
+    print_progress: bool = False,
+    timeout_seconds: int = K8S_NAMESPACE_DELETION_TIMEOUT_SECONDS,
+) -> None:
     """Delete a new namespace and wait until finished.
 
     :param name: Kubernetes namespace to delete.
+    :param print_progress: Print a dot for every second spent waiting
+        for the namespace to be deleted, defaults to False.
+    :param timeout_seconds: How long to wait for the namespace to be
+        deleted, defaults to K8S_NAMESPACE_DELETION_TIMEOUT_SECONDS.
+    :raises TimeoutError: If the namespace has not been deleted before
+        the timeout.
     """
-    k8s.CoreV1Api().delete_namespace(name=name, propagation_policy="Background")
-    if print_progress:
-        while namespace_exists(name):
-            sleep(1)
+    core_v1_api().delete_namespace(name=name, propagation_policy="Background")
+    clear_ttl_caches()
+    deadline = monotonic() + timeout_seconds
+    while namespace_exists(name):
+        if monotonic() >= deadline:
+            raise TimeoutError(
+                f"namespace={name} yet to be deleted after {timeout_seconds}s"
+            )
+        sleep(1)
+        if print_progress:
             print(".", end="")
             sys.stdout.flush()
+    if print_progress:
         print("")
-    else:
-        while namespace_exists(name):
-            sleep(1)
@@ -18,32 +18,44 @@
 High-level interface to the Kubernetes APIs used to retrieve logs from
 active pods.
 """
-from typing import cast
+from codecs import getincrementaldecoder
+from typing import Iterator, Optional
 
 from kubernetes import client as k8s
 
+from ..constants import K8S_POD_LOGS_CHUNK_SIZE
+from .utils import core_v1_api
 
-def get_latest_pod_name(namespace: str, pod_name_prefix: str) -> str:
+
+def get_latest_pod_name(
+    namespace: str, pod_name_prefix: str, label_selector: str = None
+) -> Optional[str]:
     """Get full name of most recently started pod with a name prefix.
 
     :param namespace: The namespace in which to look for pods.
     :param pod_name_prefix: The pod name prefix to filter pods by.
-    :return: The full name of a pod.
+    :param label_selector: Selects the pods to consider on the API server
+        - e.g. 'job-name=foo' - defaults to None (all pods).
+    :return: The full name of a pod, or None if there are no matching pods.
     """
-    pod_list = k8s.CoreV1Api().list_namespaced_pod(namespace=namespace)
-    if pod_list:
-        filtered_pod_objects = sorted(
-            [
-                pod_object
-                for pod_object in pod_list.items
-                if pod_object.metadata.name.startswith(pod_name_prefix)
-            ],
-            key=lambda pod_object: str(pod_object.status.start_time),
-            reverse=True,
-        )
-        if filtered_pod_objects:
-            return cast(str, filtered_pod_objects[0].metadata.name)
-    return None
+    pod_list = core_v1_api().list_namespaced_pod(
+        namespace=namespace, label_selector=label_selector
+    )
+    if not pod_list:
+        return None
+    latest_pod_object = max(
+        (
+            pod_object
+            for pod_object in pod_list.items
+            if pod_object.metadata.name.startswith(pod_name_prefix)
+        ),
+        key=lambda pod_object: str(pod_object.status.start_time),
+        default=None,
+    )
+    if latest_pod_object is None:
+        return None
+    latest_pod_name: str = latest_pod_object.metadata.name
+    return latest_pod_name
 
 
 def get_pod_logs(namespace: str, pod_name: str, previous: bool = False) -> str:
@@ -54,12 +66,52 @@ def get_pod_logs(namespace: str, pod_name: str, previous: bool = False) -> str:
     :param previous: Return logs from previously crashed pod.
     :return: The pod logs as a single string object.
     """
+    pod_logs: str
     try:
-        pod_logs = k8s.CoreV1Api().read_namespaced_pod_log(
+        pod_logs = core_v1_api().read_namespaced_pod_log(
             namespace=namespace, name=pod_name, previous=previous
         )
     except k8s.ApiException:
-        pod_logs = k8s.CoreV1Api().read_namespaced_pod_log(
+        pod_logs = core_v1_api().read_namespaced_pod_log(
             namespace=namespace, name=pod_name, previous=False
         )
-    return cast(str, pod_logs[:-1])
+    return pod_logs[:-1]
+
+
+def get_pod_logs_stream(
+    namespace: str, pod_name: str, previous: bool = False
+) -> Iterator[str]:
+    """Stream the logs from the named pod, one line at a time.
+
+    The logs are read from the API in chunks, so only a chunk at a time
+    needs to be held in memory, and lines can be handled as soon as they
+    arrive - unlike get_pod_logs, which returns all of the logs at once.
+
+    :param namespace: The namespace in which to look for the pods.
+    :param pod_name: The name of the pod to retrieve logs from.
+    :param previous: Return logs from previously crashed pod.
+    :return: Iterator over the lines of the pod logs.
+    """
+    try:
+        response = core_v1_api().read_namespaced_pod_log(
+            namespace=namespace,
+            name=pod_name,
+            previous=previous,
+            _preload_content=False,
+        )
+    except k8s.ApiException:
+        response = core_v1_api().read_namespaced_pod_log(
+            namespace=namespace, name=pod_name, previous=False, _preload_content=False
+        )
+    decoder = getincrementaldecoder("utf-8")(errors="replace")
+    partial_line = ""
+    try:
+        for chunk in response.stream(K8S_POD_LOGS_CHUNK_SIZE):
+            lines = (partial_line + decoder.decode(chunk)).split("\n")
+            partial_line = lines.pop()
+            yield from lines
+        partial_line += decoder.decode(b"", final=True)
+        if partial_line:
+            yield partial_line
+    finally:
+        response.release_conn()
@@ -18,16 +18,19 @@
 High-level interface to the Kubernetes secrets API as used to create and
 manage secrets required by Bodywork stage containers.
 """
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Set, Tuple
 from base64 import b64decode
 from dataclasses import dataclass
+from http import HTTPStatus
 from pathlib import Path
 from kubernetes import client as k8s
+from kubernetes.client.rest import ApiException
 
-from .utils import make_valid_k8s_name
+from .utils import core_v1_api, make_valid_k8s_name
 from ..constants import (
     SECRET_GROUP_LABEL,
     BODYWORK_NAMESPACE,
+    K8S_LIST_PAGE_SIZE,
     SSH_PRIVATE_KEY_ENV_VAR,
     SSH_SECRET_NAME,
 )
@@ -62,10 +65,14 @@ def configure_env_vars_from_secrets(
         found.
     :return: A configured list of environment variables.
     """
+    secrets_keys = {
+        secret_name: _secret_keys(namespace, secret_name)
+        for secret_name in {secret_name for secret_name, _ in secret_varname_pairs}
+    }
     missing_secrets_info = [
         f"cannot find key={var_name} in secret={secret_name} in namespace={namespace}"
         for secret_name, var_name in secret_varname_pairs
-        if not secret_exists(namespace, secret_name, var_name)
+        if var_name not in (secrets_keys[secret_name] or ())
     ]
     if missing_secrets_info:
         msg = "; ".join(missing_secrets_info)
@@ -94,7 +101,7 @@ def replicate_secrets_in_namespace(target_namespace: str, secrets_group) -> None
     :param secrets_group: The group of secrets to copy.
     """
 
-    secrets = k8s.CoreV1Api().list_namespaced_secret(
+    secrets = core_v1_api().list_namespaced_secret(
         namespace=BODYWORK_NAMESPACE,
         label_selector=f"{SECRET_GROUP_LABEL}={secrets_group}",
     )
@@ -109,11 +116,11 @@ def replicate_secrets_in_namespace(target_namespace: str, secrets_group) -> None
             data=secret.data,
         )
         if secret_exists(target_namespace, secret_name):
-            k8s.CoreV1Api().replace_namespaced_secret(
+            core_v1_api().replace_namespaced_secret(
                 namespace=target_namespace, name=secret_name, body=copy
             )
         else:
-            k8s.CoreV1Api().create_namespaced_secret(
+            core_v1_api().create_namespaced_secret(
                 namespace=target_namespace, body=copy
             )
 
@@ -127,18 +134,29 @@ def secret_exists(namespace: str, secret_name: str, secret_key: str = None) -> b
     :return: True if the secret was found and the key within the secret
         was also found, otherwise False.
     """
-    existing_secrets = k8s.CoreV1Api().list_namespaced_secret(namespace=namespace)
-    secret_data = [
-        secret.data
-        for secret in existing_secrets.items
-        if secret.metadata.name == secret_name
-    ]
-    if len(secret_data) == 1 and secret_key is None:
-        return True
-    elif len(secret_data) == 1 and secret_key is not None:
-        return True if secret_data[0].get(secret_key) is not None else False
-    else:
+    secret_keys = _secret_keys(namespace, secret_name)
+    if secret_keys is None:
         return False
+    return secret_key is None or secret_key in secret_keys
+
+
+def _secret_keys(namespace: str, secret_name: str) -> Optional[Set[str]]:
+    """Get the keys of the data within a secret.
+
+    :param namespace: Kubernetes namespace in which to look for secrets.
+    :param secret_name: The name of the k8s secret to look for.
+    :return: The keys within the secret, or None if the secret was not
+        found.
+    """
+    try:
+        secret = core_v1_api().read_namespaced_secret(
+            namespace=namespace, name=secret_name
+        )
+    except ApiException as e:
+        if e.status == HTTPStatus.NOT_FOUND:
+            return None
+        raise
+    return {key for key, value in (secret.data or {}).items() if value is not None}
 
 
 def secret_group_exists(namespace: str, group: str) -> bool:
@@ -149,7 +167,7 @@ def secret_group_exists(namespace: str, group: str) -> bool:
     :return: True if group exists, otherwise False.
     """
     items = (
-        k8s.CoreV1Api()
+        core_v1_api()
         .list_namespaced_secret(
             namespace=namespace, label_selector=f"{SECRET_GROUP_LABEL}={group}"
         )
@@ -177,7 +195,7 @@ def create_secret(
         ),
         string_data=keys_and_values,
     )
-    k8s.CoreV1Api().create_namespaced_secret(namespace=namespace, body=secret)
+    core_v1_api().create_namespaced_secret(namespace=namespace, body=secret)
 
 
 def update_secret(namespace: str, name: str, keys_and_values: Dict[str, str]) -> None:
@@ -195,7 +213,7 @@ def update_secret(namespace: str, name: str, keys_and_values: Dict[str, str]) ->
         ),
         string_data=keys_and_values,
     )
-    k8s.CoreV1Api().patch_namespaced_secret(name, namespace, secret)
+    core_v1_api().patch_namespaced_secret(name, namespace, secret)
 
 
 def delete_secret(namespace: str, name: str) -> None:
@@ -204,7 +222,7 @@ def delete_secret(namespace: str, name: str) -> None:
     :param namespace: Namespace in which to look for the secret to delete.
     :param name: The name of the secret to be deleted.
     """
-    k8s.CoreV1Api().delete_namespaced_secret(namespace=namespace, name=name)
+    core_v1_api().delete_namespaced_secret(namespace=namespace, name=name)
 
 
 def delete_secret_group(namespace: str, group: str) -> None:
@@ -213,38 +231,50 @@ def delete_secret_group(namespace: str, group: str) -> None:
     :param namespace: Namespace in which to look for the secret to delete.
     :param group: The name of the secrets group to be deleted.
     """
-    k8s.CoreV1Api().delete_collection_namespaced_secret(
+    core_v1_api().delete_collection_namespaced_secret(
         namespace=namespace, label_selector=f"{SECRET_GROUP_LABEL}={group}"
     )
 
 
-def list_secrets(namespace: str, group: str = None) -> Dict[str, Secret]:
+def list_secrets(
+    namespace: str, group: str = None, page_size: int = K8S_LIST_PAGE_SIZE
+) -> Dict[str, Secret]:
     """Get all secrets and their (decoded) data.
 
+    Secrets are requested in pages, so that namespaces containing many
+    (or large) secrets do not have to be returned in a single response.
+
     :param namespace: Namespace in which to list secrets.
     :param group: Group of secrets to list.
+    :param page_size: Maximum number of secrets to request at a time,
+        defaults to K8S_LIST_PAGE_SIZE.
     """
-    if group is None:
-        result = k8s.CoreV1Api().list_namespaced_secret(namespace=namespace)
-    else:
-        result = k8s.CoreV1Api().list_namespaced_secret(
+    label_selector = f"{SECRET_GROUP_LABEL}={group}" if group is not None else None
+    secrets: Dict[str, Secret] = {}
+    continue_token = None
+    while True:
+        result = core_v1_api().list_namespaced_secret(
             namespace=namespace,
-            label_selector=f"{SECRET_GROUP_LABEL}={group}",
-        )
-    return {
-        s.metadata.name: Secret(
-            s.metadata.name,
-            s.metadata.labels[SECRET_GROUP_LABEL]
-            if s.metadata.labels and SECRET_GROUP_LABEL in s.metadata.labels
-            else None,
-            s.string_data
-            if s.string_data
-            else {
-                key: b64decode(value).decode("utf-8") for (key, value) in s.data.items()
-            },
+            label_selector=label_selector,
+            limit=page_size,
+            _continue=continue_token,
         )
-        for s in result.items
-    }
+        for s in result.items:
+            secrets[s.metadata.name] = Secret(
+                s.metadata.name,
+                s.metadata.labels[SECRET_GROUP_LABEL]
+                if s.metadata.labels and SECRET_GROUP_LABEL in s.metadata.labels
+                else None,
+                s.string_data
+                if s.string_data
+                else {
+                    key: b64decode(value).decode("utf-8")
+                    for (key, value) in (s.data or {}).items()
+                },
+            )
+        continue_token = result.metadata._continue if result.metadata else None
+        if not continue_token:
+            return secrets
 
 
 def create_ssh_key_secret_from_file(group: str, ssh_key_path: Path) -> None:
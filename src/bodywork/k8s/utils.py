@@ -19,15 +19,321 @@ Helper functions for working with the Kubernetes API.
 """
 import json
 import re
-from typing import cast, Iterable, List, Tuple, Union
+from contextlib import closing
+from functools import lru_cache, update_wrapper
+from http import HTTPStatus
+from math import ceil
+from time import monotonic
+from weakref import WeakSet
+from typing import (
+    Any,
+    Callable,
+    cast,
+    Dict,
+    Generator,
+    Generic,
+    Hashable,
+    Iterable,
+    List,
+    Tuple,
+    TypeVar,
+    Union,
+)
 
 from kubernetes.client.rest import ApiException
 from kubernetes import client as k8s
+from kubernetes.watch import Watch
 
 from ..exceptions import BodyworkClusterResourcesError
 
 EnvVars = k8s.V1EnvVar
 
+T = TypeVar("T")
+
+# Requesting this content type makes the API server return only the metadata of
+# each resource in a list, which is far smaller than whole objects.
+PARTIAL_OBJECT_METADATA_LIST = (
+    "application/json;as=PartialObjectMetadataList;v=v1;g=meta.k8s.io"
+)
+
+# Passing this resource version to a list request lets the API server answer it
+# from its watch cache, instead of making a quorum read from etcd. The result
+# can lag the very latest writes by a moment, so it is only used where that is
+# acceptable - e.g. checking whether a resource has already been set up.
+WATCH_CACHE_RESOURCE_VERSION = "0"
+
+# Deleting with this policy leaves the garbage collector to remove dependent
+# resources (e.g. pods), so the request returns without waiting for them.
+BACKGROUND_DELETE_OPTIONS = k8s.V1DeleteOptions(propagation_policy="Background")
+
+
+@lru_cache(maxsize=1)
+def shared_api_client() -> k8s.ApiClient:
+    """Get the API client shared by all calls to the Kubernetes API.
+
+    Every API object built with this client uses the same connection
+    pool, so that connections to the API server are reused between calls
+    instead of being opened afresh. The client is discarded whenever the
+    Kubernetes config is (re)loaded, so that it picks up the new config.
+
+    :return: Kubernetes API client.
+    """
+    return k8s.ApiClient()
+
+
+def core_v1_api() -> k8s.CoreV1Api:
+    """Get a core API object that uses the shared API client.
+
+    :return: Kubernetes core API object.
+    """
+    return k8s.CoreV1Api(shared_api_client())
+
+
+def rbac_v1_api() -> k8s.RbacAuthorizationV1Api:
+    """Get an RBAC authorization API object that uses the shared API client.
+
+    :return: Kubernetes RBAC authorization API object.
+    """
+    return k8s.RbacAuthorizationV1Api(shared_api_client())
+
+
+def apps_v1_api() -> k8s.AppsV1Api:
+    """Get an apps API object that uses the shared API client.
+
+    :return: Kubernetes apps API object.
+    """
+    return k8s.AppsV1Api(shared_api_client())
+
+
+def batch_v1_api() -> k8s.BatchV1Api:
+    """Get a batch API object that uses the shared API client.
+
+    :return: Kubernetes batch API object.
+    """
+    return k8s.BatchV1Api(shared_api_client())
+
+
+def batch_v1beta1_api() -> k8s.BatchV1beta1Api:
+    """Get a batch (v1beta1) API object that uses the shared API client.
+
+    :return: Kubernetes batch (v1beta1) API object.
+    """
+    return k8s.BatchV1beta1Api(shared_api_client())
+
+
+def networking_v1_api() -> k8s.NetworkingV1Api:
+    """Get a networking API object that uses the shared API client.
+
+    :return: Kubernetes networking API object.
+    """
+    return k8s.NetworkingV1Api(shared_api_client())
+
+
+class TTLCache(Generic[T]):
+    """Cache the results of a function for a limited time.
+
+    Within a single command, the same resources are often looked-up more
+    than once. Results are re-used until they expire, or until the cache
+    is cleared by a function that changes the resources being looked-up.
+    """
+
+    def __init__(self, func: Callable[..., T], ttl_seconds: float, maxsize: int):
+        """Constructor.
+
+        :param func: The function whose results will be cached.
+        :param ttl_seconds: How long a result can be re-used for.
+        :param maxsize: The maximum number of results to keep.
+        """
+        self._func = func
+        self._ttl_seconds = ttl_seconds
+        self._maxsize = maxsize
+        self._results: Dict[Hashable, Tuple[float, T]] = {}
+        update_wrapper(self, func)
+
+    def __call__(self, *args: Any, **kwargs: Any) -> T:
+        key = (args, tuple(sorted(kwargs.items())))
+        now = monotonic()
+        cached = self._results.get(key)
+        if cached is not None and cached[0] > now:
+            return cached[1]
+        result = self._func(*args, **kwargs)
+        if len(self._results) >= self._maxsize:
+            self._evict(now)
+        self._results[key] = (now + self._ttl_seconds, result)
+        return result
+
+    def _evict(self, now: float) -> None:
+        """Make space by removing expired results, else the oldest result.
+
+        :param now: The current time on the monotonic clock.
+        """
+        for key, (expires_at, _) in list(self._results.items()):
+            if expires_at <= now:
+                del self._results[key]
+        if len(self._results) >= self._maxsize:
+            del self._results[next(iter(self._results))]
+
+    def cache_clear(self) -> None:
+        """Remove all cached results."""
+        self._results.clear()
+
+
+_TTL_CACHES: "WeakSet[TTLCache[Any]]" = WeakSet()
+
+
+def ttl_cache(
+    ttl_seconds: float, maxsize: int = 128
+) -> Callable[[Callable[..., T]], TTLCache[T]]:
+    """Decorator that caches the results of a function for a limited time.
+
+    :param ttl_seconds: How long a result can be re-used for.
+    :param maxsize: The maximum number of results to keep, defaults to 128.
+    :return: Decorator that wraps a function in a TTLCache.
+    """
+
+    def decorator(func: Callable[..., T]) -> TTLCache[T]:
+        cache = TTLCache(func, ttl_seconds, maxsize)
+        _TTL_CACHES.add(cache)
+        return cache
+
+    return decorator
+
+
+def clear_ttl_caches() -> None:
+    """Remove all results cached by functions decorated with ttl_cache.
+
+    This must be called by anything that deletes resources in bulk (e.g.
+    a namespace), when it is not known which cached results are affected.
+    """
+    for cache in list(_TTL_CACHES):
+        cache.cache_clear()
+
+
+def list_resource_metadata(
+    resource_path: str,
+    path_params: Dict[str, str] = None,
+    label_selector: str = None,
+) -> List[Dict[str, Any]]:
+    """List the metadata of resources, without the rest of each object.
+
+    Use this when only names or labels are required, to avoid the API
+    server serialising (and the client deserialising) the spec and status
+    of every resource in the list.
+
+    :param resource_path: API path for the resources - e.g.
+        '/apis/apps/v1/namespaces/{namespace}/deployments'.
+    :param path_params: Values for the parameters in the path, defaults
+        to None.
+    :param label_selector: Selects the resources to list, defaults to
+        None (all resources).
+    :return: The metadata for each resource, as returned by the API.
+    """
+    query_params = [("labelSelector", label_selector)] if label_selector else []
+    response = shared_api_client().call_api(
+        resource_path,
+        "GET",
+        path_params=path_params,
+        query_params=query_params,
+        header_params={"Accept": PARTIAL_OBJECT_METADATA_LIST},
+        response_type="object",
+        auth_settings=["BearerToken"],
+        _return_http_data_only=True,
+    )
+    return [item["metadata"] for item in response["items"]]
+
+
+def resource_exists(read_resource: Callable[..., Any], **kwargs: Any) -> bool:
+    """Does a resource exist, according to the API method that reads it.
+
+    Reading a single resource by name is much cheaper than listing every
+    resource of the same kind, when checking for existence.
+
+    :param read_resource: The API method that reads the resource - e.g.
+        AppsV1Api().read_namespaced_deployment.
+    :param kwargs: Keyword arguments to pass to the API method.
+    :raises ApiException: If the API returns an error other than 404.
+    :return: True if the resource was found, otherwise False.
+    """
+    try:
+        read_resource(**kwargs)
+        return True
+    except ApiException as e:
+        if e.status == HTTPStatus.NOT_FOUND:
+            return False
+        raise
+
+
+def watch_namespaced_resources(
+    list_resources: Callable[..., Any],
+    namespace: str,
+    names: Iterable[str],
+    timeout_seconds: float,
+    kind: str,
+) -> Generator[Any, None, None]:
+    """Yield the latest state of named Bodywork resources, as it changes.
+
+    The resources are listed once, to get their current state and the
+    resource version to watch from, after which a single watch is kept
+    open until the timeout. If the API server ends the watch early, then
+    it is resumed from the last resource version seen - or, if that has
+    expired, the resources are listed again. Stop iterating to stop
+    watching.
+
+    :param list_resources: The API method that lists the resources in a
+        namespace - e.g. AppsV1Api().list_namespaced_deployment.
+    :param namespace: Namespace in which to watch resources.
+    :param names: Names of the resources to yield.
+    :param timeout_seconds: How long to keep watching for.
+    :param kind: The kind of resource, for error messages - e.g. 'job'.
+    :raises RuntimeError: If any of the resources cannot be found, or
+        are deleted.
+    :return: Iterator over the latest state of the named resources.
+    """
+    names = set(names)
+    deadline = monotonic() + timeout_seconds
+    resource_version = None
+    while True:
+        if resource_version is None:
+            resources = list_resources(
+                namespace=namespace, label_selector="app=bodywork"
+            )
+            missing = names - {resource.metadata.name for resource in resources.items}
+            if missing:
+                msg = f"cannot find {kind}={min(missing)} in namespace={namespace}"
+                raise RuntimeError(msg)
+            resource_version = resources.metadata.resource_version
+            for resource in resources.items:
+                if resource.metadata.name in names:
+                    yield resource
+
+        remaining_seconds = deadline - monotonic()
+        if remaining_seconds <= 0:
+            return
+        try:
+            with closing(
+                Watch().stream(
+                    list_resources,
+                    namespace=namespace,
+                    label_selector="app=bodywork",
+                    resource_version=resource_version,
+                    timeout_seconds=ceil(remaining_seconds),
+                )
+            ) as events:
+                for event in events:
+                    resource = event["object"]
+                    resource_version = resource.metadata.resource_version
+                    name = resource.metadata.name
+                    if name not in names:
+                        continue
+                    if event["type"] == "DELETED":
+                        msg = f"cannot find {kind}={name} in namespace={namespace}"
+                        raise RuntimeError(msg)
+                    yield resource
+        except ApiException as e:
+            if e.status != HTTPStatus.GONE:
+                raise
+            resource_version = None
+
 
 def api_exception_msg(e: ApiException) -> str:
     """Get k8s API error message from exception object.
@@ -52,6 +358,26 @@ def make_valid_k8s_name(name: str) -> str:
     return re.sub(r"[^a-zA-Z0-9.]+", "-", name.strip())
 
 
+def container_resource_requests(
+    cpu_request: float = None, memory_request: int = None
+) -> k8s.V1ResourceRequirements:
+    """Configure the resources that a container requests from a node.
+
+    :param cpu_request: CPU resource to request from a node, expressed
+        as a decimal number, defaults to None.
+    :param memory_request: Memory resource to request from a node, expressed
+        as an integer number of megabytes, defaults to None.
+    :return: Resource requirements containing only the requests that
+        were set, or none if neither was set.
+    """
+    requests = {}
+    if cpu_request:
+        requests["cpu"] = str(cpu_request)
+    if memory_request:
+        requests["memory"] = f"{memory_request}M"
+    return k8s.V1ResourceRequirements(requests=requests or None)
+
+
 def create_k8s_environment_variables(
     key_value_pairs: List[Tuple[str, str]]
 ) -> List[k8s.V1EnvVar]:
@@ -74,7 +400,7 @@ def has_unscheduleable_pods(k8s_resource: Union[k8s.V1Job, k8s.V1Deployment]) ->
     namespace = k8s_resource.metadata.namespace
     pod_base_name = k8s_resource.metadata.name
 
-    k8s_pod_query = k8s.CoreV1Api().list_namespaced_pod(
+    k8s_pod_query = core_v1_api().list_namespaced_pod(
         namespace=namespace,
     )
     k8s_pod_data = [
@@ -92,7 +418,7 @@ def has_unscheduleable_pods(k8s_resource: Union[k8s.V1Job, k8s.V1Deployment]) ->
             for pod in k8s_pod_data
             if pod.status.conditions[0].reason == "Unschedulable"
         ]
-        return True if unschedulable_pods else False
+        return bool(unschedulable_pods)
     except IndexError:
         return False
 
@@ -29,7 +29,14 @@ from ..constants import (
     BODYWORK_WORKFLOW_SERVICE_ACCOUNT,
     BODYWORK_WORKFLOW_JOB_TIME_TO_LIVE,
 )
-from .utils import make_valid_k8s_name
+from .utils import (
+    BACKGROUND_DELETE_OPTIONS,
+    batch_v1_api,
+    batch_v1beta1_api,
+    make_valid_k8s_name,
+)
+
+_WORKFLOW_CONTAINER_COMMAND = ("bodywork", "create", "deployment")
 
 
 def configure_workflow_job(
@@ -66,11 +73,7 @@ def configure_workflow_job(
         image=image,
         image_pull_policy="Always",
         env=container_env_vars,
-        command=[
-            "bodywork",
-            "create",
-            "deployment",
-        ],
+        command=list(_WORKFLOW_CONTAINER_COMMAND),
         args=container_args,
     )
     pod_spec = k8s.V1PodSpec(
@@ -115,7 +118,7 @@ def create_workflow_job(job: k8s.V1Job) -> None:
 
     :param job: A configured job object.
     """
-    k8s.BatchV1Api().create_namespaced_job(body=job, namespace=job.metadata.namespace)
+    batch_v1_api().create_namespaced_job(body=job, namespace=job.metadata.namespace)
 
 
 def configure_workflow_cronjob(
@@ -179,7 +182,7 @@ def create_workflow_cronjob(cron_job: k8s.V1Job) -> None:
 
     :param cron_job: A configured cron-job object.
     """
-    k8s.BatchV1beta1Api().create_namespaced_cron_job(
+    batch_v1beta1_api().create_namespaced_cron_job(
         body=cron_job, namespace=cron_job.metadata.namespace
     )
 
@@ -213,7 +216,7 @@ def update_workflow_cronjob(
 
     if not schedule:
         schedule = (
-            k8s.BatchV1beta1Api()
+            batch_v1beta1_api()
             .read_namespaced_cron_job(name, namespace)
             .spec.schedule
         )
@@ -223,11 +226,7 @@ def update_workflow_cronjob(
             containers=[
                 k8s.V1Container(
                     name="bodywork",
-                    command=[
-                        "bodywork",
-                        "create",
-                        "deployment",
-                    ],
+                    command=list(_WORKFLOW_CONTAINER_COMMAND),
                     args=[project_repo_url, project_repo_branch],
                 )
             ],
@@ -251,7 +250,7 @@ def update_workflow_cronjob(
         )
     )
 
-    k8s.BatchV1beta1Api().patch_namespaced_cron_job(name, namespace, cronjob)
+    batch_v1beta1_api().patch_namespaced_cron_job(name, namespace, cronjob)
 
 
 def delete_workflow_cronjob(namespace: str, name: str) -> None:
@@ -261,10 +260,10 @@ def delete_workflow_cronjob(namespace: str, name: str) -> None:
         delete.
     :param name: The name of the cronjob to be deleted.
     """
-    k8s.BatchV1beta1Api().delete_namespaced_cron_job(
+    batch_v1beta1_api().delete_namespaced_cron_job(
         name=name,
         namespace=namespace,
-        body=k8s.V1DeleteOptions(propagation_policy="Background"),
+        body=BACKGROUND_DELETE_OPTIONS,
     )
 
 
@@ -273,7 +272,7 @@ def list_workflow_cronjobs(namespace: str) -> Dict[str, Dict[str, str]]:
 
     :param namespace: Namespace in which to list cronjobs.
     """
-    cronjobs = k8s.BatchV1beta1Api().list_namespaced_cron_job(namespace=namespace)
+    cronjobs = batch_v1beta1_api().list_namespaced_cron_job(namespace=namespace)
     cronjob_info = {
         cronjob.metadata.name: {
             "schedule": cronjob.spec.schedule,
@@ -297,20 +296,26 @@ def list_workflow_jobs(
     """Get historic workflow jobs.
 
     Get status information for workflow jobs owned by a job or cronjob.
+    Only jobs created by Bodywork are requested from the API server, which
+    are then matched on the name prefix - e.g. 'async-workflow' matches all
+    of the async workflow jobs.
 
     :param namespace: Namespace in which to list workflow jobs.
     :param job_name: Name of job that triggered workflow job.
     :return: Dictionary of workflow jobs each mapping to a dictionary of
         status information fields for the workflow.
     """
-    workflow_jobs_query = k8s.BatchV1Api().list_namespaced_job(namespace=namespace)
+    workflow_jobs_query = batch_v1_api().list_namespaced_job(
+        namespace=namespace,
+        label_selector="app=bodywork",
+    )
     workflow_jobs_info = {
         workflow_job.metadata.name: {
             "start_time": workflow_job.status.start_time,
             "completion_time": workflow_job.status.completion_time,
-            "active": True if workflow_job.status.active else False,
-            "succeeded": True if workflow_job.status.succeeded else False,
-            "failed": True if workflow_job.status.failed else False,
+            "active": bool(workflow_job.status.active),
+            "succeeded": bool(workflow_job.status.succeeded),
+            "failed": bool(workflow_job.status.failed),
         }
         for workflow_job in workflow_jobs_query.items
         if workflow_job.metadata.name.startswith(job_name)
@@ -74,7 +74,7 @@ def bodywork_log_factory(
         log.setLevel(log_level_mapping[log_level])
     else:
         try:
-            bodywork_config = BodyworkConfig(config_file_path)
+            bodywork_config = BodyworkConfig.load(config_file_path)
             log.setLevel(bodywork_config.logging.log_level)
         except BodyworkConfigError:
             try:
@@ -70,7 +70,7 @@ def run_stage(
     try:
         download_project_code_from_repo(repo_url, repo_branch, cloned_repo_dir)
         config_file_path = cloned_repo_dir / PROJECT_CONFIG_FILENAME
-        project_config = BodyworkConfig(config_file_path)
+        project_config = BodyworkConfig.load(config_file_path)
         stage = project_config.stages[stage_name]
         environ["PYTHONPATH"] = str(cloned_repo_dir.absolute())
         if stage.requirements:
@@ -103,7 +103,7 @@ def run_stage(
         msg = f"Timeout exceeded when running {stage.executable_module}"
         raise BodyworkStageFailure(stage_name, msg)
     except Exception as e:
-        stage_failure_exception = BodyworkStageFailure(stage_name, e.__repr__())
+        stage_failure_exception = BodyworkStageFailure(stage_name, e)
         _log.error(stage_failure_exception)
         raise stage_failure_exception from e
 
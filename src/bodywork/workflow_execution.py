@@ -418,13 +418,14 @@ def _run_service_stages(
                 f".local:{deployment_port}"
             )
             k8s.expose_deployment_as_cluster_service(deployment_object)
-        if not k8s.has_ingress(namespace, deployment_name) and stage.create_ingress:
+        deployment_has_ingress = k8s.has_ingress(namespace, deployment_name)
+        if not deployment_has_ingress and stage.create_ingress:
             _log.info(
                 f"Creating k8s ingress for stage = {deployment_name} at "
                 f"path = /{namespace}/{deployment_name}"
             )
             k8s.create_deployment_ingress(deployment_object)
-        if k8s.has_ingress(namespace, deployment_name) and not stage.create_ingress:
+        if deployment_has_ingress and not stage.create_ingress:
             _log.info(
                 f"Deleting k8s ingress for stage = {deployment_name} at "
                 f"path = /{namespace}/{deployment_name}"
@@ -572,9 +573,13 @@ def _print_logs_to_stdout(
     :param previous: Return logs from previously crashed pod.
     """
     try:
-        pod_name = k8s.get_latest_pod_name(namespace, job_or_deployment_name)
+        pod_name = k8s.get_latest_pod_name(
+            namespace,
+            job_or_deployment_name,
+            label_selector=f"app=bodywork,stage={job_or_deployment_name}",
+        )
         if pod_name is not None:
-            pod_logs = k8s.get_pod_logs(namespace, pod_name, previous)
+            pod_logs = k8s.get_pod_logs_stream(namespace, pod_name, previous)
             print_pod_logs(pod_logs, f"logs for stage = {pod_name}")
         else:
             _log.warning(f"Cannot get logs for {job_or_deployment_name}")
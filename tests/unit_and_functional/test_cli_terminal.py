@@ -3,6 +3,7 @@ Tests for all code that handles printing and logging to stdout.
 """
 from datetime import datetime
 from re import findall
+from time import sleep
 from turtle import up
 from unittest.mock import patch, MagicMock
 
@@ -15,6 +16,7 @@ from bodywork.cli.terminal import (
     print_info,
     print_pod_logs,
     print_warn,
+    progress_bar_updates,
     update_progress_bar,
 )
 
@@ -40,6 +42,31 @@ def test_print_pod_logs_renders_logs(capsys: CaptureFixture):
     assert "[09/13/21 15:02:05] INFO     Something else happened" in stdout
 
 
+def test_print_pod_logs_renders_streamed_logs(capsys: CaptureFixture):
+    logs = iter(
+        [
+            "[09/13/21 15:02:05] INFO     Something happened",
+            "[09/13/21 15:02:05] INFO     Something else happened",
+        ]
+    )
+    print_pod_logs(logs, "foo")
+    stdout = capsys.readouterr().out
+    assert findall(r"─.+foo.+─", stdout)
+    assert "[09/13/21 15:02:05] INFO     Something happened\n" in stdout
+    assert "[09/13/21 15:02:05] INFO     Something else happened\n" in stdout
+
+
+
+@patch("bodywork.cli.terminal.POD_LOGS_PRINT_BATCH_SIZE", 2)
+def test_print_pod_logs_writes_streamed_logs_in_batches_without_markup(
+    capsys: CaptureFixture,
+):
+    logs = iter(["[bold]first line[/bold]", "second line", "third line"])
+    print_pod_logs(logs, "foo")
+    stdout = capsys.readouterr().out
+    assert "[bold]first line[/bold]\nsecond line\nthird line\n" in stdout
+
+
 def test_print_info_and_warn_print_to_stdout_with_different_styles(
     capsys: CaptureFixture,
 ):
@@ -75,3 +102,21 @@ def test_get_progress_description(
     mock_get_progress_desc.return_value = "bar"
     update_progress_bar(mock_progress)
     mock_progress.update.assert_called_once_with("foo", advance=1, description="bar")
+
+
+@patch("bodywork.cli.terminal.update_progress_bar")
+def test_progress_bar_updates_updates_progress_bar_until_context_exits(
+    mock_update_progress_bar: MagicMock,
+):
+    mock_progress_bar = MagicMock()
+    with progress_bar_updates(mock_progress_bar, 0.01):
+        sleep(0.1)
+    mock_update_progress_bar.assert_called_with(mock_progress_bar)
+    update_count = mock_update_progress_bar.call_count
+    sleep(0.05)
+    assert mock_update_progress_bar.call_count == update_count
+
+    mock_update_progress_bar.reset_mock()
+    with progress_bar_updates(None, 0.01):
+        sleep(0.05)
+    mock_update_progress_bar.assert_not_called()
@@ -22,6 +22,8 @@ from datetime import datetime
 from unittest.mock import MagicMock, patch
 
 from _pytest.capture import CaptureFixture
+from kubernetes import client as k8s_client
+
 from bodywork.constants import BODYWORK_NAMESPACE
 
 from bodywork.cli.workflow_jobs import (
@@ -339,6 +341,32 @@ def test_display_workflow_cronjobs_in_namespace(
     assert findall(r"git_branch.+project_repo_branch", captured_three.out)
 
 
+@patch("kubernetes.client.BatchV1Api")
+@patch("bodywork.cli.workflow_jobs.k8s.namespace_exists")
+def test_display_workflow_job_history_shows_all_async_workflow_jobs(
+    mock_namespace_exists: MagicMock,
+    mock_k8s_batch_api: MagicMock,
+    capsys: CaptureFixture,
+):
+    mock_namespace_exists.return_value = True
+    mock_k8s_batch_api().list_namespaced_job.return_value = k8s_client.V1JobList(
+        items=[
+            k8s_client.V1Job(
+                metadata=k8s_client.V1ObjectMeta(
+                    name=f"async-workflow-{n}",
+                    labels={"app": "bodywork", "deployment-name": f"async-workflow-{n}"},
+                ),
+                status=k8s_client.V1JobStatus(succeeded=1),
+            )
+            for n in ("1605214260", "1605214320")
+        ]
+    )
+    display_workflow_job_history(BODYWORK_NAMESPACE, "async-workflow")
+    captured = capsys.readouterr()
+    assert "async-workflow-1605214260" in captured.out
+    assert "async-workflow-1605214320" in captured.out
+
+
 @patch("bodywork.cli.workflow_jobs.k8s")
 def test_display_workflow_job_history(
     mock_k8s_module: MagicMock, capsys: CaptureFixture
@@ -386,7 +414,7 @@ def test_display_cronjob_workflow_job_logs(
     mock_k8s_module.get_latest_pod_name.return_value = (
         "bodywork-test-project-12345-pqrs"
     )
-    mock_k8s_module.get_pod_logs.return_value = "INFO - foo.py - bar"
+    mock_k8s_module.get_pod_logs_stream.return_value = iter(["INFO - foo.py - bar"])
     display_workflow_job_logs("bodywork-dev", "bodywork-test-project-12345")
     captured_three = capsys.readouterr()
     assert "INFO - foo.py - bar" in captured_three.out
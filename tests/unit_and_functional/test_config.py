@@ -18,6 +18,7 @@
 Test Bodywork config reading, parsing and validation.
 """
 from pathlib import Path
+from unittest.mock import patch
 
 from pytest import fixture, raises
 
@@ -29,6 +30,8 @@ from bodywork.config import (
     PipelineConfig,
     ServiceStageConfig,
     StageConfig,
+    _CONFIG_CACHE,
+    _CONFIG_CACHE_MAXSIZE,
     _parse_dag_definition,
     _check_workflow_stages_are_configured,
 )
@@ -66,6 +69,26 @@ def test_key_value_data_parser_correctly_correctly_formats_errors():
     assert errors[1] == "a.b.version -> must be of string type"
 
 
+def test_key_value_data_parser_correctly_validates_nested_data():
+    schema = {
+        "args": {"type": "list", "schema": {"type": "string"}},
+        "secrets": {
+            "type": "dict",
+            "keysrules": {"type": "string"},
+            "valuesrules": {"type": "string", "regex": r"[a-z]+"},
+        },
+    }
+    validator = DictDataValidator(schema)
+    invalid_data = {"args": ["a", 1], "secrets": {"B": "b-1", "A": None}}
+    errors = validator.find_errors_in(invalid_data, prefix="a.")
+    assert errors[0] == 'a.args -> [{"1": ["must be of string type"]}]'
+    assert errors[1] == (
+        'a.secrets -> [{"A": ["null value not allowed"], '
+        '"B": ["value does not match regex \'[a-z]+\'"]}]'
+    )
+    assert validator.find_errors_in("foo", prefix="a.") == ["a -> must be of dict type"]
+
+
 def test_that_invalid_config_file_path_raises_error(project_repo_location: Path):
     bad_config_file = project_repo_location / "bodywerk.yaml"
     with raises(BodyworkConfigFileExistsError, match="No config file found"):
@@ -124,6 +147,74 @@ def test_that_config_file_with_mismatched_schema_version_raises_error(
         bodywork_config._validate_parsed_config()
 
 
+def test_load_reuses_parsed_config_until_config_file_changes(tmp_path: Path):
+    config_file = tmp_path / "bodywork.yaml"
+    config_file.write_bytes(
+        Path("tests/resources/project_repo/bodywork.yaml").read_bytes()
+    )
+    with patch.object(
+        BodyworkConfig, "quick_version_check", wraps=BodyworkConfig.quick_version_check
+    ) as mock_version_check:
+        config = BodyworkConfig.load(config_file)
+        cached_config = BodyworkConfig.load(config_file)
+        assert mock_version_check.call_count == 1
+        assert cached_config is not config
+        assert cached_config.logging.log_level == config.logging.log_level
+
+        config.logging.log_level = "ERROR"
+        assert BodyworkConfig.load(config_file).logging.log_level == "INFO"
+
+        config_file.write_text(config_file.read_text().replace("INFO", "DEBUG"))
+        reloaded_config = BodyworkConfig.load(config_file)
+        assert mock_version_check.call_count == 2
+        assert reloaded_config.logging.log_level == "DEBUG"
+
+    with raises(BodyworkConfigFileExistsError, match="No config file found"):
+        BodyworkConfig.load(tmp_path / "bodywerk.yaml")
+
+
+def test_load_keeps_a_bounded_number_of_configs(tmp_path: Path):
+    config_file_bytes = Path("tests/resources/project_repo/bodywork.yaml").read_bytes()
+    config_files = []
+    for n in range(_CONFIG_CACHE_MAXSIZE + 1):
+        config_file = tmp_path / f"bodywork_{n}.yaml"
+        config_file.write_bytes(config_file_bytes)
+        config_files.append(config_file)
+
+    _CONFIG_CACHE.clear()
+    try:
+        for config_file in config_files:
+            BodyworkConfig.load(config_file)
+        assert len(_CONFIG_CACHE) == _CONFIG_CACHE_MAXSIZE
+        assert (str(config_files[0].absolute()), False) not in _CONFIG_CACHE
+        assert (str(config_files[-1].absolute()), False) in _CONFIG_CACHE
+    finally:
+        _CONFIG_CACHE.clear()
+
+
+def test_quick_version_check_rejects_mismatched_schema_version(
+    project_repo_location: Path, tmp_path: Path
+):
+    BodyworkConfig.quick_version_check(project_repo_location / "bodywork.yaml")
+
+    config_file = tmp_path / "bodywork.yaml"
+    config_file.write_text('version: "0.1"\npipeline:\n  name: ' + "x" * 2048)
+    with raises(BodyworkConfigVersionMismatchError, match="schema version 0.1,"):
+        BodyworkConfig.quick_version_check(config_file)
+
+    with raises(BodyworkConfigFileExistsError, match="No config file found"):
+        BodyworkConfig.quick_version_check(tmp_path / "bodywerk.yaml")
+
+
+def test_load_rejects_mismatched_schema_version_before_full_parse(tmp_path: Path):
+    config_file = tmp_path / "bodywork.yaml"
+    config_file.write_text('version: "0.1"\npipeline:\n  name: ' + "x" * 2048)
+    with patch.object(BodyworkConfig, "__init__") as mock_init:
+        with raises(BodyworkConfigVersionMismatchError, match="schema version 0.1,"):
+            BodyworkConfig.load(config_file)
+        mock_init.assert_not_called()
+
+
 def test_that_config_file_with_non_list_stages_raises_error(
     bodywork_config: BodyworkConfig,
 ):
@@ -369,7 +460,15 @@ def test_py_modules_that_cannot_be_located_raise_error(bodywork_config: Bodywork
     expected_exception_msg = (
         "missing or invalid parameters: "
         "pipeline.workflow -> cannot find valid stage @ stages.stage_1, "
-        "pipeline.workflow -> cannot find valid stage @ stages.stage_2, "
+        "pipeline.workflow -> cannot find valid stage @ stages.stage_2$"
+    )
+    with raises(BodyworkConfigValidationError, match=expected_exception_msg):
+        bodywork_config._validate_parsed_config()
+
+    bodywork_config._config["stages"]["stage_1"] = stage_1
+    bodywork_config._config["stages"]["stage_2"] = stage_2
+    expected_exception_msg = (
+        "missing or invalid parameters: "
         "stages.stage_3.executable_module_path -> does not exist"
     )
     with raises(BodyworkConfigValidationError, match=expected_exception_msg):
@@ -435,6 +534,10 @@ def test_parse_dag_definition_parses_multi_stage_dags():
     expected_dag_structure = [["stage_1"], ["stage_2", "stage_3"], ["stage_4"]]
     assert parsed_dag_structure == expected_dag_structure
 
+    dag_definition = " stage_1>>stage_2 , stage_3  >>  stage_4 "
+    parsed_dag_structure = _parse_dag_definition(dag_definition)
+    assert parsed_dag_structure == expected_dag_structure
+
 
 def test_parse_dag_definition_parses_single_stage_dags():
     dag_definition = "stage_1"
@@ -459,6 +562,9 @@ def test_check_workflow_stages_are_configured():
         "pipeline.workflow -> cannot find valid stage @ stages.c"
     ]
     assert _check_workflow_stages_are_configured(["a"], ["a"]) == []
+    assert _check_workflow_stages_are_configured([["a"], ["b", "a"]], ["b"]) == [
+        "pipeline.workflow -> cannot find valid stage @ stages.a"
+    ]
 
 
 def test_check_failure_stage_is_configured(
@@ -18,32 +18,101 @@
 Tests for Git repository interaction functions.
 """
 import os
-from pytest import raises
-from unittest.mock import patch, MagicMock, mock_open
+from pytest import fixture, raises
+from unittest.mock import patch, MagicMock
 from subprocess import CalledProcessError
 from pathlib import Path
+from typing import Iterable
 
 from bodywork.exceptions import BodyworkGitError
 from bodywork.constants import (
+    GITLAB_SSH_FINGERPRINT,
     SSH_PRIVATE_KEY_ENV_VAR,
     DEFAULT_PROJECT_DIR,
     GIT_SSH_COMMAND,
+    SKIP_GIT_PROBE_ENV_VAR,
 )
 from bodywork.git import (
+    _CONFIGURED_KNOWN_HOSTS,
+    _configure_known_hosts,
+    _extract_ssh_hostname,
+    _git_available,
+    _rsa_host_key_fingerprint,
+    _skip_git_probe,
+    _SSH_PUBLIC_KEY_CACHE,
     ConnectionProtocol,
     download_project_code_from_repo,
     get_connection_protocol,
     setup_ssh_for_git_host,
     get_ssh_public_key_from_domain,
     get_git_commit_hash,
+    known_hosts_contains_domain_key,
 )
 
+TEST_RSA_KEY = (
+    "AAAAB3NzaC1yc2EAAAADAQABAAABAQDRC0o3rbAmYIsO6cXC1Y6++isFvqOMYq/dpg1qav"
+    "lrlwqpos8bTqFxzX09QbArH2XW2HZkaop653TumI144ii7ov+zNleP0a8Gof+pfFe2F+HwCF"
+    "ExBheyTHqMcqgLFEEYxgq9VA0GwmJZ2qugiIbd31oZFQTXJBb7ROZgfRmu/tplFP75aD8cx0"
+    "y8fri0fD2iDvHQJ12CZbal0RaGI+g3coHJ7vpCHe0EyjJsQs8guvbEA/lriuuSBiOqo7/1mq"
+    "PD7N4ew45Rfg+AI57+Gd/FPCDXOzr3BogBD6O8iNrtdcTdl5YwBMAS3E6rYdO1viGrLUZdnL"
+    "bZKQzMoJUdurWN"
+)
+
+
+@fixture(autouse=True)
+def reset_known_hosts_setup() -> Iterable[None]:
+    yield
+    _CONFIGURED_KNOWN_HOSTS.clear()
+
 
 def test_that_git_project_clone_raises_exceptions():
     with raises(BodyworkGitError, match="Git clone failed"):
         download_project_code_from_repo("file:///bad_url")
 
 
+@patch("bodywork.git.which", return_value=None)
+def test_that_git_project_clone_raises_exception_when_git_is_not_available(
+    mock_which: MagicMock,
+):
+    _git_available.cache_clear()
+    try:
+        for _ in range(2):
+            with raises(BodyworkGitError, match="git is not available"):
+                download_project_code_from_repo("file:///bad_url")
+        mock_which.assert_called_once_with("git")
+    finally:
+        _git_available.cache_clear()
+
+
+@patch.dict(os.environ, {SKIP_GIT_PROBE_ENV_VAR: "1"})
+@patch("bodywork.git._git_available", return_value=False)
+def test_that_git_project_clone_skips_git_check_when_env_var_set(
+    mock_git_available: MagicMock,
+):
+    with raises(BodyworkGitError, match="Git clone failed"):
+        download_project_code_from_repo("file:///bad_url")
+    mock_git_available.assert_not_called()
+
+
+@patch.dict(os.environ, {SKIP_GIT_PROBE_ENV_VAR: "0"})
+@patch("bodywork.git._git_available", return_value=False)
+def test_that_git_project_clone_checks_for_git_when_env_var_is_false(
+    mock_git_available: MagicMock,
+):
+    with raises(BodyworkGitError, match="git is not available"):
+        download_project_code_from_repo("file:///bad_url")
+    mock_git_available.assert_called_once()
+
+
+def test_skip_git_probe_parses_env_var_value():
+    for value in ("1", "true", "True", "YES"):
+        with patch.dict(os.environ, {SKIP_GIT_PROBE_ENV_VAR: value}):
+            assert _skip_git_probe() is True
+    for value in ("", "0", "false", "no", "off"):
+        with patch.dict(os.environ, {SKIP_GIT_PROBE_ENV_VAR: value}):
+            assert _skip_git_probe() is False
+
+
 @patch("bodywork.git.setup_ssh_for_git_host")
 def test_that_git_project_clone_returns_git_error_in_exception(
     mock_setup_ssh: MagicMock,
@@ -69,6 +138,13 @@ def test_get_connection_protocol_raises_exception_for_unknown_protocol():
         get_connection_protocol(conn_str)
 
 
+def test_extract_ssh_hostname_gets_hostname_from_ssh_urls():
+    assert _extract_ssh_hostname("git@github.com:bodywork-ml/test.git") == "github.com"
+    assert _extract_ssh_hostname("git@GitLab.com:bodywork-ml/test.git") == "gitlab.com"
+    assert _extract_ssh_hostname("git@:bodywork-ml/test.git") is None
+    assert _extract_ssh_hostname("https://github.com/bodywork-ml/test") is None
+
+
 def test_setup_ssh_for_github_raises_exception_no_private_key_env_var():
     hostname = "github.com"
     if os.environ.get(SSH_PRIVATE_KEY_ENV_VAR):
@@ -100,6 +176,7 @@ def test_get_ssh_public_key_from_domain_throws_exception_if_ssh_fingerprints_do_
     mock_run: MagicMock,
 ):
     hostname = "github.com"
+    mock_run.return_value = MagicMock(stdout=f"{hostname} ssh-rsa {TEST_RSA_KEY}\n")
     with raises(
         ConnectionAbortedError,
         match=f"SECURITY ALERT! SSH Fingerprint received "
@@ -108,6 +185,37 @@ def test_get_ssh_public_key_from_domain_throws_exception_if_ssh_fingerprints_do_
         get_ssh_public_key_from_domain(hostname)
 
 
+@patch("bodywork.git._rsa_host_key_fingerprint")
+@patch("bodywork.git.run")
+def test_get_ssh_public_key_from_domain_caches_verified_keys(
+    mock_run: MagicMock, mock_fingerprint: MagicMock
+):
+    hostname = "gitlab.com"
+    mock_run.return_value = MagicMock(stdout="gitlab.com ssh-rsa AAAA")
+    mock_fingerprint.return_value = GITLAB_SSH_FINGERPRINT
+    try:
+        assert get_ssh_public_key_from_domain(hostname) == "gitlab.com ssh-rsa AAAA"
+        assert get_ssh_public_key_from_domain(hostname) == "gitlab.com ssh-rsa AAAA"
+        mock_run.assert_called_once()
+    finally:
+        _SSH_PUBLIC_KEY_CACHE.clear()
+
+
+def test_rsa_host_key_fingerprint_matches_ssh_keygen_output():
+    known_hosts_entry = f"github.com ssh-rsa {TEST_RSA_KEY}\n"
+    expected_fingerprint = (
+        "2048 SHA256:Lz7oCgzHT+FJSHaJ+YkcEGOerxiqC8bo5UyskFCF2VI github.com (RSA)"
+    )
+    assert _rsa_host_key_fingerprint(known_hosts_entry) == expected_fingerprint
+
+
+def test_rsa_host_key_fingerprint_raises_exception_for_invalid_keys():
+    with raises(ValueError, match="no public keys found"):
+        _rsa_host_key_fingerprint("")
+    with raises(ValueError, match="not a valid RSA public key"):
+        _rsa_host_key_fingerprint("github.com ssh-rsa AAAA\n")
+
+
 @patch("bodywork.git.run", side_effect=CalledProcessError(999, "git rev-parse"))
 def test_get_git_commit_hash_throws_bodyworkgiterror_on_fail(
     mock_run: MagicMock,
@@ -130,13 +238,11 @@ def test_get_git_commit_hash_throws_bodyworkgiterror_when_invalid_path(
 
 @patch("bodywork.git.run")
 @patch("bodywork.git.get_ssh_public_key_from_domain")
-@patch("bodywork.git.Path.touch")
 @patch("bodywork.git.Path.mkdir")
 @patch("bodywork.git.os")
 def test_setup_ssh_for_git_host_create_known_host_and_env_var(
     mock_os: MagicMock,
     mock_mkdir: MagicMock,
-    mock_touch: MagicMock,
     mock_get_ssh: MagicMock,
     mock_run: MagicMock,
 ):
@@ -145,13 +251,13 @@ def test_setup_ssh_for_git_host_create_known_host_and_env_var(
     try:
         with patch.object(Path, "exists") as mock_exists:
             mock_exists.return_value = False
-            with patch.object(Path, "open", mock_open()) as m:
-                setup_ssh_for_git_host("github.com")
+            setup_ssh_for_git_host("github.com")
 
-            handle = m()
-            handle.write.assert_any_call("MY_PRIVATE_KEY\n")
+            fd = mock_os.open.return_value
+            mock_os.write.assert_any_call(fd, b"MY_PRIVATE_KEY\n")
             mock_get_ssh.assert_called_with("github.com")
-            handle.write.assert_any_call("fingerprint")
+            mock_os.write.assert_any_call(fd, b"fingerprint")
+            assert all(call.args[2] == 0o600 for call in mock_os.open.call_args_list)
     except Exception:
         assert False
 
@@ -168,3 +274,51 @@ def test_use_ssh_key_from_file(
     )
 
     assert "SSH_key" in os.environ.get(GIT_SSH_COMMAND)
+
+
+def test_known_hosts_contains_domain_key_rereads_file_only_when_it_changes(
+    tmp_path: Path,
+):
+    known_hosts = tmp_path / "known_hosts"
+    known_hosts.write_text("gitlab.com ssh-rsa AAAA\n")
+    assert known_hosts_contains_domain_key("gitlab.com", known_hosts) is True
+
+    with patch.object(Path, "read_text") as mock_read_text:
+        assert known_hosts_contains_domain_key("gitlab.com", known_hosts) is True
+        assert known_hosts_contains_domain_key("github.com", known_hosts) is False
+        mock_read_text.assert_not_called()
+
+    with known_hosts.open(mode="a") as file_handle:
+        file_handle.write("github.com ssh-rsa BBBB\n")
+    assert known_hosts_contains_domain_key("github.com", known_hosts) is True
+
+
+@patch("bodywork.git.get_ssh_public_key_from_domain", return_value="github.com key\n")
+def test_configure_known_hosts_only_configures_each_host_once(
+    mock_get_ssh: MagicMock,
+    tmp_path: Path,
+):
+    known_hosts = tmp_path / "known_hosts"
+    _configure_known_hosts("github.com", known_hosts)
+    _configure_known_hosts("github.com", known_hosts)
+    mock_get_ssh.assert_called_once_with("github.com")
+    assert known_hosts.read_text() == "github.com key\n"
+
+
+@patch("bodywork.git.get_ssh_public_key_from_domain", return_value="github.com key\n")
+def test_configure_known_hosts_reconfigures_host_when_known_hosts_changes(
+    mock_get_ssh: MagicMock,
+    tmp_path: Path,
+):
+    known_hosts = tmp_path / "known_hosts"
+    _configure_known_hosts("github.com", known_hosts)
+
+    known_hosts.write_text("gitlab.com ssh-rsa key\n")
+    _configure_known_hosts("github.com", known_hosts)
+    assert mock_get_ssh.call_count == 2
+    assert known_hosts.read_text() == "gitlab.com ssh-rsa key\ngithub.com key\n"
+
+    known_hosts.unlink()
+    _configure_known_hosts("github.com", known_hosts)
+    assert mock_get_ssh.call_count == 3
+    assert known_hosts.read_text() == "github.com key\n"
@@ -19,16 +19,24 @@ Unit tests for the high-level Kubernetes interface to the authentication
 and authorisation APIs used to grant users and pods access to Kubernetes
 resources.
 """
+from time import sleep
 from unittest.mock import MagicMock, patch
-from typing import Iterable
+from typing import Any, Callable, Iterable
 
 import kubernetes
+from kubernetes.client.rest import ApiException
+from pytest import fixture, raises
+
+import bodywork.k8s.auth
 
 from bodywork.constants import (
     BODYWORK_WORKFLOW_CLUSTER_ROLE,
-    BODYWORK_WORKFLOW_SERVICE_ACCOUNT,
+    K8S_API_CONNECTION_POOL_SIZE,
+    K8S_API_MAX_RETRIES,
+    K8S_API_RETRY_BACKOFF_FACTOR,
 )
 from bodywork.k8s.auth import (
+    clear_existence_check_caches,
     cluster_role_exists,
     cluster_role_binding_exists,
     delete_cluster_role_binding,
@@ -38,6 +46,20 @@ from bodywork.k8s.auth import (
     setup_stages_service_account,
     setup_workflow_service_accounts,
 )
+from bodywork.k8s.utils import shared_api_client
+
+
+@fixture(autouse=True)
+def reset_kubernetes_config_loaded() -> Iterable[None]:
+    yield
+    bodywork.k8s.auth._kubernetes_config_loaded = False
+
+
+@fixture(autouse=True)
+def reset_existence_check_caches() -> Iterable[None]:
+    clear_existence_check_caches()
+    yield
+    clear_existence_check_caches()
 
 
 @patch("kubernetes.config.load_incluster_config")
@@ -56,6 +78,38 @@ def test_load_kubernetes_config_loads_kube_config_when_not_in_cluster(
     mock_k8s_load_kube_config.assert_called_once()
 
 
+@patch("kubernetes.config.load_kube_config")
+def test_load_kubernetes_config_replaces_shared_api_client(
+    mock_k8s_load_kube_config: MagicMock,
+):
+    api_client = shared_api_client()
+    assert shared_api_client() is api_client
+    load_kubernetes_config()
+    assert shared_api_client() is not api_client
+
+
+@patch("kubernetes.config.load_kube_config")
+def test_load_kubernetes_config_configures_connection_pool_and_retries(
+    mock_k8s_load_kube_config: MagicMock,
+):
+    load_kubernetes_config()
+    configuration = kubernetes.client.Configuration.get_default_copy()
+    assert configuration.connection_pool_maxsize == K8S_API_CONNECTION_POOL_SIZE
+    assert configuration.retries.total == K8S_API_MAX_RETRIES
+    assert configuration.retries.backoff_factor == K8S_API_RETRY_BACKOFF_FACTOR
+
+
+@patch("kubernetes.config.load_kube_config")
+def test_load_kubernetes_config_only_loads_config_once_unless_forced(
+    mock_k8s_load_kube_config: MagicMock,
+):
+    load_kubernetes_config()
+    load_kubernetes_config()
+    mock_k8s_load_kube_config.assert_called_once()
+    load_kubernetes_config(force=True)
+    assert mock_k8s_load_kube_config.call_count == 2
+
+
 @patch("kubernetes.client.CoreV1Api")
 def test_service_account_exists_identifies_existing_service_accounts(
     mock_k8s_core_api: MagicMock,
@@ -73,6 +127,11 @@ def test_service_account_exists_identifies_existing_service_accounts(
     )
     assert service_account_exists("bodywork-dev", "bodywork-sa") is True
     assert service_account_exists("bodywork-dev", "foo-sa") is False
+    mock_k8s_core_api().list_namespaced_service_account.assert_called_with(
+        namespace="bodywork-dev",
+        field_selector="metadata.name=foo-sa",
+        resource_version="0",
+    )
 
 
 @patch("kubernetes.client.RbacAuthorizationV1Api")
@@ -141,6 +200,22 @@ def test_cluster_role_binding_exists_exists_identifies_existing_cluster_role_bin
     assert cluster_role_binding_exists("cluster-role-binding-0") is False
 
 
+@patch("kubernetes.client.RbacAuthorizationV1Api")
+def test_cluster_role_binding_exists_reuses_results_until_binding_deleted(
+    mock_k8s_rbac_api: MagicMock,
+):
+    mock_k8s_rbac_api().list_cluster_role_binding.return_value = (
+        kubernetes.client.V1ClusterRoleBindingList(items=[])
+    )
+    assert cluster_role_binding_exists("cluster-role-binding-1") is False
+    assert cluster_role_binding_exists("cluster-role-binding-1") is False
+    mock_k8s_rbac_api().list_cluster_role_binding.assert_called_once()
+
+    delete_cluster_role_binding("cluster-role-binding-1")
+    assert cluster_role_binding_exists("cluster-role-binding-1") is False
+    assert mock_k8s_rbac_api().list_cluster_role_binding.call_count == 2
+
+
 def test_workflow_cluster_role_binding_name():
     namespace = "bodywork-dev"
     expected_workflow_crb = f"{BODYWORK_WORKFLOW_CLUSTER_ROLE}--{namespace}"
@@ -150,36 +225,87 @@ def test_workflow_cluster_role_binding_name():
 def test_setup_workflow_service_account_creates_service_accounts_and_roles():
     with patch("kubernetes.client.CoreV1Api") as mock_k8s_core_api:
         with patch("kubernetes.client.RbacAuthorizationV1Api") as mock_k8s_rbac_api:
-            mock_k8s_rbac_api().list_cluster_role.return_value = (
-                kubernetes.client.V1alpha1ClusterRoleList(items=[])
-            )
-            mock_k8s_rbac_api().list_cluster_role_bindings.return_value = (
-                kubernetes.client.V1ClusterRoleBindingList(items=[])
-            )
             setup_workflow_service_accounts("bodywork-dev")
             mock_k8s_core_api().create_namespaced_service_account.assert_called_once()
             mock_k8s_rbac_api().create_cluster_role.assert_called_once()
             mock_k8s_rbac_api().create_cluster_role_binding.assert_called_once()
+            mock_k8s_rbac_api().list_cluster_role.assert_called_once()
+            mock_k8s_rbac_api().list_cluster_role_binding.assert_not_called()
 
-    with patch("kubernetes.client.CoreV1Api") as mock_k8s_core_api:
+
+def test_setup_workflow_service_account_does_not_create_existing_cluster_role():
+    with patch("kubernetes.client.CoreV1Api"):
         with patch("kubernetes.client.RbacAuthorizationV1Api") as mock_k8s_rbac_api:
             mock_k8s_rbac_api().list_cluster_role.return_value = (
-                kubernetes.client.V1alpha1ClusterRoleList(
+                kubernetes.client.V1ClusterRoleList(
                     items=[
                         kubernetes.client.V1ClusterRole(
                             metadata=kubernetes.client.V1ObjectMeta(
-                                name=BODYWORK_WORKFLOW_SERVICE_ACCOUNT
+                                name=BODYWORK_WORKFLOW_CLUSTER_ROLE
                             )
                         )
                     ]
                 )
             )
+            mock_k8s_rbac_api().create_cluster_role.side_effect = ApiException(
+                status=403, reason="Forbidden"
+            )
             setup_workflow_service_accounts("bodywork-dev")
-            mock_k8s_core_api().create_namespaced_service_account.assert_called_once()
             mock_k8s_rbac_api().create_cluster_role.assert_not_called()
             mock_k8s_rbac_api().create_cluster_role_binding.assert_called_once()
 
 
+def test_setup_workflow_service_account_ignores_existing_resources():
+    with patch("kubernetes.client.CoreV1Api") as mock_k8s_core_api:
+        with patch("kubernetes.client.RbacAuthorizationV1Api") as mock_k8s_rbac_api:
+            mock_k8s_rbac_api().create_cluster_role.side_effect = ApiException(
+                status=409, reason="Conflict"
+            )
+            setup_workflow_service_accounts("bodywork-dev")
+            mock_k8s_core_api().create_namespaced_service_account.assert_called_once()
+            mock_k8s_rbac_api().create_cluster_role.assert_called_once()
+            mock_k8s_rbac_api().create_cluster_role_binding.assert_called_once()
+
+
+def test_setup_workflow_service_account_raises_other_api_errors():
+    with patch("kubernetes.client.CoreV1Api"):
+        with patch("kubernetes.client.RbacAuthorizationV1Api") as mock_k8s_rbac_api:
+            mock_k8s_rbac_api().create_cluster_role.side_effect = ApiException(
+                status=403, reason="Forbidden"
+            )
+            with raises(ApiException, match="Forbidden"):
+                setup_workflow_service_accounts("bodywork-dev")
+
+
+def test_setup_service_accounts_create_roles_before_role_bindings():
+    created = []
+
+    def create(kind: str, delay: float = 0) -> Callable[..., None]:
+        def _create(**kwargs: Any) -> None:
+            sleep(delay)
+            created.append(kind)
+
+        return _create
+
+    with patch("kubernetes.client.CoreV1Api"):
+        with patch("kubernetes.client.RbacAuthorizationV1Api") as mock_k8s_rbac_api:
+            mock_k8s_rbac_api().create_namespaced_role.side_effect = create(
+                "role", 0.1
+            )
+            mock_k8s_rbac_api().create_namespaced_role_binding.side_effect = create(
+                "role-binding"
+            )
+            mock_k8s_rbac_api().create_cluster_role.side_effect = create(
+                "cluster-role", 0.1
+            )
+            mock_k8s_rbac_api().create_cluster_role_binding.side_effect = create(
+                "cluster-role-binding"
+            )
+            setup_stages_service_account("bodywork-dev")
+            setup_workflow_service_accounts("bodywork-dev")
+    assert created == ["role", "role-binding", "cluster-role", "cluster-role-binding"]
+
+
 def test_setup_job_and_deployment_service_account_creates_service_accounts_and_roles():
     with patch("kubernetes.client.CoreV1Api") as mock_k8s_core_api:
         with patch("kubernetes.client.RbacAuthorizationV1Api") as mock_k8s_rbac_api:
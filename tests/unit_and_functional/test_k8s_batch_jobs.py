@@ -18,6 +18,8 @@
 Unit tests for the high-level Kubernetes jobs interface, used to
 orchestrate the execution of batch stages.
 """
+from copy import deepcopy
+from typing import Any, Dict, Iterator, List
 from unittest.mock import MagicMock, Mock, patch
 
 import kubernetes
@@ -28,9 +30,10 @@ from bodywork.k8s.batch_jobs import (
     configure_batch_stage_job,
     create_job,
     delete_job,
-    _get_job_status,
+    _job_status,
     JobStatus,
     monitor_jobs_to_completion,
+    _watch_jobs_status,
 )
 
 
@@ -133,131 +136,259 @@ def test_delete_job_tries_to_create_job_with_k8s_api(
     )
 
 
-@patch("kubernetes.client.BatchV1Api")
-def test_get_job_status_correctly_determines_active_status(
-    mock_k8s_batch_api: MagicMock, batch_stage_job_object: kubernetes.client.V1Job
-):
-    mock_k8s_batch_api().list_namespaced_job.return_value = kubernetes.client.V1JobList(
-        items=[kubernetes.client.V1Job(status=kubernetes.client.V1JobStatus(active=1))]
+def job_event(
+    job: kubernetes.client.V1Job,
+    event_type: str = "MODIFIED",
+    **status: Any,
+) -> Dict[str, Any]:
+    job = deepcopy(job)
+    job.metadata.resource_version = "2"
+    job.status = kubernetes.client.V1JobStatus(**status)
+    return {"type": event_type, "object": job}
+
+
+def watch_events(events: List[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+    yield from events
+
+
+def job_list(*events: Dict[str, Any]) -> kubernetes.client.V1JobList:
+    return kubernetes.client.V1JobList(
+        metadata=kubernetes.client.V1ListMeta(resource_version="1"),
+        items=[event["object"] for event in events],
     )
-    assert _get_job_status(batch_stage_job_object) == JobStatus.ACTIVE
 
 
-@patch("kubernetes.client.BatchV1Api")
-def test_get_job_status_correctly_determines_succeeded_status(
-    mock_k8s_batch_api: MagicMock, batch_stage_job_object: kubernetes.client.V1Job
+def failed_conditions() -> List[kubernetes.client.V1JobCondition]:
+    return [kubernetes.client.V1JobCondition(type="Failed", status="True")]
+
+
+def test_job_status_correctly_determines_status(
+    batch_stage_job_object: kubernetes.client.V1Job,
 ):
-    mock_k8s_batch_api().list_namespaced_job.return_value = kubernetes.client.V1JobList(
-        items=[
-            kubernetes.client.V1Job(status=kubernetes.client.V1JobStatus(succeeded=1))
-        ]
-    )
-    assert _get_job_status(batch_stage_job_object) == JobStatus.SUCCEEDED
+    active = job_event(batch_stage_job_object, active=1)["object"]
+    assert _job_status(active) == JobStatus.ACTIVE
 
+    succeeded = job_event(batch_stage_job_object, succeeded=1)["object"]
+    assert _job_status(succeeded) == JobStatus.SUCCEEDED
 
-@patch("kubernetes.client.BatchV1Api")
-def test_get_job_status_correctly_determines_failed_status(
-    mock_k8s_batch_api: MagicMock, batch_stage_job_object: kubernetes.client.V1Job
+    failed = job_event(batch_stage_job_object, failed=1, conditions=failed_conditions())
+    assert _job_status(failed["object"]) == JobStatus.FAILED
+
+
+def test_job_status_treats_jobs_being_retried_as_active(
+    batch_stage_job_object: kubernetes.client.V1Job,
 ):
-    mock_k8s_batch_api().list_namespaced_job.return_value = kubernetes.client.V1JobList(
-        items=[kubernetes.client.V1Job(status=kubernetes.client.V1JobStatus(failed=1))]
-    )
-    assert _get_job_status(batch_stage_job_object) == JobStatus.FAILED
+    backoff_limit = batch_stage_job_object.spec.backoff_limit
+
+    retrying = job_event(batch_stage_job_object, failed=1)["object"]
+    assert _job_status(retrying) == JobStatus.ACTIVE
+
+    retrying = job_event(batch_stage_job_object, failed=backoff_limit)["object"]
+    assert _job_status(retrying) == JobStatus.ACTIVE
+
+    failed = job_event(batch_stage_job_object, failed=backoff_limit + 1)["object"]
+    assert _job_status(failed) == JobStatus.FAILED
+
+
+def test_job_status_raises_exception_when_status_cannot_be_determined(
+    batch_stage_job_object: kubernetes.client.V1Job,
+):
+    unknown = job_event(batch_stage_job_object)["object"]
+    with raises(RuntimeError, match="cannot determine status"):
+        _job_status(unknown)
 
 
 @patch("kubernetes.client.BatchV1Api")
-def test_get_job_status_raises_exception_when_status_cannot_be_determined(
-    mock_k8s_batch_api: MagicMock, batch_stage_job_object: kubernetes.client.V1Job
+@patch("bodywork.k8s.utils.Watch")
+def test_watch_jobs_status_stops_when_jobs_are_not_active(
+    mock_watch: MagicMock,
+    mock_k8s_batch_api: MagicMock,
+    batch_stage_job_object: kubernetes.client.V1Job,
 ):
-    mock_k8s_batch_api().list_namespaced_job.return_value = kubernetes.client.V1JobList(
-        items=[
-            kubernetes.client.V1Job(
-                status=kubernetes.client.V1JobStatus(active="maybe")
-            )
+    namespace = batch_stage_job_object.metadata.namespace
+    name = batch_stage_job_object.metadata.name
+    other_job_object = deepcopy(batch_stage_job_object)
+    other_job_object.metadata.name = "some-other-job"
+    mock_k8s_batch_api().list_namespaced_job.return_value = job_list(
+        job_event(other_job_object, active=1),
+        job_event(batch_stage_job_object, active=1),
+    )
+    mock_watch().stream.return_value = watch_events(
+        [
+            job_event(other_job_object, active=1),
+            job_event(batch_stage_job_object, succeeded=1),
+            job_event(batch_stage_job_object, active=1),
         ]
     )
-    with raises(RuntimeError, match="cannot determine status"):
-        _get_job_status(batch_stage_job_object)
+
+    jobs_status = {(namespace, name): JobStatus.ACTIVE}
+    _watch_jobs_status(namespace, jobs_status, 10)
+    assert jobs_status == {(namespace, name): JobStatus.SUCCEEDED}
+    mock_k8s_batch_api().list_namespaced_job.assert_called_once_with(
+        namespace=namespace, label_selector="app=bodywork"
+    )
+    mock_watch().stream.assert_called_once_with(
+        mock_k8s_batch_api().list_namespaced_job,
+        namespace=namespace,
+        label_selector="app=bodywork",
+        resource_version="1",
+        timeout_seconds=10,
+    )
 
 
 @patch("kubernetes.client.BatchV1Api")
-def test_get_job_status_raises_exception_when_job_cannot_be_found(
-    mock_k8s_batch_api: MagicMock, batch_stage_job_object: kubernetes.client.V1Job
+@patch("bodywork.k8s.utils.Watch")
+def test_watch_jobs_status_raises_exception_when_job_is_missing(
+    mock_watch: MagicMock,
+    mock_k8s_batch_api: MagicMock,
+    batch_stage_job_object: kubernetes.client.V1Job,
 ):
-    mock_k8s_batch_api().list_namespaced_job.return_value = kubernetes.client.V1JobList(
-        items=[]
+    namespace = batch_stage_job_object.metadata.namespace
+    name = batch_stage_job_object.metadata.name
+    mock_k8s_batch_api().list_namespaced_job.return_value = job_list()
+    with raises(RuntimeError, match="cannot find job"):
+        _watch_jobs_status(namespace, {(namespace, name): JobStatus.ACTIVE}, 10)
+
+
+@patch("kubernetes.client.BatchV1Api")
+@patch("bodywork.k8s.utils.Watch")
+def test_watch_jobs_status_raises_exception_when_job_is_deleted(
+    mock_watch: MagicMock,
+    mock_k8s_batch_api: MagicMock,
+    batch_stage_job_object: kubernetes.client.V1Job,
+):
+    namespace = batch_stage_job_object.metadata.namespace
+    name = batch_stage_job_object.metadata.name
+    mock_k8s_batch_api().list_namespaced_job.return_value = job_list(
+        job_event(batch_stage_job_object, active=1)
+    )
+    mock_watch().stream.return_value = watch_events(
+        [job_event(batch_stage_job_object, "DELETED", active=1)]
     )
     with raises(RuntimeError, match="cannot find job"):
-        _get_job_status(batch_stage_job_object)
+        _watch_jobs_status(namespace, {(namespace, name): JobStatus.ACTIVE}, 10)
 
 
-@patch("bodywork.k8s.batch_jobs._get_job_status")
+@patch("kubernetes.client.BatchV1Api")
+@patch("bodywork.k8s.utils.Watch")
 @patch("bodywork.k8s.batch_jobs.check_resource_scheduling_status")
 def test_monitor_jobs_to_completion_raises_timeout_error_if_jobs_do_not_succeed(
     mock_check_resource_scheduling_status: MagicMock,
-    mock_job_status: MagicMock,
+    mock_watch: MagicMock,
+    mock_k8s_batch_api: MagicMock,
     batch_stage_job_object: kubernetes.client.V1Job,
 ):
-    mock_job_status.return_value = JobStatus.ACTIVE
+    mock_k8s_batch_api().list_namespaced_job.return_value = job_list(
+        job_event(batch_stage_job_object, active=1)
+    )
+    mock_watch().stream.side_effect = lambda *args, **kwargs: watch_events(
+        [job_event(batch_stage_job_object, active=1)]
+    )
     with raises(TimeoutError, match="yet to reach status=succeeded"):
-        monitor_jobs_to_completion([batch_stage_job_object], timeout_seconds=1)
+        monitor_jobs_to_completion(
+            [batch_stage_job_object], timeout_seconds=1, wait_before_start_seconds=0
+        )
 
 
-@patch("bodywork.k8s.batch_jobs._get_job_status")
+@patch("kubernetes.client.BatchV1Api")
+@patch("bodywork.k8s.utils.Watch")
 @patch("bodywork.k8s.batch_jobs.check_resource_scheduling_status")
 def test_monitor_jobs_to_completion_raises_bodyworkjobfailures_error_if_jobs_fail(
     mock_check_resource_scheduling_status: MagicMock,
-    mock_job_status: MagicMock,
+    mock_watch: MagicMock,
+    mock_k8s_batch_api: MagicMock,
     batch_stage_job_object: kubernetes.client.V1Job,
 ):
-    mock_job_status.return_value = JobStatus.FAILED
+    mock_k8s_batch_api().list_namespaced_job.return_value = job_list(
+        job_event(batch_stage_job_object, active=1)
+    )
+    mock_watch().stream.return_value = watch_events(
+        [job_event(batch_stage_job_object, failed=1, conditions=failed_conditions())]
+    )
     with raises(BodyworkJobFailure, match="have failed"):
-        monitor_jobs_to_completion([batch_stage_job_object], timeout_seconds=1)
+        monitor_jobs_to_completion(
+            [batch_stage_job_object], timeout_seconds=1, wait_before_start_seconds=0
+        )
+
+
+@patch("kubernetes.client.BatchV1Api")
+@patch("bodywork.k8s.utils.Watch")
+@patch("bodywork.k8s.batch_jobs.check_resource_scheduling_status")
+def test_monitor_jobs_to_completion_raises_on_first_failure_while_jobs_are_active(
+    mock_check_resource_scheduling_status: MagicMock,
+    mock_watch: MagicMock,
+    mock_k8s_batch_api: MagicMock,
+    batch_stage_job_object: kubernetes.client.V1Job,
+):
+    other_job_object = deepcopy(batch_stage_job_object)
+    other_job_object.metadata.name = "some-other-job"
+    mock_k8s_batch_api().list_namespaced_job.return_value = job_list(
+        job_event(batch_stage_job_object, active=1),
+        job_event(other_job_object, active=1),
+    )
+    mock_watch().stream.return_value = watch_events(
+        [job_event(other_job_object, failed=1, conditions=failed_conditions())]
+    )
+    with raises(BodyworkJobFailure, match="some-other-job"):
+        monitor_jobs_to_completion(
+            [batch_stage_job_object, other_job_object],
+            timeout_seconds=60,
+            wait_before_start_seconds=0,
+        )
+    mock_watch().stream.assert_called_once()
 
 
-@patch("bodywork.k8s.batch_jobs._get_job_status")
+@patch("kubernetes.client.BatchV1Api")
+@patch("bodywork.k8s.utils.Watch")
 @patch("bodywork.k8s.batch_jobs.check_resource_scheduling_status")
 def test_monitor_jobs_to_completion_identifies_successful_jobs(
     mock_check_resource_scheduling_status: MagicMock,
-    mock_job_status: MagicMock,
+    mock_watch: MagicMock,
+    mock_k8s_batch_api: MagicMock,
     batch_stage_job_object: kubernetes.client.V1Job,
 ):
-    mock_job_status.side_effect = [
-        JobStatus.ACTIVE,
-        JobStatus.ACTIVE,
-        JobStatus.SUCCEEDED,
-        JobStatus.SUCCEEDED,
-    ]
+    other_job_object = deepcopy(batch_stage_job_object)
+    other_job_object.metadata.name = "some-other-job"
+    mock_k8s_batch_api().list_namespaced_job.return_value = job_list(
+        job_event(batch_stage_job_object, active=1),
+        job_event(other_job_object, succeeded=1),
+    )
+    mock_watch().stream.return_value = watch_events(
+        [job_event(batch_stage_job_object, succeeded=1)]
+    )
     successful = monitor_jobs_to_completion(
-        [batch_stage_job_object, batch_stage_job_object],
+        [batch_stage_job_object, other_job_object],
         timeout_seconds=1,
         polling_freq_seconds=0.5,
+        wait_before_start_seconds=0,
     )
     assert successful is True
+    mock_k8s_batch_api().list_namespaced_job.assert_called_once()
+    mock_watch().stream.assert_called_once()
 
 
+@patch("kubernetes.client.BatchV1Api")
 @patch("bodywork.k8s.batch_jobs.check_resource_scheduling_status")
-@patch("bodywork.k8s.batch_jobs.update_progress_bar")
-@patch("bodywork.k8s.batch_jobs._get_job_status")
+@patch("bodywork.k8s.batch_jobs.progress_bar_updates")
 def test_monitor_jobs_to_completion_updates_progress_bar(
-    mock_job_status: MagicMock,
-    mock_update_progress_bar: MagicMock,
+    mock_progress_bar_updates: MagicMock,
     mock_check_resource_scheduling_status: MagicMock,
+    mock_k8s_batch_api: MagicMock,
     batch_stage_job_object: kubernetes.client.V1Job,
 ):
-    mock_job_status.side_effect = [
-        JobStatus.ACTIVE,
-        JobStatus.SUCCEEDED,
-    ]
-    monitor_jobs_to_completion([batch_stage_job_object], 1, 0.5, progress_bar=None)
-    mock_update_progress_bar.assert_not_called()
-
-    mock_job_status.side_effect = [
-        JobStatus.ACTIVE,
-        JobStatus.SUCCEEDED,
-    ]
+    mock_k8s_batch_api().list_namespaced_job.return_value = job_list(
+        job_event(batch_stage_job_object, succeeded=1)
+    )
     mock_progress_bar = Mock()
     monitor_jobs_to_completion(
-        [batch_stage_job_object], 1, 0.5, progress_bar=mock_progress_bar
+        [batch_stage_job_object], 1, 0.5, 0, progress_bar=mock_progress_bar
     )
-    mock_update_progress_bar.assert_called()
+    mock_progress_bar_updates.assert_called_once_with(mock_progress_bar, 0.5)
+
+
+def test_bodywork_job_failure_message_can_be_rendered_more_than_once(
+    batch_stage_job_object: kubernetes.client.V1Job,
+):
+    exception = BodyworkJobFailure(job for job in [batch_stage_job_object])
+    assert str(exception) == str(exception)
+    assert "job=bodywork-test-project--train" in str(exception)
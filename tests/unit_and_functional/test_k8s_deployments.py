@@ -20,10 +20,12 @@ orchestrate the execution of service deployment stages.
 """
 from copy import deepcopy
 from datetime import datetime
+from typing import Any, Dict, Iterator, List
 from unittest.mock import call, MagicMock, Mock, patch
 
 import kubernetes
 import copy
+from kubernetes.client.rest import ApiException
 from pytest import fixture, raises
 
 from bodywork.exceptions import BodyworkClusterResourcesError
@@ -42,7 +44,8 @@ from bodywork.k8s.deployments import (
     ingress_route,
     is_existing_deployment,
     is_exposed_as_cluster_service,
-    _get_deployment_status,
+    _deployment_status,
+    _watch_deployments_status,
     list_service_stage_deployments,
     monitor_deployments_to_completion,
     rollback_deployment,
@@ -129,6 +132,30 @@ def test_configure_service_stage_deployment():
     assert containers[0].liveness_probe.period_seconds == 10
 
 
+@patch("bodywork.k8s.deployments.datetime")
+def test_configure_service_stage_deployment_sets_new_timestamp_for_every_update(
+    mock_datetime: MagicMock,
+):
+    mock_datetime.now.side_effect = [
+        datetime(2020, 9, 3, 15, 8, 41, 100),
+        datetime(2020, 9, 3, 15, 8, 41, 200),
+    ]
+    timestamps = [
+        configure_service_stage_deployment(
+            "bodywork-dev",
+            "serve",
+            "bodywork-test-project",
+            "bodywork-ml/bodywork-test-project",
+            "xyz123",
+        ).spec.template.metadata.annotations["last-updated"]
+        for _ in range(2)
+    ]
+    assert timestamps == [
+        "2020-09-03T15:08:41.000100",
+        "2020-09-03T15:08:41.000200",
+    ]
+
+
 @patch("kubernetes.client.AppsV1Api")
 def test_create_deployment_tries_to_create_deployment_with_k8s_api(
     mock_k8s_apps_api: MagicMock,
@@ -145,27 +172,18 @@ def test_is_existing_deployment_correctly_filters_deployments(
     mock_k8s_apps_api: MagicMock,
     service_stage_deployment_object: kubernetes.client.V1Deployment,
 ):
-    mock_k8s_apps_api().list_namespaced_deployment.side_effect = [
-        kubernetes.client.V1DeploymentList(
-            items=[
-                kubernetes.client.V1Deployment(
-                    metadata=kubernetes.client.V1ObjectMeta(name="myservice")
-                )
-            ]
-        ),
-        kubernetes.client.V1DeploymentList(
-            items=[
-                kubernetes.client.V1Deployment(
-                    metadata=kubernetes.client.V1ObjectMeta(name="some-other-stage")
-                )
-            ]
-        ),
+    mock_k8s_apps_api().read_namespaced_deployment.side_effect = [
+        service_stage_deployment_object,
+        ApiException(status=404, reason="Not Found"),
     ]
 
     service_stage_namespace = service_stage_deployment_object.metadata.namespace
     service_stage_name = service_stage_deployment_object.metadata.name
     assert is_existing_deployment(service_stage_namespace, service_stage_name) is True
     assert is_existing_deployment(service_stage_namespace, service_stage_name) is False
+    mock_k8s_apps_api().read_namespaced_deployment.assert_called_with(
+        name=service_stage_name, namespace=service_stage_namespace
+    )
 
 
 @patch("kubernetes.client.AppsV1Api")
@@ -254,6 +272,37 @@ def test_rollback_deployment_tries_to_patch_deployment_to_force_rollback(
     )
 
 
+@patch("kubernetes.client.AppsV1Api")
+def test_rollback_deployment_orders_revisions_numerically(
+    mock_k8s_apps_api: MagicMock,
+    service_stage_deployment_object: kubernetes.client.V1Deployment,
+):
+    replica_sets = []
+    for revision in ["9", "10", "2"]:
+        template_spec = deepcopy(service_stage_deployment_object.spec.template)
+        template_spec.metadata.annotations["last-updated"] = revision
+        replica_sets.append(
+            kubernetes.client.V1ReplicaSet(
+                metadata=kubernetes.client.V1ObjectMeta(
+                    annotations={"deployment.kubernetes.io/revision": revision},
+                ),
+                spec=kubernetes.client.V1ReplicaSetSpec(
+                    selector=kubernetes.client.V1LabelSelector(
+                        match_labels={"stage": "my-app"}
+                    ),
+                    template=template_spec,
+                ),
+            )
+        )
+    mock_k8s_apps_api().list_namespaced_replica_set.return_value = (
+        kubernetes.client.V1ReplicaSetList(items=replica_sets)
+    )
+
+    rollback_deployment(service_stage_deployment_object)
+    _, patch_kwargs = mock_k8s_apps_api().patch_namespaced_deployment.call_args
+    assert patch_kwargs["body"][0]["value"] is replica_sets[0].spec.template
+
+
 @patch("kubernetes.client.AppsV1Api")
 @patch("bodywork.k8s.deployments.delete_deployment")
 def test_rollback_deployment_tries_to_delete_new_deployments(
@@ -316,12 +365,14 @@ def test_delete_all_namespace_deployments_tries_to_delete_deployments_with_k8s_a
     mock_k8s_apps_api: MagicMock,
     service_stage_deployment_object: kubernetes.client.V1Deployment,
 ):
-    mock_k8s_apps_api().list_namespaced_deployment.return_value = (
-        kubernetes.client.V1JobList(  # noqa
-            items=[service_stage_deployment_object, service_stage_deployment_object]
+    with patch("bodywork.k8s.deployments.list_resource_metadata") as mock_list:
+        mock_list.return_value = [{"name": "myservice"}, {"name": "myservice"}]
+        delete_all_namespace_deployments("bodywork-dev")
+        mock_list.assert_called_once_with(
+            "/apis/apps/v1/namespaces/{namespace}/deployments",
+            {"namespace": "bodywork-dev"},
+            label_selector="app=bodywork",
         )
-    )
-    delete_all_namespace_deployments("bodywork-dev")
     mock_k8s_apps_api().delete_namespaced_deployment.assert_has_calls(
         [
             call(
@@ -339,123 +390,295 @@ def test_delete_all_namespace_deployments_tries_to_delete_deployments_with_k8s_a
 
 
 @patch("kubernetes.client.AppsV1Api")
-def test_get_deployment_status_correctly_determines_complete_status(
+def test_delete_all_namespace_deployments_raises_errors_from_deletes(
+    mock_k8s_apps_api: MagicMock,
+):
+    mock_k8s_apps_api().delete_namespaced_deployment.side_effect = ApiException(
+        status=403, reason="Forbidden"
+    )
+    with patch("bodywork.k8s.deployments.list_resource_metadata") as mock_list:
+        mock_list.return_value = [{"name": "myservice"}]
+        with raises(ApiException, match="Forbidden"):
+            delete_all_namespace_deployments("bodywork-dev")
+        mock_list.return_value = []
+        delete_all_namespace_deployments("bodywork-dev")
+        mock_k8s_apps_api().delete_namespaced_deployment.assert_called_once()
+
+
+def deployment_event(
+    deployment: kubernetes.client.V1Deployment,
+    available_replicas: int = None,
+    unavailable_replicas: int = None,
+    event_type: str = "MODIFIED",
+) -> Dict[str, Any]:
+    deployment = deepcopy(deployment)
+    deployment.metadata.resource_version = "2"
+    deployment.status = kubernetes.client.V1DeploymentStatus(
+        available_replicas=available_replicas,
+        unavailable_replicas=unavailable_replicas,
+    )
+    return {"type": event_type, "object": deployment}
+
+
+def watch_events(events: List[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+    yield from events
+
+
+def deployment_list(*events: Dict[str, Any]) -> kubernetes.client.V1DeploymentList:
+    return kubernetes.client.V1DeploymentList(
+        metadata=kubernetes.client.V1ListMeta(resource_version="1"),
+        items=[event["object"] for event in events],
+    )
+
+
+def test_deployment_status_correctly_determines_status(
+    service_stage_deployment_object: kubernetes.client.V1Deployment,
+):
+    active = deployment_event(service_stage_deployment_object, 1, None)["object"]
+    assert _deployment_status(active) == DeploymentStatus.ACTIVE
+
+    progressing = deployment_event(service_stage_deployment_object, 1, 1)["object"]
+    assert _deployment_status(progressing) == DeploymentStatus.PROGRESSING
+
+
+def test_deployment_status_raises_exception_when_status_cannot_be_determined(
+    service_stage_deployment_object: kubernetes.client.V1Deployment,
+):
+    unknown = deployment_event(service_stage_deployment_object, 0, 0)["object"]
+    with raises(RuntimeError, match="cannot determine status for deployment"):
+        _deployment_status(unknown)
+
+
+@patch("kubernetes.client.AppsV1Api")
+@patch("bodywork.k8s.utils.Watch")
+def test_watch_deployments_status_stops_when_deployments_are_active(
+    mock_watch: MagicMock,
     mock_k8s_apps_api: MagicMock,
     service_stage_deployment_object: kubernetes.client.V1Deployment,
 ):
-    mock_k8s_apps_api().list_namespaced_deployment.return_value = (
-        kubernetes.client.V1DeploymentList(
-            items=[
-                kubernetes.client.V1Deployment(
-                    metadata=kubernetes.client.V1ObjectMeta(name="myservice"),
-                    status=kubernetes.client.V1DeploymentStatus(
-                        available_replicas=1, unavailable_replicas=None
-                    ),
-                )
-            ]
-        )
+    namespace = service_stage_deployment_object.metadata.namespace
+    name = service_stage_deployment_object.metadata.name
+    other_deployment_object = deepcopy(service_stage_deployment_object)
+    other_deployment_object.metadata.name = "some-other-service"
+    mock_k8s_apps_api().list_namespaced_deployment.return_value = deployment_list(
+        deployment_event(other_deployment_object, 1, None),
+        deployment_event(service_stage_deployment_object, None, 1),
     )
-    assert (
-        _get_deployment_status(service_stage_deployment_object)
-        == DeploymentStatus.ACTIVE
+    mock_watch().stream.return_value = watch_events(
+        [
+            deployment_event(other_deployment_object, 1, None),
+            deployment_event(service_stage_deployment_object, 1, None),
+            deployment_event(service_stage_deployment_object, None, 1),
+        ]
+    )
+
+    deployments_status = {(namespace, name): DeploymentStatus.PROGRESSING}
+    _watch_deployments_status(namespace, deployments_status, 10)
+    assert deployments_status == {(namespace, name): DeploymentStatus.ACTIVE}
+    mock_k8s_apps_api().list_namespaced_deployment.assert_called_once_with(
+        namespace=namespace, label_selector="app=bodywork"
+    )
+    mock_watch().stream.assert_called_once_with(
+        mock_k8s_apps_api().list_namespaced_deployment,
+        namespace=namespace,
+        label_selector="app=bodywork",
+        resource_version="1",
+        timeout_seconds=10,
     )
 
 
 @patch("kubernetes.client.AppsV1Api")
-def test_get_deployment_status_raises_exception_when_status_cannot_be_determined(
+@patch("bodywork.k8s.utils.Watch")
+def test_watch_deployments_status_does_not_watch_active_deployments(
+    mock_watch: MagicMock,
     mock_k8s_apps_api: MagicMock,
     service_stage_deployment_object: kubernetes.client.V1Deployment,
 ):
-    mock_k8s_apps_api().list_namespaced_deployment.return_value = (
-        kubernetes.client.V1DeploymentList(
-            items=[
-                kubernetes.client.V1Deployment(
-                    metadata=kubernetes.client.V1ObjectMeta(name="myservice"),
-                    status=kubernetes.client.V1DeploymentStatus(
-                        available_replicas=0, unavailable_replicas=0
-                    ),
-                )
-            ]
-        )
+    namespace = service_stage_deployment_object.metadata.namespace
+    name = service_stage_deployment_object.metadata.name
+    mock_k8s_apps_api().list_namespaced_deployment.return_value = deployment_list(
+        deployment_event(service_stage_deployment_object, 1, None),
     )
-    with raises(RuntimeError, match="cannot determine status for deployment"):
-        _get_deployment_status(service_stage_deployment_object)
+    deployments_status = {(namespace, name): DeploymentStatus.PROGRESSING}
+    _watch_deployments_status(namespace, deployments_status, 10)
+    assert deployments_status == {(namespace, name): DeploymentStatus.ACTIVE}
+    mock_watch().stream.assert_not_called()
 
 
 @patch("kubernetes.client.AppsV1Api")
-def test_get_deployment_status_raises_exception_when_deployment_cannot_be_found(
+@patch("bodywork.k8s.utils.Watch")
+def test_watch_deployments_status_raises_exception_when_deployment_is_missing(
+    mock_watch: MagicMock,
     mock_k8s_apps_api: MagicMock,
     service_stage_deployment_object: kubernetes.client.V1Deployment,
 ):
-    mock_k8s_apps_api().list_namespaced_deployment.return_value = (
-        kubernetes.client.V1DeploymentList(items=[])
+    namespace = service_stage_deployment_object.metadata.namespace
+    name = service_stage_deployment_object.metadata.name
+    mock_k8s_apps_api().list_namespaced_deployment.return_value = deployment_list()
+    with raises(RuntimeError, match="cannot find deployment"):
+        _watch_deployments_status(
+            namespace, {(namespace, name): DeploymentStatus.PROGRESSING}, 10
+        )
+
+
+@patch("kubernetes.client.AppsV1Api")
+@patch("bodywork.k8s.utils.Watch")
+def test_watch_deployments_status_raises_exception_when_deployment_is_deleted(
+    mock_watch: MagicMock,
+    mock_k8s_apps_api: MagicMock,
+    service_stage_deployment_object: kubernetes.client.V1Deployment,
+):
+    namespace = service_stage_deployment_object.metadata.namespace
+    name = service_stage_deployment_object.metadata.name
+    mock_k8s_apps_api().list_namespaced_deployment.return_value = deployment_list(
+        deployment_event(service_stage_deployment_object, None, 1),
+    )
+    mock_watch().stream.return_value = watch_events(
+        [deployment_event(service_stage_deployment_object, None, 1, "DELETED")]
     )
-    with raises(RuntimeError):
-        _get_deployment_status(service_stage_deployment_object)
+    with raises(RuntimeError, match="cannot find deployment"):
+        _watch_deployments_status(
+            namespace, {(namespace, name): DeploymentStatus.PROGRESSING}, 10
+        )
 
 
-@patch("bodywork.k8s.deployments._get_deployment_status")
+@patch("kubernetes.client.AppsV1Api")
+@patch("bodywork.k8s.utils.Watch")
 @patch("bodywork.k8s.deployments.check_resource_scheduling_status")
 def test_monitor_deployments_raises_timeout_error_if_jobs_do_not_succeed(
     mock_check_resource_scheduling_status: MagicMock,
-    mock_deployment_status: MagicMock,
+    mock_watch: MagicMock,
+    mock_k8s_apps_api: MagicMock,
     service_stage_deployment_object: kubernetes.client.V1Deployment,
 ):
-    mock_deployment_status.return_value = DeploymentStatus.PROGRESSING
+    mock_k8s_apps_api().list_namespaced_deployment.return_value = deployment_list(
+        deployment_event(service_stage_deployment_object, None, 1),
+    )
+    mock_watch().stream.side_effect = lambda *args, **kwargs: watch_events(
+        [deployment_event(service_stage_deployment_object, None, 1)]
+    )
     with raises(TimeoutError, match="have yet to reach status=complete"):
         monitor_deployments_to_completion(
-            [service_stage_deployment_object], timeout_seconds=1
+            [service_stage_deployment_object],
+            timeout_seconds=1,
+            wait_before_start_seconds=0,
         )
 
 
-@patch("bodywork.k8s.deployments._get_deployment_status")
+@patch("kubernetes.client.AppsV1Api")
+@patch("bodywork.k8s.utils.Watch")
 @patch("bodywork.k8s.deployments.check_resource_scheduling_status")
 def test_monitor_deployments_identifies_successful_deployments(
     mock_check_resource_scheduling_status: MagicMock,
-    mock_deployment_status: MagicMock,
+    mock_watch: MagicMock,
+    mock_k8s_apps_api: MagicMock,
     service_stage_deployment_object: kubernetes.client.V1Deployment,
 ):
-    mock_deployment_status.side_effect = [
-        DeploymentStatus.PROGRESSING,
-        DeploymentStatus.PROGRESSING,
-        DeploymentStatus.ACTIVE,
-        DeploymentStatus.ACTIVE,
-    ]
+    other_deployment_object = deepcopy(service_stage_deployment_object)
+    other_deployment_object.metadata.name = "some-other-service"
+    mock_k8s_apps_api().list_namespaced_deployment.return_value = deployment_list(
+        deployment_event(service_stage_deployment_object, None, 1),
+        deployment_event(other_deployment_object, 1, None),
+    )
+    mock_watch().stream.return_value = watch_events(
+        [deployment_event(service_stage_deployment_object, 1, None)]
+    )
     successful = monitor_deployments_to_completion(
-        [service_stage_deployment_object, service_stage_deployment_object],
+        [service_stage_deployment_object, other_deployment_object],
         timeout_seconds=1,
         polling_freq_seconds=0.5,
+        wait_before_start_seconds=0,
     )
     assert successful is True
+    assert mock_k8s_apps_api().list_namespaced_deployment.call_count == 2
+    mock_watch().stream.assert_called_once()
 
 
+@patch("bodywork.k8s.deployments.sleep")
+@patch("bodywork.k8s.utils.Watch")
+def test_monitor_deployments_to_completion_returns_immediately_without_deployments(
+    mock_watch: MagicMock,
+    mock_sleep: MagicMock,
+):
+    assert monitor_deployments_to_completion(iter([])) is True
+    mock_sleep.assert_not_called()
+    mock_watch().stream.assert_not_called()
+
+
+def rolled_out_deployment(
+    deployment: kubernetes.client.V1Deployment, observed_generation: int
+) -> kubernetes.client.V1Deployment:
+    deployment = deepcopy(deployment)
+    deployment.metadata.generation = 2
+    deployment.status = kubernetes.client.V1DeploymentStatus(
+        observed_generation=observed_generation,
+        replicas=deployment.spec.replicas,
+        updated_replicas=deployment.spec.replicas,
+        available_replicas=deployment.spec.replicas,
+    )
+    return deployment
+
+
+@patch("kubernetes.client.AppsV1Api")
+@patch("bodywork.k8s.deployments.sleep")
+@patch("bodywork.k8s.utils.Watch")
+def test_monitor_deployments_to_completion_returns_immediately_if_rolled_out(
+    mock_watch: MagicMock,
+    mock_sleep: MagicMock,
+    mock_k8s_apps_api: MagicMock,
+    service_stage_deployment_object: kubernetes.client.V1Deployment,
+):
+    mock_k8s_apps_api().list_namespaced_deployment.return_value = (
+        kubernetes.client.V1DeploymentList(
+            items=[rolled_out_deployment(service_stage_deployment_object, 2)]
+        )
+    )
+    assert monitor_deployments_to_completion([service_stage_deployment_object])
+    mock_sleep.assert_not_called()
+    mock_watch().stream.assert_not_called()
+
+
+@patch("kubernetes.client.AppsV1Api")
+@patch("bodywork.k8s.deployments.sleep")
+@patch("bodywork.k8s.deployments._watch_deployments_status")
 @patch("bodywork.k8s.deployments.check_resource_scheduling_status")
-@patch("bodywork.k8s.deployments.update_progress_bar")
-@patch("bodywork.k8s.deployments._get_deployment_status")
+def test_monitor_deployments_to_completion_waits_for_updates_to_be_observed(
+    mock_check_resource_scheduling_status: MagicMock,
+    mock_watch_deployments_status: MagicMock,
+    mock_sleep: MagicMock,
+    mock_k8s_apps_api: MagicMock,
+    service_stage_deployment_object: kubernetes.client.V1Deployment,
+):
+    mock_k8s_apps_api().list_namespaced_deployment.return_value = (
+        kubernetes.client.V1DeploymentList(
+            items=[rolled_out_deployment(service_stage_deployment_object, 1)]
+        )
+    )
+    with raises(TimeoutError):
+        monitor_deployments_to_completion(
+            [service_stage_deployment_object], wait_before_start_seconds=5
+        )
+    mock_sleep.assert_called_once_with(5)
+    mock_watch_deployments_status.assert_called_once()
+
+
+@patch("kubernetes.client.AppsV1Api")
+@patch("bodywork.k8s.deployments.check_resource_scheduling_status")
+@patch("bodywork.k8s.deployments.progress_bar_updates")
 def test_monitor_deployments_to_completion_updates_progress_bar(
-    mock_deployment_status: MagicMock,
-    mock_update_progress_bar: MagicMock,
+    mock_progress_bar_updates: MagicMock,
     mock_update_check_resource_scheduling_status: MagicMock,
+    mock_k8s_apps_api: MagicMock,
     service_stage_deployment_object: kubernetes.client.V1Deployment,
 ):
-    mock_deployment_status.side_effect = [
-        DeploymentStatus.PROGRESSING,
-        DeploymentStatus.ACTIVE,
-    ]
-    monitor_deployments_to_completion(
-        [service_stage_deployment_object], 1, 0.5, progress_bar=None
+    mock_k8s_apps_api().list_namespaced_deployment.return_value = deployment_list(
+        deployment_event(service_stage_deployment_object, 1, None),
     )
-    mock_update_progress_bar.assert_not_called()
-
-    mock_deployment_status.side_effect = [
-        DeploymentStatus.PROGRESSING,
-        DeploymentStatus.ACTIVE,
-    ]
     mock_progress_bar = Mock()
     monitor_deployments_to_completion(
-        [service_stage_deployment_object], 1, 0.5, progress_bar=mock_progress_bar
+        [service_stage_deployment_object], 1, 0.5, 0, progress_bar=mock_progress_bar
     )
-    mock_update_progress_bar.assert_called()
+    mock_progress_bar_updates.assert_called_once_with(mock_progress_bar, 0.5)
 
 
 def test_deployment_id_creates_valid_deployed_service_identifiers():
@@ -494,41 +717,48 @@ def test_list_service_stage_deployments_returns_service_stage_info(
     )
 
     with patch("kubernetes.client.AppsV1Api") as mock_k8s_apps_api:
-        with patch("kubernetes.client.CoreV1Api") as mock_k8s_core_api:
-            with patch("kubernetes.client.NetworkingV1Api") as mock_k8s_ext_api:
-                mock_k8s_apps_api().list_namespaced_deployment.return_value = (
-                    kubernetes.client.V1DeploymentList(
-                        items=[service_stage_deployment_object]
-                    )
-                )
-                mock_k8s_core_api().list_namespaced_service.return_value = (
-                    kubernetes.client.V1ServiceList(
-                        items=[service_stage_service_object]
-                    )
-                )
-                mock_k8s_ext_api().list_namespaced_ingress.return_value = (
-                    kubernetes.client.V1IngressList(
-                        items=[service_stage_ingress_object]
-                    )
-                )
-                deployment_info = list_service_stage_deployments(service_namespace)
-                mock_k8s_apps_api().list_namespaced_deployment.assert_called_with(
-                    namespace=service_namespace, label_selector="app=bodywork"
-                )
-                deployment_id = f"{deployment_name}/{service_name}"
-                assert deployment_id in deployment_info.keys()
-                assert deployment_info[deployment_id]["service_url"] == service_url
-                assert deployment_info[deployment_id]["service_port"] == service_port
-                assert deployment_info[deployment_id]["service_exposed"] is True
-                assert deployment_info[deployment_id]["available_replicas"] == 1
-                assert deployment_info[deployment_id]["unavailable_replicas"] == 0
-                assert (
-                    deployment_info[deployment_id]["git_branch"]
-                    == "project_repo_branch"
+        with patch("bodywork.k8s.deployments.list_resource_metadata") as mock_list:
+            mock_k8s_apps_api().list_namespaced_deployment.return_value = (
+                kubernetes.client.V1DeploymentList(
+                    items=[service_stage_deployment_object]
                 )
-                assert deployment_info[deployment_id]["git_url"] == "project_repo_url"
-                assert deployment_info[deployment_id]["git_commit_hash"] == "abc123"
-                assert deployment_info[deployment_id]["has_ingress"] is True
+            )
+            mock_list.side_effect = [
+                [service_stage_service_object.metadata.to_dict()],
+                [service_stage_ingress_object.metadata.to_dict()],
+            ]
+            deployment_info = list_service_stage_deployments(service_namespace)
+            mock_k8s_apps_api().list_namespaced_deployment.assert_called_with(
+                namespace=service_namespace, label_selector="app=bodywork"
+            )
+            mock_list.assert_has_calls(
+                [
+                    call(
+                        "/api/v1/namespaces/{namespace}/services",
+                        {"namespace": service_namespace},
+                        label_selector="app=bodywork",
+                    ),
+                    call(
+                        "/apis/networking.k8s.io/v1/namespaces/{namespace}/ingresses",
+                        {"namespace": service_namespace},
+                        label_selector="app=bodywork",
+                    ),
+                ]
+            )
+            deployment_id = f"{deployment_name}/{service_name}"
+            assert deployment_id in deployment_info.keys()
+            assert deployment_info[deployment_id]["service_url"] == service_url
+            assert deployment_info[deployment_id]["service_port"] == service_port
+            assert deployment_info[deployment_id]["service_exposed"] is True
+            assert deployment_info[deployment_id]["available_replicas"] == 1
+            assert deployment_info[deployment_id]["unavailable_replicas"] == 0
+            assert (
+                deployment_info[deployment_id]["git_branch"]
+                == "project_repo_branch"
+            )
+            assert deployment_info[deployment_id]["git_url"] == "project_repo_url"
+            assert deployment_info[deployment_id]["git_commit_hash"] == "abc123"
+            assert deployment_info[deployment_id]["has_ingress"] is True
 
 
 @patch("kubernetes.client.AppsV1Api")
@@ -570,27 +800,41 @@ def test_list_service_stage_deployments_returns_all_services_on_cluster(
         )
     )
 
-    with patch("kubernetes.client.CoreV1Api") as mock_k8s_core_api:
-        with patch("kubernetes.client.NetworkingV1Api") as mock_k8s_ext_api:
-            mock_k8s_apps_api().list_deployment_for_all_namespaces.return_value = (
-                kubernetes.client.V1DeploymentList(
-                    items=[
-                        service_stage_deployment_object,
-                        service_stage_deployment_object2,
-                    ]
-                )
+    with patch("bodywork.k8s.deployments.list_resource_metadata") as mock_list:
+        mock_k8s_apps_api().list_deployment_for_all_namespaces.return_value = (
+            kubernetes.client.V1DeploymentList(
+                items=[
+                    service_stage_deployment_object,
+                    service_stage_deployment_object2,
+                ]
             )
-            mock_k8s_core_api().list_namespaced_service.side_effect = [
-                kubernetes.client.V1ServiceList(items=[service_stage_service_object]),
-                kubernetes.client.V1ServiceList(items=[service_stage_service_object_2]),
+        )
+        mock_list.side_effect = [
+            [
+                service_stage_service_object.metadata.to_dict(),
+                service_stage_service_object_2.metadata.to_dict(),
+            ],
+            [service_stage_ingress_object.metadata.to_dict()],
+        ]
+        deployment_info = list_service_stage_deployments()
+        mock_k8s_apps_api().list_deployment_for_all_namespaces.assert_called_once()
+        mock_list.assert_has_calls(
+            [
+                call("/api/v1/services", {}, label_selector="app=bodywork"),
+                call(
+                    "/apis/networking.k8s.io/v1/ingresses",
+                    {},
+                    label_selector="app=bodywork",
+                ),
             ]
-            mock_k8s_ext_api().list_namespaced_ingress.return_value = (
-                kubernetes.client.V1IngressList(items=[service_stage_ingress_object])
-            )
-            deployment_info = list_service_stage_deployments()
-            mock_k8s_apps_api().list_deployment_for_all_namespaces.assert_called_once()
-            assert "myproject/myservice" in deployment_info.keys()
-            assert "myproject2/myservice" in deployment_info.keys()
+        )
+        assert "myproject/myservice" in deployment_info.keys()
+        assert "myproject2/myservice" in deployment_info.keys()
+        assert deployment_info["myproject/myservice"]["service_exposed"] is True
+        assert deployment_info["myproject/myservice"]["has_ingress"] is True
+        assert deployment_info["myproject2/myservice"]["service_exposed"] is True
+        assert deployment_info["myproject2/myservice"]["has_ingress"] is False
+        assert deployment_info["myproject2/myservice"]["ingress_route"] == "none"
 
 
 def test_cluster_service_url(
@@ -633,23 +877,11 @@ def test_expose_deployment_as_cluster_service_tries_to_expose_deployment_as_serv
 def test_is_exposed_as_cluster_service_identifies_existing_services(
     mock_k8s_core_api: MagicMock,
 ):
-    mock_k8s_core_api().list_namespaced_service.side_effect = [
-        kubernetes.client.V1ServiceList(
-            items=[
-                kubernetes.client.V1Service(
-                    metadata=kubernetes.client.V1ObjectMeta(name="bodywork--serve")
-                )
-            ]
-        ),
-        kubernetes.client.V1ServiceList(
-            items=[
-                kubernetes.client.V1Service(
-                    metadata=kubernetes.client.V1ObjectMeta(
-                        name="some-other-project--serve"
-                    )
-                )
-            ]
+    mock_k8s_core_api().read_namespaced_service.side_effect = [
+        kubernetes.client.V1Service(
+            metadata=kubernetes.client.V1ObjectMeta(name="bodywork--serve")
         ),
+        ApiException(status=404, reason="Not Found"),
     ]
     assert is_exposed_as_cluster_service("bodywork-dev", "bodywork--serve") is True
     assert is_exposed_as_cluster_service("bodywork-dev", "bodywork--serve") is False
@@ -737,29 +969,15 @@ def test_delete_deployment_ingress_tries_to_deletes_ingress_resource(
 def test_has_ingress_identifies_existing_ingress_resources(
     mock_k8s_networking_api: MagicMock,
 ):
-    mock_k8s_networking_api().list_namespaced_ingress.side_effect = [
-        kubernetes.client.V1IngressList(
-            items=[
-                kubernetes.client.V1Ingress(
-                    metadata=kubernetes.client.V1ObjectMeta(
-                        name="bodywork--serve",
-                        annotations={"kubernetes.io/ingress.class": "nginx"},
-                        labels={"app": "bodywork", "stage": "bodywork--serve"},
-                    )
-                )
-            ]
-        ),
-        kubernetes.client.V1IngressList(
-            items=[
-                kubernetes.client.V1Ingress(
-                    metadata=kubernetes.client.V1ObjectMeta(
-                        name="bodywork--some-other-service",
-                        annotations={"kubernetes.io/ingress.class": "nginx"},
-                        labels={"app": "bodywork", "stage": "bodywork--serve"},
-                    )
-                )
-            ]
+    mock_k8s_networking_api().read_namespaced_ingress.side_effect = [
+        kubernetes.client.V1Ingress(
+            metadata=kubernetes.client.V1ObjectMeta(
+                name="bodywork--serve",
+                annotations={"kubernetes.io/ingress.class": "nginx"},
+                labels={"app": "bodywork", "stage": "bodywork--serve"},
+            )
         ),
+        ApiException(status=404, reason="Not Found"),
     ]
     assert has_ingress("bodywork-dev", "bodywork--serve") is True
     assert has_ingress("bodywork-dev", "bodywork--serve") is False
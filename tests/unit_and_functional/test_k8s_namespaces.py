@@ -21,24 +21,24 @@ Kubernetes namespaces.
 from unittest.mock import MagicMock, patch
 
 import kubernetes
+from kubernetes.client.rest import ApiException
+from pytest import raises
 
 from bodywork.k8s.namespaces import create_namespace, delete_namespace, namespace_exists
 
 
 @patch("kubernetes.client.CoreV1Api")
 def test_namespace_exists_identifies_existing_namespaces(mock_k8s_core_api: MagicMock):
-    mock_k8s_core_api().list_namespace.return_value = kubernetes.client.V1NamespaceList(
-        items=[
-            kubernetes.client.V1Namespace(
-                metadata=kubernetes.client.V1ObjectMeta(name="bodywork-dev")
-            ),
-            kubernetes.client.V1Namespace(
-                metadata=kubernetes.client.V1ObjectMeta(name="not-a-real-namespace")
-            ),
-        ]
-    )
+    mock_k8s_core_api().read_namespace.side_effect = [
+        kubernetes.client.V1Namespace(
+            metadata=kubernetes.client.V1ObjectMeta(name="bodywork-dev")
+        ),
+        ApiException(status=404, reason="Not Found"),
+    ]
     assert namespace_exists("bodywork-dev") is True
     assert namespace_exists("foo-bar-la-la-la") is False
+    mock_k8s_core_api().read_namespace.assert_called_with(name="foo-bar-la-la-la")
+    mock_k8s_core_api().list_namespace.assert_not_called()
 
 
 @patch("kubernetes.client.CoreV1Api")
@@ -51,17 +51,39 @@ def test_create_namespace_creates_namespaces(mock_k8s_core_api: MagicMock):
     )
 
 
+@patch("bodywork.k8s.namespaces.sleep")
 @patch("kubernetes.client.CoreV1Api")
-def test_delete_namespace_deletes_namespaces(mock_k8s_core_api: MagicMock):
-    delete_namespace("bodywork-dev", False)
+def test_delete_namespace_polls_namespace_until_deleted(
+    mock_k8s_core_api: MagicMock,
+    mock_sleep: MagicMock,
+):
+    mock_k8s_core_api().read_namespace.side_effect = [
+        kubernetes.client.V1Namespace(
+            metadata=kubernetes.client.V1ObjectMeta(name="bodywork-dev")
+        ),
+        ApiException(status=404, reason="Not Found"),
+    ]
+    delete_namespace("bodywork-dev", True)
     mock_k8s_core_api().delete_namespace.assert_called_once_with(
         name="bodywork-dev", propagation_policy="Background"
     )
-    mock_k8s_core_api().list_namespace.assert_called_once()
+    assert mock_k8s_core_api().read_namespace.call_count == 2
+    mock_sleep.assert_called_once_with(1)
+    mock_k8s_core_api().list_namespace.assert_not_called()
 
-    mock_k8s_core_api.reset_mock()
-    delete_namespace("bodywork-dev", True)
-    mock_k8s_core_api().delete_namespace.assert_called_once_with(
-        name="bodywork-dev", propagation_policy="Background"
+
+@patch("bodywork.k8s.namespaces.sleep")
+@patch("bodywork.k8s.namespaces.monotonic")
+@patch("kubernetes.client.CoreV1Api")
+def test_delete_namespace_raises_timeout_error_if_namespace_not_deleted(
+    mock_k8s_core_api: MagicMock,
+    mock_monotonic: MagicMock,
+    mock_sleep: MagicMock,
+):
+    mock_k8s_core_api().read_namespace.return_value = kubernetes.client.V1Namespace(
+        metadata=kubernetes.client.V1ObjectMeta(name="bodywork-dev")
     )
-    mock_k8s_core_api().list_namespace.assert_called_once()
+    mock_monotonic.side_effect = [0, 0, 30]
+    with raises(TimeoutError, match="yet to be deleted after 30s"):
+        delete_namespace("bodywork-dev", timeout_seconds=30)
+    mock_sleep.assert_called_once_with(1)
@@ -23,7 +23,7 @@ from unittest.mock import MagicMock, patch
 
 import kubernetes
 
-from bodywork.k8s.pod_logs import get_latest_pod_name, get_pod_logs
+from bodywork.k8s.pod_logs import get_latest_pod_name, get_pod_logs, get_pod_logs_stream
 
 
 @patch("kubernetes.client.CoreV1Api")
@@ -64,6 +64,14 @@ def test_get_latest_pod_name_return_latest_pod_name(
         get_latest_pod_name("the-namespace", "bodywork--stage-1")
         == "bodywork--stage-1-hijmlmn"
     )
+    mock_k8s_core_api().list_namespaced_pod.assert_called_with(
+        namespace="the-namespace", label_selector=None
+    )
+
+    get_latest_pod_name("the-namespace", "bodywork--stage-1", "job-name=foo")
+    mock_k8s_core_api().list_namespaced_pod.assert_called_with(
+        namespace="the-namespace", label_selector="job-name=foo"
+    )
 
 
 @patch("kubernetes.client.CoreV1Api")
@@ -100,3 +108,22 @@ def test_get_pod_logs_can_handle_logs_from_crashed_pods(
     mock_k8s_core_api().read_namespaced_pod_log.assert_called_with(
         namespace="the-namespace", name="the-pod", previous=False
     )
+
+
+@patch("kubernetes.client.CoreV1Api")
+def test_get_pod_logs_stream_yields_lines_of_pod_logs(
+    mock_k8s_core_api: MagicMock,
+):
+    mock_response = mock_k8s_core_api().read_namespaced_pod_log.return_value
+    mock_response.stream.return_value = iter(
+        [b"INFO - first line\nINFO - sec", b"ond line\n\xe2\x9c", b"\x93 done"]
+    )
+    pod_logs = list(get_pod_logs_stream("the-namespace", "the-pod"))
+    assert pod_logs == ["INFO - first line", "INFO - second line", "\u2713 done"]
+    mock_k8s_core_api().read_namespaced_pod_log.assert_called_once_with(
+        namespace="the-namespace",
+        name="the-pod",
+        previous=False,
+        _preload_content=False,
+    )
+    mock_response.release_conn.assert_called_once()
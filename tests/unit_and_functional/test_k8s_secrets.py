@@ -21,6 +21,7 @@ manage secrets required by Bodywork project stages.
 from unittest.mock import MagicMock, patch
 
 import kubernetes
+from kubernetes.client.rest import ApiException
 from pytest import raises
 
 from bodywork.k8s.secrets import (
@@ -33,26 +34,35 @@ from bodywork.k8s.secrets import (
     secret_group_exists,
     delete_secret_group,
 )
-from bodywork.constants import SECRET_GROUP_LABEL
+from bodywork.constants import K8S_LIST_PAGE_SIZE, SECRET_GROUP_LABEL
 
 
-@patch("bodywork.k8s.secrets.secret_exists")
+@patch("kubernetes.client.CoreV1Api")
 def test_configure_environment_variables_raises_errors_if_secrets_cannot_be_found(
-    mock_bodywork_k8s_secret_exists: MagicMock,
+    mock_k8s_core_api: MagicMock,
 ):
-    mock_bodywork_k8s_secret_exists.side_effect = [False, True]
+    mock_k8s_core_api().read_namespaced_secret.return_value = (
+        kubernetes.client.V1Secret(data={"AWS_ACCESS_KEY_ID": "Zm9v"})
+    )
 
     secrets = [
         ("aws-credentials", "AWS_SECRET_ACCESS_KEY"),
         ("aws-credentials", "AWS_ACCESS_KEY_ID"),
     ]
-    with raises(RuntimeError, match="cannot find key="):
+    with raises(RuntimeError, match="cannot find key=AWS_SECRET_ACCESS_KEY"):
         configure_env_vars_from_secrets("bodywork-dev", secrets)
+    mock_k8s_core_api().read_namespaced_secret.assert_called_once_with(
+        namespace="bodywork-dev", name="aws-credentials"
+    )
 
 
-@patch("bodywork.k8s.secrets.secret_exists")
-def test_configure_env_vars_from_secrets(mock_bodywork_k8s_secret_exists: MagicMock):
-    mock_bodywork_k8s_secret_exists.side_effect = [True, True]
+@patch("kubernetes.client.CoreV1Api")
+def test_configure_env_vars_from_secrets(mock_k8s_core_api: MagicMock):
+    mock_k8s_core_api().read_namespaced_secret.return_value = (
+        kubernetes.client.V1Secret(
+            data={"AWS_SECRET_ACCESS_KEY": "YmFy", "AWS_ACCESS_KEY_ID": "Zm9v"}
+        )
+    )
 
     secrets = [
         ("aws-credentials", "AWS_SECRET_ACCESS_KEY"),
@@ -70,16 +80,15 @@ def test_configure_env_vars_from_secrets(mock_bodywork_k8s_secret_exists: MagicM
 
 @patch("kubernetes.client.CoreV1Api")
 def test_secret_exists_identifies_existing_namespaces(mock_k8s_core_api: MagicMock):
-    mock_k8s_core_api().list_namespaced_secret.return_value = (
-        kubernetes.client.V1SecretList(
-            items=[
-                kubernetes.client.V1Secret(
-                    metadata=kubernetes.client.V1ObjectMeta(name="xyz-aws-credentials"),
-                    data={"FOO": "bar"},
-                )
-            ]
+    def read_namespaced_secret(namespace: str, name: str) -> kubernetes.client.V1Secret:
+        if name != "xyz-aws-credentials":
+            raise ApiException(status=404, reason="Not Found")
+        return kubernetes.client.V1Secret(
+            metadata=kubernetes.client.V1ObjectMeta(name=name), data={"FOO": "bar"}
         )
-    )
+
+    mock_k8s_core_api().read_namespaced_secret.side_effect = read_namespaced_secret
+    assert secret_exists("bodywork-dev", "xyz-aws-credentials") is True
     assert (
         secret_exists("bodywork-dev", "xyz-aws-credentials", secret_key="FOO") is True
     )
@@ -89,6 +98,18 @@ def test_secret_exists_identifies_existing_namespaces(mock_k8s_core_api: MagicMo
     assert (
         secret_exists("bodywork-dev", "xyz-aws-access-keys", secret_key="FOO") is False
     )
+    mock_k8s_core_api().list_namespaced_secret.assert_not_called()
+
+
+@patch("kubernetes.client.CoreV1Api")
+def test_secret_exists_raises_api_errors_other_than_not_found(
+    mock_k8s_core_api: MagicMock,
+):
+    mock_k8s_core_api().read_namespaced_secret.side_effect = ApiException(
+        status=403, reason="Forbidden"
+    )
+    with raises(ApiException, match="Forbidden"):
+        secret_exists("bodywork-dev", "xyz-aws-credentials")
 
 
 @patch("kubernetes.client.CoreV1Api")
@@ -159,7 +180,10 @@ def test_list_secrets_in_namespace_returns_decoded_secret_data(
     )
     secrets = list_secrets("bodywork-dev", group="xyz")
     mock_k8s_core_api().list_namespaced_secret.assert_called_once_with(
-        namespace="bodywork-dev", label_selector=f"{SECRET_GROUP_LABEL}=xyz"
+        namespace="bodywork-dev",
+        label_selector=f"{SECRET_GROUP_LABEL}=xyz",
+        limit=K8S_LIST_PAGE_SIZE,
+        _continue=None,
     )
 
     assert len(secrets) == 1
@@ -167,6 +191,60 @@ def test_list_secrets_in_namespace_returns_decoded_secret_data(
     assert secrets["xyz-pytest-secret"].data["ALEX"] == "ioannides"
 
 
+@patch("kubernetes.client.CoreV1Api")
+def test_list_secrets_does_not_decode_string_data_and_handles_empty_secrets(
+    mock_k8s_core_api: MagicMock,
+):
+    mock_k8s_core_api().list_namespaced_secret.return_value = (
+        kubernetes.client.V1SecretList(
+            items=[
+                kubernetes.client.V1Secret(
+                    metadata=kubernetes.client.V1ObjectMeta(name="xyz-string-data"),
+                    string_data={"ALEX": "ioannides"},
+                ),
+                kubernetes.client.V1Secret(
+                    metadata=kubernetes.client.V1ObjectMeta(name="xyz-empty"),
+                ),
+            ]
+        )
+    )
+    secrets = list_secrets("bodywork-dev")
+    assert secrets["xyz-string-data"].data == {"ALEX": "ioannides"}
+    assert secrets["xyz-empty"].data == {}
+
+
+@patch("kubernetes.client.CoreV1Api")
+def test_list_secrets_requests_secrets_one_page_at_a_time(
+    mock_k8s_core_api: MagicMock,
+):
+    mock_k8s_core_api().list_namespaced_secret.side_effect = [
+        kubernetes.client.V1SecretList(
+            metadata=kubernetes.client.V1ListMeta(_continue="page-2"),
+            items=[
+                kubernetes.client.V1Secret(
+                    metadata=kubernetes.client.V1ObjectMeta(name="xyz-secret-1"),
+                    string_data={"FOO": "bar"},
+                )
+            ],
+        ),
+        kubernetes.client.V1SecretList(
+            metadata=kubernetes.client.V1ListMeta(),
+            items=[
+                kubernetes.client.V1Secret(
+                    metadata=kubernetes.client.V1ObjectMeta(name="xyz-secret-2"),
+                    string_data={"FOO": "baz"},
+                )
+            ],
+        ),
+    ]
+    secrets = list_secrets("bodywork-dev", page_size=1)
+    assert list(secrets) == ["xyz-secret-1", "xyz-secret-2"]
+    mock_k8s_core_api().list_namespaced_secret.assert_called_with(
+        namespace="bodywork-dev", label_selector=None, limit=1, _continue="page-2"
+    )
+    assert mock_k8s_core_api().list_namespaced_secret.call_count == 2
+
+
 @patch("kubernetes.client.CoreV1Api")
 def test_secret_group_exists(mock_k8s_core_api: MagicMock):
     mock_k8s_core_api().list_namespaced_secret.return_value = (
@@ -17,17 +17,26 @@
 """
 Unit tests for k8s API helper functions.
 """
+from typing import Any, Dict, Iterator, List
 from unittest.mock import MagicMock, Mock, patch
 
 import kubernetes
+from kubernetes.client.rest import ApiException
 from pytest import raises
 
 from bodywork.exceptions import BodyworkClusterResourcesError
 from bodywork.k8s.utils import (
+    PARTIAL_OBJECT_METADATA_LIST,
     api_exception_msg,
     check_resource_scheduling_status,
+    clear_ttl_caches,
+    container_resource_requests,
     has_unscheduleable_pods,
+    list_resource_metadata,
     make_valid_k8s_name,
+    resource_exists,
+    ttl_cache,
+    watch_namespaced_resources,
 )
 
 
@@ -121,3 +130,186 @@ def test_check_resource_scheduling_status_raises_error_if_pods_unschedulable(
     mock_has_unscheduleable_pods.return_value = True
     with raises(BodyworkClusterResourcesError, match=r"Inadequate cluster cpu.+job"):
         check_resource_scheduling_status([mock_resource])
+
+
+@patch("bodywork.k8s.utils.monotonic")
+def test_ttl_cache_reuses_results_until_they_expire(mock_monotonic: MagicMock):
+    mock_func = MagicMock(side_effect=lambda x: x * 2)
+    cached_func = ttl_cache(5)(mock_func)
+
+    mock_monotonic.return_value = 0
+    assert cached_func(1) == 2
+    assert cached_func(1) == 2
+    mock_func.assert_called_once_with(1)
+
+    mock_monotonic.return_value = 5
+    assert cached_func(1) == 2
+    assert mock_func.call_count == 2
+
+    cached_func.cache_clear()
+    assert cached_func(1) == 2
+    assert mock_func.call_count == 3
+
+
+def test_clear_ttl_caches_clears_every_ttl_cache():
+    mock_func_a = MagicMock(side_effect=lambda x: x * 2)
+    mock_func_b = MagicMock(side_effect=lambda x: x * 3)
+    cached_func_a = ttl_cache(60)(mock_func_a)
+    cached_func_b = ttl_cache(60)(mock_func_b)
+    cached_func_a(1)
+    cached_func_b(1)
+
+    clear_ttl_caches()
+    cached_func_a(1)
+    cached_func_b(1)
+    assert mock_func_a.call_count == 2
+    assert mock_func_b.call_count == 2
+
+
+def test_ttl_cache_evicts_oldest_result_when_full():
+    mock_func = MagicMock(side_effect=lambda x: x * 2)
+    cached_func = ttl_cache(60, maxsize=2)(mock_func)
+
+    cached_func(1)
+    cached_func(2)
+    cached_func(3)
+    cached_func(3)
+    cached_func(2)
+    assert mock_func.call_count == 3
+    cached_func(1)
+    assert mock_func.call_count == 4
+
+
+def test_resource_exists_identifies_missing_resources_and_raises_other_errors():
+    mock_read_resource = MagicMock(
+        side_effect=[
+            None,
+            ApiException(status=404, reason="Not Found"),
+            ApiException(status=403, reason="Forbidden"),
+        ]
+    )
+    assert resource_exists(mock_read_resource, name="foo", namespace="bar") is True
+    assert resource_exists(mock_read_resource, name="foo", namespace="bar") is False
+    with raises(ApiException, match="Forbidden"):
+        resource_exists(mock_read_resource, name="foo", namespace="bar")
+    mock_read_resource.assert_called_with(name="foo", namespace="bar")
+
+
+@patch("bodywork.k8s.utils.shared_api_client")
+def test_list_resource_metadata_requests_only_resource_metadata(
+    mock_shared_api_client: MagicMock,
+):
+    mock_call_api = mock_shared_api_client().call_api
+    mock_call_api.return_value = {
+        "items": [{"metadata": {"namespace": "bodywork-dev", "name": "foo"}}]
+    }
+    metadata = list_resource_metadata(
+        "/apis/apps/v1/namespaces/{namespace}/deployments",
+        {"namespace": "bodywork-dev"},
+        label_selector="app=bodywork",
+    )
+    assert metadata == [{"namespace": "bodywork-dev", "name": "foo"}]
+    _, call_kwargs = mock_call_api.call_args
+    assert call_kwargs["header_params"] == {"Accept": PARTIAL_OBJECT_METADATA_LIST}
+    assert call_kwargs["query_params"] == [("labelSelector", "app=bodywork")]
+    assert call_kwargs["path_params"] == {"namespace": "bodywork-dev"}
+
+
+def test_container_resource_requests_only_includes_requests_that_are_set():
+    assert container_resource_requests(0.5, 100).requests == {
+        "cpu": "0.5",
+        "memory": "100M",
+    }
+    assert container_resource_requests(memory_request=100).requests == {
+        "memory": "100M"
+    }
+    assert container_resource_requests().requests is None
+
+
+def pod(name: str, resource_version: str) -> kubernetes.client.V1Pod:
+    return kubernetes.client.V1Pod(
+        metadata=kubernetes.client.V1ObjectMeta(
+            name=name, resource_version=resource_version
+        )
+    )
+
+
+def pod_list(*pods: kubernetes.client.V1Pod) -> kubernetes.client.V1PodList:
+    return kubernetes.client.V1PodList(
+        metadata=kubernetes.client.V1ListMeta(resource_version="1"), items=list(pods)
+    )
+
+
+def watch_events(events: List[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+    yield from events
+
+
+@patch("bodywork.k8s.utils.Watch")
+def test_watch_namespaced_resources_resumes_watch_from_last_resource_version(
+    mock_watch: MagicMock,
+):
+    mock_list_pods = MagicMock()
+    mock_list_pods.return_value = pod_list(pod("foo", "1"), pod("bar", "1"))
+    mock_watch().stream.side_effect = [
+        watch_events([{"type": "MODIFIED", "object": pod("foo", "2")}]),
+        watch_events([{"type": "MODIFIED", "object": pod("foo", "3")}]),
+    ]
+    resources = watch_namespaced_resources(
+        mock_list_pods, "the-namespace", ["foo"], 60, "pod"
+    )
+    versions = [next(resources).metadata.resource_version for _ in range(3)]
+    resources.close()
+    assert versions == ["1", "2", "3"]
+    mock_list_pods.assert_called_once_with(
+        namespace="the-namespace", label_selector="app=bodywork"
+    )
+    assert mock_watch().stream.call_args[1]["resource_version"] == "2"
+
+
+@patch("bodywork.k8s.utils.Watch")
+def test_watch_namespaced_resources_lists_resources_again_if_watch_expires(
+    mock_watch: MagicMock,
+):
+    mock_list_pods = MagicMock()
+    mock_list_pods.return_value = pod_list(pod("foo", "1"))
+    mock_watch().stream.side_effect = [
+        ApiException(status=410, reason="Gone"),
+        watch_events([{"type": "MODIFIED", "object": pod("foo", "2")}]),
+    ]
+    resources = watch_namespaced_resources(
+        mock_list_pods, "the-namespace", ["foo"], 60, "pod"
+    )
+    versions = [next(resources).metadata.resource_version for _ in range(3)]
+    resources.close()
+    assert versions == ["1", "1", "2"]
+    assert mock_list_pods.call_count == 2
+
+
+@patch("bodywork.k8s.utils.Watch")
+def test_watch_namespaced_resources_raises_other_api_errors(mock_watch: MagicMock):
+    mock_list_pods = MagicMock()
+    mock_list_pods.return_value = pod_list(pod("foo", "1"))
+    mock_watch().stream.side_effect = ApiException(status=403, reason="Forbidden")
+    resources = watch_namespaced_resources(
+        mock_list_pods, "the-namespace", ["foo"], 60, "pod"
+    )
+    next(resources)
+    with raises(ApiException, match="Forbidden"):
+        next(resources)
+
+
+@patch("bodywork.k8s.utils.Watch")
+def test_watch_namespaced_resources_stops_at_timeout(mock_watch: MagicMock):
+    mock_list_pods = MagicMock()
+    mock_list_pods.return_value = pod_list(pod("foo", "1"))
+    resources = list(
+        watch_namespaced_resources(mock_list_pods, "the-namespace", ["foo"], 0, "pod")
+    )
+    assert len(resources) == 1
+    mock_watch().stream.assert_not_called()
+
+
+def test_bodywork_cluster_resources_error_message_can_be_rendered_more_than_once():
+    exception = BodyworkClusterResourcesError("job", (name for name in ["foo", "bar"]))
+    assert str(exception) == str(exception)
+    assert "(foo,bar)" in str(exception)
@@ -310,6 +310,9 @@ def test_list_workflow_jobs_returns_jobs_summary_info(
         ]
     )
     workflow_jobs = list_workflow_jobs("namespace", "workflow-job")
+    mock_k8s_batchv1_api().list_namespaced_job.assert_called_once_with(
+        namespace="namespace", label_selector="app=bodywork"
+    )
     assert len(workflow_jobs) == 2
 
     assert "workflow-job-12345" in workflow_jobs.keys()
@@ -331,3 +334,38 @@ def test_list_workflow_jobs_returns_jobs_summary_info(
     assert workflow_jobs["workflow-job-6789"]["active"] is False
     assert workflow_jobs["workflow-job-6789"]["succeeded"] is True
     assert workflow_jobs["workflow-job-6789"]["failed"] is False
+
+
+@patch("bodywork.k8s.workflow_jobs.k8s.BatchV1Api")
+def test_list_workflow_jobs_matches_all_jobs_with_name_prefix(
+    mock_k8s_batchv1_api: MagicMock,
+):
+    mock_k8s_batchv1_api().list_namespaced_job.return_value = k8s_client.V1JobList(
+        items=[
+            k8s_client.V1Job(
+                metadata=k8s_client.V1ObjectMeta(
+                    name="async-workflow-1605214260",
+                    labels={
+                        "app": "bodywork",
+                        "deployment-name": "async-workflow-1605214260",
+                    },
+                ),
+                status=k8s_client.V1JobStatus(active=1),
+            ),
+            k8s_client.V1Job(
+                metadata=k8s_client.V1ObjectMeta(
+                    name="async-workflow-1605214320",
+                    labels={
+                        "app": "bodywork",
+                        "deployment-name": "async-workflow-1605214320",
+                    },
+                ),
+                status=k8s_client.V1JobStatus(succeeded=1),
+            ),
+        ]
+    )
+    workflow_jobs = list_workflow_jobs("namespace", "async-workflow")
+    assert set(workflow_jobs) == {
+        "async-workflow-1605214260",
+        "async-workflow-1605214320",
+    }
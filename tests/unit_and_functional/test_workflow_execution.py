@@ -154,7 +154,7 @@ def test_print_logs_to_stdout(
     mock_k8s: MagicMock, capsys: CaptureFixture, caplog: LogCaptureFixture
 ):
     mock_k8s.get_latest_pod_name.return_value = "bodywork-test-project--stage-1"
-    mock_k8s.get_pod_logs.return_value = "foo-bar"
+    mock_k8s.get_pod_logs_stream.return_value = iter(["foo-bar"])
     _print_logs_to_stdout("the-namespace", "bodywork-test-project--stage-1")
     captured_stdout = capsys.readouterr().out
     assert "foo-bar" in captured_stdout